@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+KvaserCAN 래퍼 벤치마크
+
+드라이버 없이 가상 백엔드(backend='virtual')와 고정 시드로 만든 프레임 집합으로
+송수신 경로와 후처리 경로의 초당 처리 프레임 수를 측정하고 JSON으로 저장합니다.
+같은 옵션으로 커밋마다 실행해 --compare로 이전 결과와 비교할 수 있습니다.
+
+    send, send_many                 단일/일괄 송신
+    receive, receive_many           가상 드라이버 큐에 미리 채운 프레임 단일/일괄 수신
+    monitor                         monitor() 콜백 호출
+    dispatch                        subscribe() 핸들러 ID별 묶음 전달
+    log_write, log_read             can_log 청크 로그 기록/읽기
+    dbc_decode                      can_dbc 컴파일된 디코더로 프레임별 디코딩
+    decode_signals                  can_frames NumPy 일괄 디코딩 (NumPy 필요)
+    bus_statistics, ids             can_stats / can_ids 스트리밍 집계
+
+사용 예:
+    python can_benchmark.py --output bench.json
+    python can_benchmark.py --only send,receive --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from kvaser_can import KvaserCAN, CANERR_NOERROR
+from can_virtual import Message, CANBTR_INDEX_1M
+from can_dbc import loads_dbc
+from can_log import CaptureRecorder, LogReader
+from can_frames import np
+from can_stats import BusStatistics
+from can_ids import IntrusionDetector, learn_baseline
+
+# 결과 파일 형식 버전
+RESULT_VERSION = 1
+
+# 프레임 집합 (ID, 주기 초, DLC)
+FRAME_SET = (
+    (0x0A0, 0.010, 8),
+    (0x2B0, 0.010, 5),
+    (0x316, 0.010, 8),
+    (0x329, 0.010, 8),
+    (0x4F0, 0.020, 8),
+    (0x545, 0.100, 4),
+    (0x18FEF100, 0.100, 8),
+)
+
+# 디코딩 벤치마크용 DBC
+BENCH_DBC = '''
+BO_ 688 SAS11: 5 MDPS
+ SG_ SAS_Angle : 0|16@1- (0.1,0) [-3276.8|3276.7] "Deg" Vector__XXX
+ SG_ SAS_Speed : 16|8@1+ (4,0) [0|1016] "" Vector__XXX
+ SG_ SAS_Stat : 24|8@1+ (1,0) [0|255] "" Vector__XXX
+ SG_ MsgCount : 32|4@1+ (1,0) [0|15] "" Vector__XXX
+ SG_ CheckSum : 36|4@1+ (1,0) [0|15] "" Vector__XXX
+
+BO_ 790 EMS11: 8 EMS
+ SG_ N : 23|16@0+ (0.25,0) [0|16383.75] "rpm" Vector__XXX
+ SG_ TQI_ACOR : 8|8@1+ (0.390625,0) [0|99.6094] "%" Vector__XXX
+ SG_ VS : 48|8@1+ (1,0) [0|254] "km/h" Vector__XXX
+'''
+
+# 이름 → 벤치마크 함수
+BENCHMARKS = {}
+
+
+def benchmark(name: str):
+    """벤치마크 함수 등록 데코레이터 (함수는 (처리 프레임 수, 소요 시간 초) 반환)"""
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+
+class BenchContext:
+    """
+    벤치마크 공용 입력 (고정 시드 프레임 집합과 가상 채널)
+    """
+
+    def __init__(self, frames: int, seed: int = 0, channel: int = 7):
+        self.frames = frames
+        rng = random.Random(seed)
+
+        # 주기 순서대로 정렬한 (timestamp, id, flags, dlc, data) 튜플
+        records = []
+        duration = frames / sum(1.0 / period for _, period, _ in FRAME_SET)
+        for can_id, period, dlc in FRAME_SET:
+            t = rng.random() * period
+            while t < duration:
+                data = bytes(rng.getrandbits(8) for _ in range(dlc))
+                records.append((t, can_id, 1 if can_id > 0x7FF else 0, dlc, data))
+                t += period
+        records.sort()
+        self.records = records[:frames]
+        self.tx_frames = [(can_id, data, flags) for _, can_id, flags, _, data in self.records]
+        self.messages = [self._message(record) for record in self.records]
+
+        self.tmpdir = tempfile.mkdtemp(prefix='can_benchmark_')
+        self.tx = KvaserCAN(backend='virtual')
+        self.rx = KvaserCAN(backend='virtual')
+        for can in (self.tx, self.rx):
+            can.open(channel=channel)
+            can.start(bitrate_index=CANBTR_INDEX_1M)
+
+    @staticmethod
+    def _message(record) -> Message:
+        timestamp, can_id, flags, dlc, data = record
+        msg = Message()
+        msg.id = can_id
+        msg.flags.xtd = flags & 0x01
+        msg.dlc = dlc
+        msg.data[:dlc] = data
+        msg.timestamp.sec = int(timestamp)
+        msg.timestamp.nsec = int((timestamp - int(timestamp)) * 1e9)
+        return msg
+
+    def drain(self):
+        """수신 노드 큐 비우기"""
+        while self.rx.receive_many(max_frames=4096, timeout=0)[1]:
+            pass
+
+    def fill(self):
+        """수신 노드 큐에 프레임 집합 채우기"""
+        self.drain()
+        result, sent = self.tx.send_many(self.tx_frames)
+        if result != CANERR_NOERROR or sent != len(self.tx_frames):
+            raise RuntimeError(f"가상 버스 송신 실패: {result} ({sent}/{len(self.tx_frames)})")
+
+    def close(self):
+        for can in (self.tx, self.rx):
+            can.close()
+        for name in os.listdir(self.tmpdir):
+            os.remove(os.path.join(self.tmpdir, name))
+        os.rmdir(self.tmpdir)
+
+
+@benchmark('send')
+def bench_send(context: BenchContext) -> Tuple[int, float]:
+    send = context.tx.send
+    frames = context.tx_frames
+    context.drain()
+    start = time.perf_counter()
+    for can_id, data, flags in frames:
+        send(can_id, data, extended_id=bool(flags))
+    elapsed = time.perf_counter() - start
+    context.drain()
+    return len(frames), elapsed
+
+
+@benchmark('send_many')
+def bench_send_many(context: BenchContext) -> Tuple[int, float]:
+    context.drain()
+    start = time.perf_counter()
+    _, sent = context.tx.send_many(context.tx_frames)
+    elapsed = time.perf_counter() - start
+    context.drain()
+    return sent, elapsed
+
+
+@benchmark('receive')
+def bench_receive(context: BenchContext) -> Tuple[int, float]:
+    context.fill()
+    receive = context.rx.receive
+    count = 0
+    start = time.perf_counter()
+    while receive(timeout=0)[0] == CANERR_NOERROR:
+        count += 1
+    return count, time.perf_counter() - start
+
+
+@benchmark('receive_many')
+def bench_receive_many(context: BenchContext) -> Tuple[int, float]:
+    context.fill()
+    receive_many = context.rx.receive_many
+    count = 0
+    start = time.perf_counter()
+    while True:
+        result, frames = receive_many(max_frames=256, timeout=0)
+        if result != CANERR_NOERROR:
+            break
+        count += len(frames)
+    return count, time.perf_counter() - start
+
+
+@benchmark('monitor')
+def bench_monitor(context: BenchContext) -> Tuple[int, float]:
+    context.fill()
+    total = len(context.tx_frames)
+    seen = [0]
+
+    def callback(msg) -> bool:
+        seen[0] += 1
+        return seen[0] < total
+
+    start = time.perf_counter()
+    context.rx.monitor(duration=60, callback=callback)
+    return seen[0], time.perf_counter() - start
+
+
+@benchmark('dispatch')
+def bench_dispatch(context: BenchContext) -> Tuple[int, float]:
+    rx = context.rx
+    counts = {}
+
+    def handler(msg):
+        counts[msg.id] = counts.get(msg.id, 0) + 1
+
+    def batch_handler(frames):
+        counts[-1] = counts.get(-1, 0) + len(frames)
+
+    for can_id, _, _ in FRAME_SET:
+        rx.subscribe(can_id, handler, extended_id=can_id > 0x7FF)
+    rx.subscribe(0x2B0, batch_handler, batch=True)
+    messages = context.messages
+    try:
+        start = time.perf_counter()
+        for index in range(0, len(messages), 256):
+            rx.dispatch(messages[index:index + 256])
+        elapsed = time.perf_counter() - start
+    finally:
+        for can_id, _, _ in FRAME_SET:
+            rx.unsubscribe(can_id, extended_id=can_id > 0x7FF)
+    return len(messages), elapsed
+
+
+@benchmark('log_write')
+def bench_log_write(context: BenchContext) -> Tuple[int, float]:
+    path = os.path.join(context.tmpdir, 'bench.kvlog')
+    messages = context.messages
+    start = time.perf_counter()
+    with CaptureRecorder(path) as recorder:
+        for index in range(0, len(messages), 256):
+            recorder.write_many(messages[index:index + 256])
+    return len(messages), time.perf_counter() - start
+
+
+@benchmark('log_read')
+def bench_log_read(context: BenchContext) -> Tuple[int, float]:
+    path = os.path.join(context.tmpdir, 'bench_read.kvlog')
+    if not os.path.exists(path):
+        with CaptureRecorder(path) as recorder:
+            recorder.write_many(context.messages)
+    start = time.perf_counter()
+    with LogReader(path, save_index=False) as log:
+        count = sum(1 for _ in log.read())
+    return count, time.perf_counter() - start
+
+
+@benchmark('dbc_decode')
+def bench_dbc_decode(context: BenchContext) -> Tuple[int, float]:
+    database = loads_dbc(BENCH_DBC)
+    decoders = {message.frame_id: message.decode for message in database.messages}
+    records = context.records
+    count = 0
+    start = time.perf_counter()
+    for _, can_id, _, _, data in records:
+        decode = decoders.get(can_id)
+        if decode is not None:
+            decode(data)
+            count += 1
+    return count, time.perf_counter() - start
+
+
+@benchmark('decode_signals')
+def bench_decode_signals(context: BenchContext) -> Optional[Tuple[int, float]]:
+    if np is None:
+        return None
+    from can_frames import decode_signals, new_frame_array
+
+    records = context.records
+    frames = new_frame_array(len(records))
+    frames['timestamp'] = [record[0] for record in records]
+    frames['id'] = [record[1] for record in records]
+    frames['flags'] = [record[2] for record in records]
+    frames['dlc'] = [record[3] for record in records]
+    frames['data'] = np.frombuffer(b''.join(record[4].ljust(8, b'\0') for record in records),
+                                   dtype=np.uint8).reshape(-1, 8)
+    database = loads_dbc(BENCH_DBC)
+    start = time.perf_counter()
+    for message in database.messages:
+        decode_signals(frames, message)
+    return len(frames), time.perf_counter() - start
+
+
+@benchmark('bus_statistics')
+def bench_bus_statistics(context: BenchContext) -> Tuple[int, float]:
+    stats = BusStatistics(bitrate=1000000)
+    start = time.perf_counter()
+    count = stats.update_many(context.messages)
+    stats.snapshot()
+    return count, time.perf_counter() - start
+
+
+@benchmark('ids')
+def bench_ids(context: BenchContext) -> Tuple[int, float]:
+    detector = IntrusionDetector(learn_baseline(context.records))
+    start = time.perf_counter()
+    count = detector.update_many(context.messages)
+    return count, time.perf_counter() - start
+
+
+def run(names: List[str], frames: int, repeat: int, seed: int = 0) -> Dict[str, object]:
+    """
+    벤치마크 실행
+
+    Args:
+        names: 실행할 벤치마크 이름 목록
+        frames: 벤치마크당 프레임 수
+        repeat: 반복 횟수 (가장 빠른 값과 중앙값 기록)
+        seed: 프레임 집합 난수 시드
+
+    Returns:
+        결과 딕셔너리 (JSON으로 저장 가능)
+    """
+    context = BenchContext(frames, seed=seed)
+    results = {}
+    try:
+        for name in names:
+            times = []
+            count = 0
+            for _ in range(repeat):
+                measured = BENCHMARKS[name](context)
+                if measured is None:
+                    break
+                count, elapsed = measured
+                times.append(elapsed)
+            if not times:
+                results[name] = {'skipped': True}
+                continue
+            best = min(times)
+            results[name] = {
+                'frames': count,
+                'best': best,
+                'median': statistics.median(times),
+                'frames_per_sec': count / best if best > 0 else 0.0,
+                'us_per_frame': best / count * 1e6 if count else 0.0,
+            }
+    finally:
+        context.close()
+
+    return {
+        'version': RESULT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': _git_commit(),
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'numpy': getattr(np, '__version__', None),
+        'frames': frames,
+        'repeat': repeat,
+        'seed': seed,
+        'results': results,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    """현재 git 커밋 (git 저장소가 아니면 None)"""
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object]) -> List[str]:
+    """
+    두 결과의 초당 프레임 수 비교
+
+    Returns:
+        출력용 줄 목록
+    """
+    lines = [f"{'benchmark':<16}{'baseline':>14}{'current':>14}{'change':>10}"]
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if result.get('skipped') or not before or before.get('skipped'):
+            continue
+        old, new = before['frames_per_sec'], result['frames_per_sec']
+        change = (new / old - 1.0) * 100.0 if old else 0.0
+        lines.append(f"{name:<16}{old:>14,.0f}{new:>14,.0f}{change:>+9.1f}%")
+    return lines
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='KvaserCAN 래퍼 벤치마크 (가상 백엔드)')
+    parser.add_argument('--frames', type=int, default=50000, help='벤치마크당 프레임 수 (기본값: 50000)')
+    parser.add_argument('--repeat', type=int, default=5, help='반복 횟수 (기본값: 5)')
+    parser.add_argument('--seed', type=int, default=0, help='프레임 집합 난수 시드')
+    parser.add_argument('--only', help='실행할 벤치마크 (쉼표로 구분, 기본값: 전체)')
+    parser.add_argument('--output', help='결과 JSON 파일 경로')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON 파일 경로')
+    parser.add_argument('--list', action='store_true', help='벤치마크 목록 출력')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print('\n'.join(BENCHMARKS))
+        return 0
+
+    names = list(BENCHMARKS) if not args.only else [name.strip() for name in args.only.split(',')]
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"알 수 없는 벤치마크: {', '.join(unknown)} (사용 가능: {', '.join(BENCHMARKS)})")
+
+    report = run(names, args.frames, args.repeat, args.seed)
+
+    print(f"{'benchmark':<16}{'frames/s':>14}{'us/frame':>10}{'median s':>10}")
+    for name, result in report['results'].items():
+        if result.get('skipped'):
+            print(f"{name:<16}{'skipped':>14}")
+            continue
+        print(f"{name:<16}{result['frames_per_sec']:>14,.0f}{result['us_per_frame']:>10.2f}"
+              f"{result['median']:>10.4f}")
+
+    if args.output:
+        with open(args.output, 'w') as stream:
+            json.dump(report, stream, indent=2)
+        print(f"결과 저장: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as stream:
+            baseline = json.load(stream)
+        print()
+        print('\n'.join(compare(report, baseline)))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
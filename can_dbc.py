@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DBC 데이터베이스 로더
+
+DBC 파일의 메시지(BO_)와 시그널(SG_) 정의를 읽어 메시지마다 전용
+인코더/디코더 함수를 생성합니다. 마스크, 시프트, 스케일/오프셋, 부호 처리,
+Intel(@1) / Motorola(@0) 바이트 순서를 미리 계산한 파이썬 코드로 만들어
+컴파일하므로 프레임마다 시그널 정의를 해석하지 않습니다.
+
+컴파일 결과(메시지 정의와 코드 객체)는 DBC 파일 옆 '<DBC>.cache'에 저장되며,
+DBC 파일이 바뀌지 않았으면 다음 실행 때 파싱 없이 바로 불러옵니다.
+
+사용 예:
+    db = load_dbc('hyundai_kia_generic.dbc')
+    sas1 = db.get_message_by_name('SAS1')
+    data = sas1.encode({'SAS_Angle': -45.0, 'MsgCount': 3})
+    values = db.decode(0x2B0, data)
+"""
+import marshal
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Union
+
+# 캐시 형식 버전 (코드 생성 방식이 바뀌면 증가)
+CACHE_VERSION = 1
+
+_BO_RE = re.compile(r'^BO_\s+(\d+)\s+(\w+)\s*:\s*(\d+)\s+(\w+)')
+_SG_RE = re.compile(
+    r'^SG_\s+(\w+)\s*(M|m\d+)?\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*'
+    r'\(\s*([^,]+?)\s*,\s*([^)]+?)\s*\)\s*\[\s*([^|]*?)\s*\|\s*([^\]]*?)\s*\]\s*"([^"]*)"\s*(.*)$'
+)
+_VAL_RE = re.compile(r'^VAL_\s+(\d+)\s+(\w+)\s+(.*);')
+_VAL_ITEM_RE = re.compile(r'(-?\d+)\s+"([^"]*)"')
+
+# DBC 메시지 ID의 확장 ID 표시 비트
+DBC_EXTENDED_FLAG = 0x80000000
+
+
+class DBCSignal:
+    """
+    DBC 시그널 정의
+    """
+
+    __slots__ = ('name', 'start', 'length', 'byte_order', 'signed', 'scale', 'offset',
+                 'minimum', 'maximum', 'unit', 'receivers', 'multiplexer_id',
+                 'is_multiplexer', 'choices')
+
+    def __init__(self, name: str, start: int, length: int, byte_order: str, signed: bool,
+                 scale: float, offset: float, minimum: float, maximum: float, unit: str = '',
+                 receivers: tuple = (), multiplexer_id: Optional[int] = None,
+                 is_multiplexer: bool = False, choices: Optional[Dict[int, str]] = None):
+        self.name = name
+        self.start = start
+        self.length = length
+        self.byte_order = byte_order
+        self.signed = signed
+        self.scale = scale
+        self.offset = offset
+        self.minimum = minimum
+        self.maximum = maximum
+        self.unit = unit
+        self.receivers = receivers
+        self.multiplexer_id = multiplexer_id
+        self.is_multiplexer = is_multiplexer
+        self.choices = choices or {}
+
+    def __repr__(self) -> str:
+        return (f"DBCSignal({self.name!r}, {self.start}|{self.length}@"
+                f"{'1' if self.byte_order == 'little' else '0'}{'-' if self.signed else '+'} "
+                f"({self.scale},{self.offset}))")
+
+    def lsb_position(self, length: int) -> int:
+        """
+        메시지를 정수 하나로 보았을 때 최하위 비트 위치
+
+        Intel은 리틀 엔디언 정수 기준, Motorola는 빅 엔디언 정수 기준입니다.
+
+        Args:
+            length: 메시지 길이 (바이트)
+        """
+        if self.byte_order == 'little':
+            return self.start
+        msb = (length - 1 - self.start // 8) * 8 + self.start % 8
+        return msb - (self.length - 1)
+
+    def to_tuple(self) -> tuple:
+        return (self.name, self.start, self.length, self.byte_order, self.signed, self.scale,
+                self.offset, self.minimum, self.maximum, self.unit, self.receivers,
+                self.multiplexer_id, self.is_multiplexer, self.choices)
+
+
+class DBCMessage:
+    """
+    DBC 메시지 정의와 컴파일된 인코더/디코더
+    """
+
+    def __init__(self, frame_id: int, name: str, length: int, sender: str = '',
+                 signals: List[DBCSignal] = None, extended_id: bool = False):
+        self.frame_id = frame_id
+        self.name = name
+        self.length = length
+        self.sender = sender
+        self.signals = signals or []
+        self.extended_id = extended_id
+
+        # 컴파일 후 설정되는 함수
+        self._decode = None
+        self._encode = None
+
+    def __repr__(self) -> str:
+        return f"DBCMessage(0x{self.frame_id:X}, {self.name!r}, {len(self.signals)} signals)"
+
+    def get_signal(self, name: str) -> Optional[DBCSignal]:
+        for signal in self.signals:
+            if signal.name == name:
+                return signal
+        return None
+
+    def decode(self, data: Union[bytes, List[int]]) -> Dict[str, Union[int, float]]:
+        """
+        메시지 데이터를 물리값 딕셔너리로 디코딩
+
+        Args:
+            data: 메시지 데이터 (bytes 또는 정수 리스트, 짧으면 0으로 채움)
+
+        Returns:
+            {시그널 이름: 물리값}
+        """
+        return self._decode(data)
+
+    def encode(self, values: Dict[str, float]) -> bytes:
+        """
+        물리값 딕셔너리를 메시지 데이터로 인코딩
+
+        없는 시그널은 원시값 0으로 채우고, 범위(minimum < maximum)가 정의된
+        시그널은 범위 안으로 제한합니다.
+
+        Args:
+            values: {시그널 이름: 물리값}
+
+        Returns:
+            length 바이트 데이터
+        """
+        return self._encode(values)
+
+    def to_tuple(self) -> tuple:
+        return (self.frame_id, self.name, self.length, self.sender,
+                tuple(signal.to_tuple() for signal in self.signals), self.extended_id)
+
+
+class DBCDatabase:
+    """
+    DBC 메시지 모음
+    """
+
+    def __init__(self, messages: List[DBCMessage]):
+        self.messages = messages
+        self._by_id = {(message.frame_id, message.extended_id): message for message in messages}
+        self._by_name = {message.name: message for message in messages}
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def get_message(self, frame_id: int, extended_id: Optional[bool] = None) -> Optional[DBCMessage]:
+        """
+        ID로 메시지 찾기
+
+        Args:
+            frame_id: CAN 메시지 ID
+            extended_id: None이면 표준 ID를 먼저, 없으면 확장 ID에서 찾음
+        """
+        if extended_id is None:
+            return self._by_id.get((frame_id, False)) or self._by_id.get((frame_id, True))
+        return self._by_id.get((frame_id, extended_id))
+
+    def get_message_by_name(self, name: str) -> Optional[DBCMessage]:
+        return self._by_name.get(name)
+
+    def decode(self, frame_id: int, data: Union[bytes, List[int]],
+               extended_id: Optional[bool] = None) -> Optional[Dict[str, Union[int, float]]]:
+        """
+        ID에 해당하는 메시지로 디코딩
+
+        Returns:
+            {시그널 이름: 물리값}. 정의되지 않은 ID이면 None
+        """
+        message = self.get_message(frame_id, extended_id)
+        if message is None:
+            return None
+        return message._decode(data)
+
+    def encode(self, message: Union[int, str], values: Dict[str, float]) -> bytes:
+        """
+        메시지 이름 또는 ID로 인코딩
+
+        Raises:
+            KeyError: 정의되지 않은 메시지
+        """
+        found = self.get_message_by_name(message) if isinstance(message, str) else self.get_message(message)
+        if found is None:
+            raise KeyError(message)
+        return found._encode(values)
+
+
+def parse_dbc(text: str) -> List[DBCMessage]:
+    """
+    DBC 텍스트에서 메시지/시그널/값 설명(VAL_) 정의 읽기
+
+    Args:
+        text: DBC 파일 내용
+
+    Returns:
+        메시지 리스트
+    """
+    messages = []
+    by_raw_id = {}
+    current = None
+
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('BO_ '):
+            match = _BO_RE.match(line)
+            if match is None:
+                current = None
+                continue
+            raw_id = int(match.group(1))
+            extended = bool(raw_id & DBC_EXTENDED_FLAG)
+            current = DBCMessage(raw_id & 0x1FFFFFFF if extended else raw_id, match.group(2),
+                                 int(match.group(3)), match.group(4), extended_id=extended)
+            messages.append(current)
+            by_raw_id[raw_id] = current
+        elif line.startswith('SG_ ') and current is not None:
+            match = _SG_RE.match(line)
+            if match is None:
+                continue
+            (name, mux, start, length, order, sign, scale, offset,
+             minimum, maximum, unit, receivers) = match.groups()
+            current.signals.append(DBCSignal(
+                name=name,
+                start=int(start),
+                length=int(length),
+                byte_order='little' if order == '1' else 'big',
+                signed=sign == '-',
+                scale=_number(scale),
+                offset=_number(offset),
+                minimum=_number(minimum or '0'),
+                maximum=_number(maximum or '0'),
+                unit=unit,
+                receivers=tuple(item for item in re.split(r'[\s,]+', receivers) if item),
+                multiplexer_id=int(mux[1:]) if mux and mux.startswith('m') else None,
+                is_multiplexer=mux == 'M',
+            ))
+        elif line.startswith('VAL_ '):
+            current = None
+            match = _VAL_RE.match(line)
+            if match is None:
+                continue
+            message = by_raw_id.get(int(match.group(1)))
+            signal = message.get_signal(match.group(2)) if message is not None else None
+            if signal is not None:
+                signal.choices = {int(value): label for value, label in _VAL_ITEM_RE.findall(match.group(3))}
+        elif line and not line.startswith('SG_'):
+            current = None
+
+    return messages
+
+
+def _number(text: str) -> Union[int, float]:
+    """DBC 숫자 문자열 변환 (정수면 int)"""
+    value = float(text)
+    return int(value) if value.is_integer() and 'e' not in text.lower() and '.' not in text else value
+
+
+def generate_code(messages: List[DBCMessage]) -> str:
+    """
+    메시지별 디코더/인코더 파이썬 소스 생성
+
+    함수 이름은 _decode_<번호>, _encode_<번호> (번호는 messages 순서)
+    """
+    lines = []
+    for index, message in enumerate(messages):
+        lines.extend(_decoder_source(index, message))
+        lines.extend(_encoder_source(index, message))
+    return '\n'.join(lines) + '\n'
+
+
+def _scaled(expression: str, signal: DBCSignal) -> str:
+    """원시값 식에 스케일/오프셋 적용"""
+    if signal.scale == 1 and signal.offset == 0:
+        return expression
+    if signal.offset == 0:
+        return f"{expression} * {signal.scale!r}"
+    return f"{expression} * {signal.scale!r} + {signal.offset!r}"
+
+
+def _decoder_source(index: int, message: DBCMessage) -> List[str]:
+    length = message.length
+    lines = [
+        f"def _decode_{index}(data):",
+        f"    if len(data) != {length} or not isinstance(data, (bytes, bytearray)):",
+        f"        data = bytes(data[:{length}]).ljust({length}, b'\\x00')",
+    ]
+    if any(signal.byte_order == 'little' for signal in message.signals):
+        lines.append("    le = int.from_bytes(data, 'little')")
+    if any(signal.byte_order == 'big' for signal in message.signals):
+        lines.append("    be = int.from_bytes(data, 'big')")
+    lines.append("    out = {}")
+
+    def emit(signal: DBCSignal, indent: str, target: str):
+        source = 'le' if signal.byte_order == 'little' else 'be'
+        mask = (1 << signal.length) - 1
+        lines.append(f"{indent}v = ({source} >> {signal.lsb_position(length)}) & {mask:#x}")
+        if signal.signed:
+            lines.append(f"{indent}if v & {1 << (signal.length - 1):#x}:")
+            lines.append(f"{indent}    v -= {1 << signal.length:#x}")
+        if target:
+            lines.append(f"{indent}{target} = v")
+        lines.append(f"{indent}out[{signal.name!r}] = {_scaled('v', signal)}")
+
+    multiplexer = next((signal for signal in message.signals if signal.is_multiplexer), None)
+    if multiplexer is not None:
+        emit(multiplexer, '    ', 'mux')
+
+    branches = {}
+    for signal in message.signals:
+        if signal.is_multiplexer:
+            continue
+        if signal.multiplexer_id is None or multiplexer is None:
+            emit(signal, '    ', '')
+        else:
+            branches.setdefault(signal.multiplexer_id, []).append(signal)
+
+    for mux_id, signals in sorted(branches.items()):
+        lines.append(f"    if mux == {mux_id}:")
+        for signal in signals:
+            emit(signal, '        ', '')
+
+    lines.append("    return out")
+    lines.append("")
+    return lines
+
+
+def _encoder_source(index: int, message: DBCMessage) -> List[str]:
+    length = message.length
+    lines = [
+        f"def _encode_{index}(values):",
+        "    le = 0",
+        "    be = 0",
+        "    get = values.get",
+    ]
+
+    def emit(signal: DBCSignal, indent: str):
+        target = 'le' if signal.byte_order == 'little' else 'be'
+        mask = (1 << signal.length) - 1
+        shift = signal.lsb_position(length)
+        value = 'v'
+        if signal.minimum < signal.maximum:
+            value = f"min(max(v, {signal.minimum!r}), {signal.maximum!r})"
+        if signal.offset != 0:
+            value = f"({value} - {signal.offset!r})"
+        if signal.scale != 1:
+            value = f"{value} / {signal.scale!r}"
+
+        lines.append(f"{indent}v = get({signal.name!r})")
+        lines.append(f"{indent}if v is not None:")
+        lines.append(f"{indent}    {target} |= (int(round({value})) & {mask:#x}) << {shift}")
+
+    # 다중화 시그널은 multiplexer 값과 일치하는 것만 인코딩
+    multiplexer = next((signal for signal in message.signals if signal.is_multiplexer), None)
+    branches = {}
+    for signal in message.signals:
+        if signal.multiplexer_id is None or multiplexer is None:
+            emit(signal, '    ')
+        else:
+            branches.setdefault(signal.multiplexer_id, []).append(signal)
+
+    if branches:
+        lines.append(f"    mux = get({multiplexer.name!r})")
+        for mux_id, signals in sorted(branches.items()):
+            lines.append(f"    if mux == {mux_id}:")
+            for signal in signals:
+                emit(signal, '        ')
+
+    lines.append("    if be:")
+    lines.append(f"        le |= int.from_bytes(be.to_bytes({length}, 'big'), 'little')")
+    lines.append(f"    return le.to_bytes({length}, 'little')")
+    lines.append("")
+    return lines
+
+
+def compile_messages(messages: List[DBCMessage], code=None):
+    """
+    메시지 목록의 인코더/디코더 생성 및 연결
+
+    Args:
+        messages: 메시지 리스트
+        code: 미리 컴파일된 코드 객체 (None이면 소스를 생성해 컴파일)
+
+    Returns:
+        사용한 코드 객체 (캐시 저장용)
+    """
+    if code is None:
+        code = compile(generate_code(messages), '<dbc>', 'exec')
+
+    namespace = {}
+    exec(code, namespace)
+    for index, message in enumerate(messages):
+        message._decode = namespace[f'_decode_{index}']
+        message._encode = namespace[f'_encode_{index}']
+    return code
+
+
+def _cache_key(path: str) -> tuple:
+    stat = os.stat(path)
+    return (sys.implementation.cache_tag, CACHE_VERSION, stat.st_size, stat.st_mtime_ns)
+
+
+def _load_cache(path: str, cache_path: str) -> Optional[DBCDatabase]:
+    """DBC 캐시 불러오기 (DBC 파일이 바뀌었거나 형식이 다르면 None)"""
+    try:
+        with open(cache_path, 'rb') as stream:
+            cached = marshal.load(stream)
+        if cached.get('key') != _cache_key(path):
+            return None
+
+        messages = []
+        for frame_id, name, length, sender, signals, extended in cached['messages']:
+            messages.append(DBCMessage(frame_id, name, length, sender,
+                                       [DBCSignal(*signal) for signal in signals], extended))
+        compile_messages(messages, cached['code'])
+    except (OSError, EOFError, ValueError, TypeError, KeyError, AttributeError):
+        return None
+
+    return DBCDatabase(messages)
+
+
+def _save_cache(path: str, cache_path: str, messages: List[DBCMessage], code):
+    """DBC 캐시 저장 (쓸 수 없는 위치면 무시)"""
+    cached = {
+        'key': _cache_key(path),
+        'messages': tuple(message.to_tuple() for message in messages),
+        'code': code,
+    }
+    temp_path = cache_path + '.tmp'
+    try:
+        with open(temp_path, 'wb') as stream:
+            marshal.dump(cached, stream)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass
+
+
+def load_dbc(path: str, cache: bool = True, cache_path: str = None,
+             encoding: str = 'cp1252') -> DBCDatabase:
+    """
+    DBC 파일 불러오기
+
+    Args:
+        path: DBC 파일 경로
+        cache: 컴파일 결과 캐시 사용 여부
+        cache_path: 캐시 파일 경로 (None이면 '<DBC>.cache')
+        encoding: DBC 파일 인코딩
+
+    Returns:
+        DBCDatabase
+    """
+    cache_path = cache_path or path + '.cache'
+    if cache:
+        database = _load_cache(path, cache_path)
+        if database is not None:
+            return database
+
+    with open(path, 'r', encoding=encoding, errors='replace') as stream:
+        messages = parse_dbc(stream.read())
+    code = compile_messages(messages)
+
+    if cache:
+        _save_cache(path, cache_path, messages, code)
+    return DBCDatabase(messages)
+
+
+def loads_dbc(text: str) -> DBCDatabase:
+    """
+    DBC 텍스트에서 바로 데이터베이스 생성 (캐시 없음)
+
+    Args:
+        text: DBC 파일 내용
+    """
+    messages = parse_dbc(text)
+    compile_messages(messages)
+    return DBCDatabase(messages)
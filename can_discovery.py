@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CAN 채널 검색 서비스
+
+채널마다 별도 API 인스턴스로 test()를 동시에 호출해 채널 상태를 확인하고,
+결과를 TTL 동안 캐시합니다. details=True이면 사용 가능한 채널의 지원 작동 모드와
+하드웨어/펌웨어 정보, 시리얼 번호도 함께 읽습니다.
+watch()를 켜면 백그라운드 스레드가 주기적으로 다시 검색해 채널이 추가되거나
+사라지면 콜백으로 알려주고 캐시를 최신으로 유지합니다.
+
+KvaserCAN.scan_channels()도 이 캐시를 사용하므로, 같은 프로세스에서 여러 번
+호출하거나 watch() 중이면 기다리지 않고 바로 결과를 돌려줍니다.
+(scan_channels(refresh=True)이면 캐시와 관계없이 다시 검색)
+
+검색 중 예외가 난 채널(드라이버 오류 등)은 전체 검색을 실패시키지 않고 없는
+채널로 표시하며, 예외는 ChannelInfo.error에 남깁니다.
+
+사용 예:
+    discovery = get_discovery('kvaser')
+    channels = discovery.channels()           # 처음에만 동시 검색, 이후 TTL 동안 캐시
+    print(discovery.info(channels[0]))
+    discovery.watch(interval=1.0, callback=lambda added, removed: print(added, removed))
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from kvaser_can import create_api, CANMODE_DEFAULT, CANERR_NOERROR
+from can_virtual import CANBRD_PRESENT, CANBRD_NOT_PRESENT
+
+# test()로 지원 여부를 확인하는 작동 모드 비트 (OpMode.bits 필드 이름)
+MODE_CAPABILITIES = ('fdoe', 'brse', 'niso', 'shrd', 'nxtd', 'nrtr', 'err', 'mon')
+
+# test()가 작동 모드를 확인하지 않는 백엔드 (지원 여부를 알 수 없어 None으로 표시)
+MODE_UNCHECKED_BACKENDS = ('virtual', 'socketcan')
+
+
+def _optional_call(api, name: str) -> Optional[str]:
+    """백엔드가 제공하는 정보 메서드 호출 (없으면 None)"""
+    method = getattr(api, name, None)
+    return method() if method is not None else None
+
+
+class ChannelInfo:
+    """
+    채널 검색 결과
+    """
+
+    __slots__ = ('channel', 'result', 'state', 'capabilities', 'hardware', 'firmware', 'serial',
+                 'error', 'probed_at')
+
+    def __init__(self, channel: int, result: int, state: int):
+        self.channel = channel
+        self.result = result
+        self.state = state
+        self.capabilities = {}  # type: Dict[str, Optional[bool]]  (None: 알 수 없음)
+        self.hardware = None  # type: Optional[str]
+        self.firmware = None  # type: Optional[str]
+        self.serial = None  # type: Optional[str]
+        self.error = None  # type: Optional[str]
+        self.probed_at = time.time()
+
+    @property
+    def present(self) -> bool:
+        """채널이 존재하는지 (사용 중 포함)"""
+        return self.result == CANERR_NOERROR and self.state >= CANBRD_PRESENT
+
+    @property
+    def available(self) -> bool:
+        """채널이 존재하고 바로 열 수 있는지"""
+        return self.result == CANERR_NOERROR and self.state == CANBRD_PRESENT
+
+    def as_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return (f"ChannelInfo(channel={self.channel}, state={self.state}, "
+                f"hardware={self.hardware!r}, firmware={self.firmware!r}, serial={self.serial!r})")
+
+
+class ChannelDiscovery:
+    """
+    동시 검색과 캐시를 제공하는 채널 검색 서비스
+    """
+
+    def __init__(self, backend: str = 'kvaser', lib_name: str = None, max_channels: int = 8,
+                 ttl: float = 30.0, details: bool = False, workers: int = None):
+        """
+        검색 서비스 초기화
+
+        Args:
+            backend: 'kvaser', 'virtual' 또는 'socketcan'
+            lib_name: 드라이버 라이브러리 파일명 (None이면 자동 선택)
+            max_channels: 검색할 최대 채널 수 (0 ~ max_channels-1)
+            ttl: 캐시 유효 시간 (초). 지나면 다음 조회 때 다시 검색
+            details: True이면 사용 가능한 채널의 지원 작동 모드를 확인하고(채널마다 test() 8회 추가),
+                     채널을 잠시 열어 하드웨어/펌웨어 정보와 시리얼 번호를 읽음
+            workers: 동시 검색 스레드 수 (None이면 채널 수만큼)
+        """
+        self.backend = backend
+        self.lib_name = lib_name
+        self.max_channels = max_channels
+        self.ttl = ttl
+        self.details = details
+        self.workers = workers or max_channels
+
+        self._inventory = {}  # type: Dict[int, ChannelInfo]
+        self._refreshed = None  # type: Optional[float]
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+        self._watch_thread = None
+        self._watch_stop = threading.Event()
+        self._callbacks = []  # type: List[Callable[[List[int], List[int]], None]]
+
+    def _probe(self, channel: int) -> ChannelInfo:
+        """채널 1개 검색 (검색 스레드에서 실행, 예외가 나면 없는 채널로 표시)"""
+        try:
+            return self._probe_channel(channel)
+        except Exception as error:
+            info = ChannelInfo(channel, CANERR_NOERROR, CANBRD_NOT_PRESENT)
+            info.error = f'{type(error).__name__}: {error}'
+            return info
+
+    def _probe_channel(self, channel: int) -> ChannelInfo:
+        """채널 1개 검색 (채널마다 별도 API 인스턴스)"""
+        api, types = create_api(self.backend, self.lib_name)
+        op_mode = types.OpMode()
+        op_mode.byte = CANMODE_DEFAULT
+        result, state = api.test(channel=channel, mode=op_mode)
+        info = ChannelInfo(channel, result, state)
+        if not self.details or not info.present:
+            return info
+
+        if self.backend in MODE_UNCHECKED_BACKENDS:
+            info.capabilities = dict.fromkeys(MODE_CAPABILITIES)
+        else:
+            # 요청한 작동 모드를 지원하지 않으면 test()가 오류를 돌려줌
+            for name in MODE_CAPABILITIES:
+                op_mode.byte = CANMODE_DEFAULT
+                setattr(op_mode.bits, name, 1)
+                mode_result, _ = api.test(channel=channel, mode=op_mode)
+                info.capabilities[name] = mode_result == CANERR_NOERROR
+
+        if info.available:
+            # 다른 노드에 영향이 없도록 모니터(수신 전용) 모드로 잠시 열기
+            op_mode.byte = CANMODE_DEFAULT
+            op_mode.bits.mon = 1 if info.capabilities.get('mon') else 0
+            if api.init(channel=channel, mode=op_mode) == CANERR_NOERROR:
+                try:
+                    info.hardware = _optional_call(api, 'hardware')
+                    info.firmware = _optional_call(api, 'firmware')
+                    info.serial = _optional_call(api, 'serial_number')
+                finally:
+                    api.exit()
+        return info
+
+    def refresh(self) -> Dict[int, ChannelInfo]:
+        """
+        모든 채널을 동시에 다시 검색
+
+        Returns:
+            {채널: ChannelInfo} 검색 결과 (존재하지 않는 채널 포함)
+        """
+        with self._refresh_lock:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, self.max_channels)),
+                                    thread_name_prefix='ChannelDiscovery') as pool:
+                results = list(pool.map(self._probe, range(self.max_channels)))
+
+            inventory = {info.channel: info for info in results}
+            with self._lock:
+                previous = self._inventory if self._refreshed is not None else None
+                self._inventory = inventory
+                self._refreshed = time.monotonic()
+
+        if previous is not None:
+            self._notify(previous, inventory)
+        return dict(inventory)
+
+    def inventory(self, refresh: bool = False) -> Dict[int, ChannelInfo]:
+        """
+        캐시된 검색 결과 (없거나 TTL이 지났으면 다시 검색)
+
+        Args:
+            refresh: True이면 캐시와 관계없이 다시 검색
+
+        Returns:
+            {채널: ChannelInfo} 딕셔너리
+        """
+        with self._lock:
+            fresh = (self._refreshed is not None and
+                     time.monotonic() - self._refreshed < self.ttl)
+            if fresh and not refresh:
+                return dict(self._inventory)
+        return self.refresh()
+
+    def channels(self, refresh: bool = False) -> List[int]:
+        """
+        사용 가능한 채널 번호 목록 (scan_channels()와 같은 기준)
+
+        Args:
+            refresh: True이면 캐시와 관계없이 다시 검색
+        """
+        return [channel for channel, info in sorted(self.inventory(refresh).items()) if info.available]
+
+    def info(self, channel: int) -> Optional[ChannelInfo]:
+        """채널 1개의 캐시된 검색 결과 (범위를 벗어나면 None)"""
+        return self.inventory().get(channel)
+
+    def invalidate(self):
+        """캐시 무효화 (다음 조회 때 다시 검색)"""
+        with self._lock:
+            self._refreshed = None
+
+    def watch(self, interval: float = 1.0,
+              callback: Callable[[List[int], List[int]], None] = None) -> bool:
+        """
+        백그라운드 핫플러그 감시 시작
+
+        interval마다 다시 검색해 캐시를 갱신하고, 사용 가능한 채널이 바뀌면
+        callback(추가된 채널 목록, 사라진 채널 목록)을 호출합니다.
+
+        Args:
+            interval: 검색 주기 (초)
+            callback: 변경 알림 콜백 (이미 감시 중이면 콜백만 추가)
+
+        Returns:
+            True 새로 시작, False 이미 감시 중
+        """
+        if callback is not None:
+            self._callbacks.append(callback)
+        if self._watch_thread is not None:
+            return False
+
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(target=self._watch_loop, args=(interval,),
+                                              name='ChannelDiscovery-watch', daemon=True)
+        self._watch_thread.start()
+        return True
+
+    def stop_watch(self):
+        """핫플러그 감시 중지"""
+        self._watch_stop.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join()
+            self._watch_thread = None
+
+    @property
+    def is_watching(self) -> bool:
+        return self._watch_thread is not None
+
+    def _watch_loop(self, interval: float):
+        """감시 스레드 본체"""
+        while not self._watch_stop.is_set():
+            self.refresh()
+            self._watch_stop.wait(interval)
+
+    def _notify(self, previous: Dict[int, ChannelInfo], current: Dict[int, ChannelInfo]):
+        """사용 가능한 채널 변경 알림"""
+        before = {channel for channel, info in previous.items() if info.available}
+        after = {channel for channel, info in current.items() if info.available}
+        if before == after:
+            return
+        added, removed = sorted(after - before), sorted(before - after)
+        for callback in list(self._callbacks):
+            callback(added, removed)
+
+
+# (백엔드, 라이브러리, 최대 채널 수) → 공유 검색 서비스
+_services = {}  # type: Dict[Tuple[str, Optional[str], int], ChannelDiscovery]
+_services_lock = threading.Lock()
+
+
+def get_discovery(backend: str = 'kvaser', lib_name: str = None, max_channels: int = 8,
+                  **kwargs) -> ChannelDiscovery:
+    """
+    프로세스 안에서 공유하는 검색 서비스
+
+    Args:
+        backend, lib_name, max_channels: ChannelDiscovery와 같음
+        kwargs: 처음 만들 때 ChannelDiscovery에 넘길 추가 인자 (ttl, details, workers)
+
+    Returns:
+        ChannelDiscovery 인스턴스
+    """
+    key = (backend, lib_name, max_channels)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = ChannelDiscovery(backend, lib_name, max_channels, **kwargs)
+        return service
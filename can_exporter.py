@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prometheus 텍스트 형식 지표 내보내기
+
+KvaserCAN 채널 하나의 상태를 로컬 HTTP 엔드포인트(/metrics)로 제공합니다.
+
+    - 샘플링 스레드가 interval마다 get_busload()로 버스 부하와 컨트롤러 상태를 읽습니다.
+      상태/부하 조회만 하고 수신 큐는 읽지 않으므로 수신 경로와 경쟁하지 않습니다.
+      읽으면 초기화되는 상태 플래그(message_lost 등)는 발생 횟수 카운터로 누적합니다.
+    - 수신 프레임은 on_message()/update_many()로 넘겨받아 BusStatistics로 ID별 개수,
+      비트 수, 주기를 집계하고 오류(상태) 프레임은 따로 셉니다.
+    - 송신 프레임 수는 KvaserCAN.tx_frames에서 읽어 항상 내보냅니다.
+    - 채널 계측(enable_instrumentation)이 켜져 있으면 드라이버 결과 코드와
+      호출 소요 시간 백분위수를 함께 내보냅니다. instrument=True이면 start()에서
+      계측을 켜고, 이 내보내기가 켠 경우 stop()에서 다시 끕니다.
+
+사용 예:
+    exporter = MetricsExporter(can, port=9108)
+    exporter.start()
+    can.monitor(duration=3600, callback=exporter.on_message, background=True)
+    exporter.stop()
+
+    # curl http://127.0.0.1:9108/metrics
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+
+from can_log import message_unpacker
+from can_stats import BusStatistics
+
+# 텍스트 형식 Content-Type
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# 내보내는 컨트롤러 상태 비트
+STATUS_BITS = ('bus_off', 'warning_level', 'bus_error', 'transmitter_busy',
+               'receiver_empty', 'message_lost', 'queue_overrun', 'can_stopped')
+
+# 계측 구간 요약에 넣는 백분위수
+QUANTILES = (('0.5', 'p50'), ('0.9', 'p90'), ('0.99', 'p99'), ('0.999', 'p999'))
+
+# Message 플래그 첫 바이트의 상태(오류) 프레임 비트
+FLAG_STS = 0x80
+
+
+def _labels(base: str, **extra) -> str:
+    """라벨 문자열 {channel="0",...} 생성"""
+    parts = [base] if base else []
+    parts.extend(f'{name}="{value}"' for name, value in extra.items())
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _id_label(key) -> str:
+    """BusStatistics ID 키를 라벨 값으로 변환 (확장 ID는 8자리)"""
+    if isinstance(key, str):
+        return key
+    if key & 0x80000000:
+        return f'0x{key & 0x1FFFFFFF:08X}'
+    return f'0x{key:03X}'
+
+
+class MetricsExporter:
+    """
+    CAN 채널 지표 HTTP 내보내기
+    """
+
+    def __init__(self, can, host: str = '127.0.0.1', port: int = 9108, interval: float = 1.0,
+                 instrument: bool = False, statistics: Optional[BusStatistics] = None,
+                 max_ids: int = 2048):
+        """
+        내보내기 초기화
+
+        Args:
+            can: 시작된 KvaserCAN 인스턴스
+            host: HTTP 바인드 주소 (기본값: 로컬만)
+            port: HTTP 포트 (0이면 빈 포트 자동 선택, start() 후 self.port로 확인)
+            interval: 상태/버스 부하 샘플링 주기 (초)
+            instrument: True이면 채널 계측을 켜서 드라이버 지표도 내보냄 (stop()에서 끔)
+            statistics: 수신 집계에 쓸 BusStatistics (None이면 채널 비트레이트로 생성)
+            max_ids: ID별 지표를 내보낼 최대 ID 수 (수신 개수가 많은 순)
+        """
+        self.can = can
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.instrument = instrument
+        self._enabled_instrumentation = False
+        self.statistics = statistics or BusStatistics.for_channel(can, exact_stuffing=False)
+        self.max_ids = max_ids
+
+        # 수신 집계
+        self.error_frames = 0
+        self._message_type = None
+        self._unpacker = None
+
+        # 샘플링 결과
+        self.busload = 0.0
+        self.status = dict.fromkeys(STATUS_BITS, 0)
+        self.status_events = dict.fromkeys(STATUS_BITS, 0)
+        self.samples = 0
+        self.sample_errors = 0
+        self.last_result = 0
+
+        self._labels = f'channel="{can.channel}",backend="{can.backend}"'
+        self._stop = threading.Event()
+        self._sampler = None
+        self._server = None
+        self._server_thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self) -> int:
+        """
+        샘플링 스레드와 HTTP 서버 시작
+
+        Returns:
+            0 성공, 음수 오류 코드
+        """
+        if not self.can.is_initialized:
+            return -95  # CANERR_NOTINIT
+        if self._server is not None:
+            return 0
+
+        if self.instrument and not self.can.stats()['enabled']:
+            self.can.enable_instrumentation()
+            self._enabled_instrumentation = True
+
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._server_thread = threading.Thread(target=self._server.serve_forever,
+                                               name='MetricsExporter-http', daemon=True)
+        self._server_thread.start()
+
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample_loop, name='MetricsExporter-sampler',
+                                         daemon=True)
+        self._sampler.start()
+        return 0
+
+    def stop(self):
+        """샘플링 스레드와 HTTP 서버 중지"""
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server_thread.join()
+            self._server = None
+            self._server_thread = None
+        if self._enabled_instrumentation:
+            self.can.enable_instrumentation(False)
+            self._enabled_instrumentation = False
+
+    def on_message(self, msg) -> bool:
+        """KvaserCAN.monitor() 콜백으로 사용: 메시지를 집계하고 계속 모니터링"""
+        self.update_many((msg,))
+        return True
+
+    def update_many(self, messages: Iterable) -> int:
+        """
+        수신 Message 목록 집계 (subscribe(..., batch=True) 핸들러로도 사용 가능)
+
+        Returns:
+            집계한 메시지 수
+        """
+        update = self.statistics.update_frame
+        count = 0
+        for msg in messages:
+            if type(msg) is not self._message_type:
+                self._message_type = type(msg)
+                self._unpacker, _ = message_unpacker(self._message_type)
+            msg_id, flags, dlc, data, sec, nsec = self._unpacker.unpack_from(msg)
+            if flags & FLAG_STS:
+                self.error_frames += 1
+            else:
+                update(sec + nsec * 1e-9, msg_id, flags & 0x1F, dlc, data)
+            count += 1
+        return count
+
+    def sample(self):
+        """상태/버스 부하 1회 샘플링"""
+        result, load, status = self.can.get_busload()
+        self.samples += 1
+        self.last_result = result
+        if result != 0 or status is None:
+            self.sample_errors += 1
+            return
+
+        self.busload = load
+        bits = status.bits
+        for name in STATUS_BITS:
+            value = getattr(bits, name)
+            self.status[name] = value
+            if value:
+                self.status_events[name] += 1
+
+    def _sample_loop(self):
+        """샘플링 스레드 본체"""
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.sample()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def render(self) -> str:
+        """
+        현재 지표를 Prometheus 텍스트 형식으로 생성
+
+        Returns:
+            지표 텍스트
+        """
+        base = self._labels
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples: Iterable):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for suffix, labels, value in samples:
+                lines.append(f'{name}{suffix}{labels} {value}')
+
+        # 컨트롤러 상태
+        metric('can_busload_percent', 'gauge', 'Bus load reported by the driver.',
+               [('', _labels(base), self.busload)])
+        metric('can_status', 'gauge', 'Controller status flags at the last sample.',
+               [('', _labels(base, flag=name), self.status[name]) for name in STATUS_BITS])
+        metric('can_status_events_total', 'counter', 'Samples in which a status flag was set.',
+               [('', _labels(base, flag=name), self.status_events[name]) for name in STATUS_BITS])
+        metric('can_status_samples_total', 'counter', 'Status samples taken.',
+               [('', _labels(base), self.samples)])
+        metric('can_status_sample_errors_total', 'counter', 'Status samples that returned an error.',
+               [('', _labels(base), self.sample_errors)])
+
+        # 수신 집계
+        snapshot = self.statistics.snapshot(reset_window=False)
+        metric('can_rx_frames_total', 'counter', 'Received data frames.',
+               [('', _labels(base), snapshot['frames'])])
+        metric('can_rx_bits_total', 'counter', 'Bits on the bus for received data frames.',
+               [('', _labels(base), snapshot['bits'])])
+        metric('can_rx_error_frames_total', 'counter', 'Received error/status frames.',
+               [('', _labels(base), self.error_frames)])
+        metric('can_rx_utilisation_percent', 'gauge', 'Average bus utilisation from received frames.',
+               [('', _labels(base), round(snapshot['utilisation'], 4))])
+
+        ids = sorted(snapshot['ids'].items(), key=lambda item: -item[1]['count'])[:self.max_ids]
+        id_labels = [(_labels(base, id=_id_label(key)), stats) for key, stats in ids]
+        metric('can_rx_id_frames_total', 'counter', 'Received frames per CAN ID.',
+               [('', labels, stats['count']) for labels, stats in id_labels])
+        metric('can_rx_id_rate_hz', 'gauge', 'Average receive rate per CAN ID.',
+               [('', labels, round(stats['rate'], 4)) for labels, stats in id_labels])
+        metric('can_rx_id_period_seconds', 'gauge', 'Mean inter-arrival time per CAN ID.',
+               [('', labels, stats['period_mean']) for labels, stats in id_labels])
+
+        # 송신
+        metric('can_tx_frames_total', 'counter', 'Frames accepted by the driver for transmission.',
+               [('', _labels(base), self.can.tx_frames)])
+
+        # 드라이버 계측
+        stats = self.can.stats()
+        if len(stats) > 1:
+            calls = [(name, entry) for name, entry in stats.items() if isinstance(entry, dict)]
+            metric('can_driver_results_total', 'counter', 'Result codes returned per call.',
+                   [('', _labels(base, call=name, result=code), count)
+                    for name, entry in calls for code, count in sorted(entry['results'].items())])
+            samples = []
+            for name, entry in calls:
+                for quantile, key in QUANTILES:
+                    samples.append(('', _labels(base, call=name, quantile=quantile), entry[key]))
+                samples.append(('_sum', _labels(base, call=name), entry['total']))
+                samples.append(('_count', _labels(base, call=name), entry['count']))
+            metric('can_call_duration_seconds', 'summary', 'Duration of instrumented calls.', samples)
+
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict[str, object]:
+        """샘플링 상태 딕셔너리 (HTTP 없이 확인용)"""
+        return {
+            'busload': self.busload,
+            'status': dict(self.status),
+            'status_events': dict(self.status_events),
+            'samples': self.samples,
+            'sample_errors': self.sample_errors,
+            'error_frames': self.error_frames,
+        }
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CAN ID 수신 필터
+
+ID 목록, ID 범위, code/mask 쌍으로 받을 메시지를 지정하면
+표준 ID(11비트)는 2048칸 비트맵으로, 확장 ID(29비트)는 해시 집합으로 컴파일해
+메시지마다 상수 시간에 수락 여부를 판단합니다.
+
+같은 조건을 하드웨어/커널 필터용 code/mask 목록으로도 변환할 수 있어
+백엔드가 지원하면(set_filter) 원하지 않는 메시지가 Python까지 올라오지 않습니다.
+
+사용 예:
+    can.set_filter(ids=[0x2B0, 0x316], ranges=[(0x500, 0x5FF)],
+                   masks=[(0x18DA0000, 0x1FFF0000, True)])
+"""
+from typing import Iterable, List, Optional, Tuple
+
+STD_MASK = 0x7FF
+EXT_MASK = 0x1FFFFFFF
+
+# 확장 ID 범위/마스크를 집합으로 펼칠 최대 ID 수 (넘으면 비교 목록으로 유지)
+EXPAND_LIMIT = 4096
+
+# 확장 ID 판정 결과 캐시 최대 크기
+EXT_CACHE_SIZE = 65536
+
+# 하드웨어/커널 필터로 보낼 최대 code/mask 쌍 수 (SocketCAN CAN_RAW_FILTER_MAX)
+MAX_HARDWARE_FILTERS = 512
+
+
+def _is_extended(can_id: int, extended: Optional[bool]) -> bool:
+    return can_id > STD_MASK if extended is None else bool(extended)
+
+
+def _mask_members(code: int, mask: int, full: int) -> Iterable[int]:
+    """code/mask 쌍과 일치하는 모든 ID (mask에 없는 비트의 모든 조합)"""
+    free = ~mask & full
+    code &= mask & full
+    subset = free
+    while True:
+        yield code | subset
+        if subset == 0:
+            break
+        subset = (subset - 1) & free
+
+
+def _range_blocks(first: int, last: int) -> List[Tuple[int, int]]:
+    """
+    ID 범위를 2의 거듭제곱 크기로 정렬된 블록의 (시작, 크기) 목록으로 분해
+    """
+    blocks = []
+    while first <= last:
+        size = first & -first if first else 1 << 29
+        while first + size - 1 > last:
+            size >>= 1
+        blocks.append((first, size))
+        first += size
+    return blocks
+
+
+class AcceptanceFilter:
+    """
+    컴파일된 CAN ID 수신 필터
+    """
+
+    def __init__(self, ids: Iterable = None, ranges: Iterable = None, masks: Iterable = None):
+        """
+        필터 컴파일
+
+        각 항목의 마지막 원소로 확장 ID 여부(bool)를 줄 수 있으며, 생략하면
+        0x7FF보다 큰 ID(code)를 확장 ID로 봅니다.
+
+        Args:
+            ids: ID 또는 (ID, 확장) 목록
+            ranges: (첫 ID, 마지막 ID[, 확장]) 목록
+            masks: (code, mask[, 확장]) 목록. (ID & mask) == (code & mask)이면 수락
+        """
+        self.std = bytearray(STD_MASK + 1)
+        self.ext_ids = set()
+        self.ext_ranges = []  # type: List[Tuple[int, int]]
+        self.ext_masks = []  # type: List[Tuple[int, int]]
+
+        # 하드웨어 필터 변환용 원본 조건 (code, mask, 확장)
+        self.patterns = []  # type: List[Tuple[int, int, bool]]
+        self._ext_cache = {}
+
+        for item in ids or ():
+            can_id, extended = (item, None) if isinstance(item, int) else item
+            self.add_id(can_id, extended)
+        for item in ranges or ():
+            self.add_range(*item)
+        for item in masks or ():
+            self.add_mask(*item)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def add_id(self, can_id: int, extended: Optional[bool] = None):
+        """ID 1개 추가"""
+        if _is_extended(can_id, extended):
+            self.ext_ids.add(can_id & EXT_MASK)
+            self.patterns.append((can_id & EXT_MASK, EXT_MASK, True))
+            self._ext_cache.clear()
+        else:
+            self.std[can_id & STD_MASK] = 1
+            self.patterns.append((can_id & STD_MASK, STD_MASK, False))
+
+    def add_range(self, first: int, last: int, extended: Optional[bool] = None):
+        """
+        ID 범위 추가 (양 끝 포함)
+
+        extended가 None이고 범위가 0x7FF를 넘어가면 0x7FF까지는 표준 ID 범위,
+        0x800부터는 확장 ID 범위로 나누어 추가합니다.
+        """
+        if first > last:
+            first, last = last, first
+
+        if extended is None and first <= STD_MASK < last:
+            self.add_range(first, STD_MASK, False)
+            self.add_range(STD_MASK + 1, last, True)
+            return
+
+        if _is_extended(last, extended):
+            first, last = first & EXT_MASK, last & EXT_MASK
+            if last - first < EXPAND_LIMIT:
+                self.ext_ids.update(range(first, last + 1))
+            else:
+                self.ext_ranges.append((first, last))
+            self._ext_cache.clear()
+            full, is_ext = EXT_MASK, True
+        else:
+            first, last = first & STD_MASK, last & STD_MASK
+            self.std[first:last + 1] = b'\x01' * (last - first + 1)
+            full, is_ext = STD_MASK, False
+
+        for start, size in _range_blocks(first, last):
+            self.patterns.append((start, full & ~(size - 1), is_ext))
+
+    def add_mask(self, code: int, mask: int, extended: Optional[bool] = None):
+        """code/mask 쌍 추가"""
+        if _is_extended(code, extended):
+            mask &= EXT_MASK
+            if 1 << bin(~mask & EXT_MASK).count('1') <= EXPAND_LIMIT:
+                self.ext_ids.update(_mask_members(code, mask, EXT_MASK))
+            else:
+                self.ext_masks.append((code & mask, mask))
+            self._ext_cache.clear()
+            self.patterns.append((code & mask, mask, True))
+        else:
+            mask &= STD_MASK
+            for can_id in _mask_members(code, mask, STD_MASK):
+                self.std[can_id] = 1
+            self.patterns.append((code & mask, mask, False))
+
+    def accepts(self, can_id: int, extended: bool = False) -> bool:
+        """
+        ID 수락 여부
+
+        Args:
+            can_id: CAN 메시지 ID
+            extended: 확장 ID 여부
+        """
+        if not extended:
+            return self.std[can_id & STD_MASK] == 1
+        return self._accepts_ext(can_id)
+
+    def accepts_message(self, msg) -> bool:
+        """수신 Message 수락 여부"""
+        if msg.flags.xtd:
+            return self._accepts_ext(msg.id)
+        return self.std[msg.id & STD_MASK] == 1
+
+    def _accepts_ext(self, can_id: int) -> bool:
+        if can_id in self.ext_ids:
+            return True
+        if not self.ext_ranges and not self.ext_masks:
+            return False
+
+        cached = self._ext_cache.get(can_id)
+        if cached is not None:
+            return cached
+
+        accepted = any(first <= can_id <= last for first, last in self.ext_ranges) or \
+            any(can_id & mask == code for code, mask in self.ext_masks)
+        if len(self._ext_cache) < EXT_CACHE_SIZE:
+            self._ext_cache[can_id] = accepted
+        return accepted
+
+    def hardware_filters(self, max_filters: int = MAX_HARDWARE_FILTERS) -> Tuple[List[Tuple[int, int, bool]], bool]:
+        """
+        하드웨어/커널 필터용 code/mask 목록
+
+        조건 수가 max_filters 이하이면 조건 그대로(정확한 필터), 넘으면 형식별로
+        모든 조건을 포함하는 가장 좁은 code/mask 하나씩(상위 집합)으로 합칩니다.
+
+        Returns:
+            ([(code, mask, 확장), ...], 정확한 필터 여부) 튜플
+        """
+        if len(self.patterns) <= max_filters:
+            return list(self.patterns), True
+
+        merged = []
+        for is_ext, full in ((False, STD_MASK), (True, EXT_MASK)):
+            pair = _common_code_mask([(c, m) for c, m, e in self.patterns if e == is_ext], full)
+            if pair is not None:
+                merged.append((pair[0], pair[1], is_ext))
+        return merged, False
+
+
+def _common_code_mask(patterns: List[Tuple[int, int]], full: int) -> Optional[Tuple[int, int]]:
+    """모든 code/mask 쌍을 포함하는 가장 좁은 code/mask 하나"""
+    if not patterns:
+        return None
+
+    base = patterns[0][0]
+    mask = full
+    for code, pattern_mask in patterns:
+        mask &= pattern_mask & ~(code ^ base)
+    return base & mask, mask
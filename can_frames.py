@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NumPy 구조화 배열 기반 CAN 프레임 저장
+
+수신한 Message 구조체를 메시지마다 파이썬 리스트로 바꾸지 않고,
+미리 할당한 NumPy 구조화 배열에 그대로 복사합니다.
+분석 코드는 배열 뷰를 받아 수백만 프레임을 벡터 연산으로 처리할 수 있습니다.
+
+배열 필드:
+    timestamp: 수신 시각 (초, float64)
+    id:        CAN 메시지 ID (uint32)
+    flags:     bit0 xtd, bit1 rtr, bit2 fdf, bit3 brs, bit4 esi (uint8)
+    dlc:       DLC (uint8)
+    data:      데이터 바이트 (uint8 x 8, CAN FD이면 x 64)
+
+NumPy는 선택 의존성입니다. 없으면 이 모듈의 기능을 사용할 때 ImportError가 발생합니다.
+"""
+import ctypes
+from typing import Dict, Iterable, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from can_virtual import DLC_TO_LEN
+# flags 필드 비트 (NumPy 없이 쓰는 모듈을 위해 can_virtual에 정의)
+from can_virtual import FLAG_XTD, FLAG_RTR, FLAG_FDF, FLAG_BRS, FLAG_ESI
+
+# Message 타입별 원시 레이아웃 dtype 캐시
+_raw_dtypes = {}  # type: Dict[type, object]
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("NumPy가 설치되어 있지 않습니다: pip install numpy")
+
+
+def frame_dtype(fd: bool = False):
+    """
+    프레임 배열 dtype
+
+    Args:
+        fd: True이면 데이터 필드를 64바이트로 (CAN FD)
+
+    Returns:
+        NumPy 구조화 dtype
+    """
+    _require_numpy()
+    return np.dtype([
+        ('timestamp', '<f8'),
+        ('id', '<u4'),
+        ('flags', 'u1'),
+        ('dlc', 'u1'),
+        ('data', 'u1', (64 if fd else 8,)),
+    ])
+
+
+def new_frame_array(capacity: int, fd: bool = False):
+    """
+    0으로 채운 프레임 배열 생성
+
+    Args:
+        capacity: 프레임 수
+        fd: CAN FD 데이터 폭 사용 여부
+
+    Returns:
+        NumPy 구조화 배열
+    """
+    return np.zeros(capacity, dtype=frame_dtype(fd))
+
+
+def message_dtype(message_type: type):
+    """
+    ctypes Message 구조체와 같은 메모리 레이아웃의 dtype
+
+    필드 오프셋은 구조체 정의에서 읽어오므로 CANAPI 버전에 따라
+    레이아웃이 달라도 그대로 memmove로 복사할 수 있습니다.
+
+    Args:
+        message_type: Message 구조체 클래스
+
+    Returns:
+        NumPy 구조화 dtype
+    """
+    _require_numpy()
+    dtype = _raw_dtypes.get(message_type)
+    if dtype is not None:
+        return dtype
+
+    fields = {field[0]: field[1] for field in message_type._fields_}
+    timestamp_type = fields['timestamp']
+    sec_name, sec_type = timestamp_type._fields_[0][:2]
+    nsec_name, nsec_type = timestamp_type._fields_[1][:2]
+    timestamp_offset = message_type.timestamp.offset
+
+    dtype = np.dtype({
+        'names': ['id', 'flags', 'dlc', 'data', 'sec', 'nsec'],
+        'formats': [
+            f'<u{message_type.id.size}',
+            f'<u{message_type.flags.size}',
+            'u1',
+            ('u1', (message_type.data.size,)),
+            f'<i{ctypes.sizeof(sec_type)}',
+            f'<i{ctypes.sizeof(nsec_type)}',
+        ],
+        'offsets': [
+            message_type.id.offset,
+            message_type.flags.offset,
+            message_type.dlc.offset,
+            message_type.data.offset,
+            timestamp_offset + getattr(timestamp_type, sec_name).offset,
+            timestamp_offset + getattr(timestamp_type, nsec_name).offset,
+        ],
+        'itemsize': ctypes.sizeof(message_type),
+    })
+    _raw_dtypes[message_type] = dtype
+    return dtype
+
+
+class FrameArrayCapture:
+    """
+    미리 할당한 프레임 배열에 수신 메시지를 누적하는 캡처 버퍼
+    """
+
+    def __init__(self, capacity: int = 65536, fd: bool = False, staging: int = 1024):
+        """
+        캡처 버퍼 초기화
+
+        Args:
+            capacity: 저장할 최대 프레임 수
+            fd: CAN FD 데이터 폭(64바이트) 사용 여부
+            staging: Message 원시 복사용 중간 버퍼 크기 (프레임 수)
+        """
+        _require_numpy()
+        self.frames = new_frame_array(capacity, fd)
+        self.capacity = capacity
+        self.count = 0
+        self.dropped = 0
+
+        self._width = self.frames.dtype['data'].shape[0]
+        self._staging_size = staging
+        self._staging = None
+        self._staging_type = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def view(self):
+        """저장된 프레임 뷰 (복사 없음)"""
+        return self.frames[:self.count]
+
+    def clear(self):
+        """저장된 프레임 비우기 (배열은 재사용)"""
+        self.count = 0
+        self.dropped = 0
+
+    def free(self) -> int:
+        """남은 저장 공간 (프레임 수)"""
+        return self.capacity - self.count
+
+    def extend(self, messages: Iterable) -> int:
+        """
+        Message 목록 추가
+
+        Args:
+            messages: 수신한 Message 구조체 목록
+
+        Returns:
+            추가된 프레임 수 (공간이 부족하면 나머지는 dropped에 집계)
+        """
+        added = 0
+        pending = 0
+        staging = None
+        addr = 0
+        size = 0
+        memmove = ctypes.memmove
+        addressof = ctypes.addressof
+
+        for msg in messages:
+            if self.count + added + pending >= self.capacity:
+                self.dropped += 1
+                continue
+
+            if staging is None or type(msg) is not self._staging_type:
+                # Message 타입이 정해지거나 바뀌면 원시 버퍼 준비
+                if pending:
+                    added += self._flush(pending, added)
+                    pending = 0
+                staging = self._prepare_staging(type(msg))
+                addr = staging.ctypes.data
+                size = staging.itemsize
+
+            memmove(addr + pending * size, addressof(msg), size)
+            pending += 1
+            if pending == self._staging_size:
+                added += self._flush(pending, added)
+                pending = 0
+
+        if pending:
+            added += self._flush(pending, added)
+
+        self.count += added
+        return added
+
+    def _prepare_staging(self, message_type: type):
+        if self._staging_type is not message_type:
+            self._staging = np.zeros(self._staging_size, dtype=message_dtype(message_type))
+            self._staging_type = message_type
+        return self._staging
+
+    def _flush(self, pending: int, added: int) -> int:
+        """원시 버퍼의 프레임을 배열 필드로 변환"""
+        raw = self._staging[:pending]
+        start = self.count + added
+        out = self.frames[start:start + pending]
+
+        out['timestamp'] = raw['sec'] + raw['nsec'] * 1e-9
+        out['id'] = raw['id']
+        out['flags'] = raw['flags'] & 0x1F
+        out['dlc'] = raw['dlc']
+        width = min(self._width, raw.dtype['data'].shape[0])
+        out['data'][:, :width] = raw['data'][:, :width]
+        return pending
+
+
+def messages_to_array(messages, fd: bool = False):
+    """
+    Message 목록을 새 프레임 배열로 변환
+
+    Args:
+        messages: Message 구조체 목록 (예: receive_many 결과)
+        fd: CAN FD 데이터 폭 사용 여부
+
+    Returns:
+        NumPy 구조화 배열
+    """
+    messages = list(messages)
+    capture = FrameArrayCapture(capacity=len(messages), fd=fd)
+    capture.extend(messages)
+    return capture.view()
+
+
+def payload_bytes(frames, index: int) -> bytes:
+    """
+    배열의 한 프레임 데이터를 bytes로 가져오기
+
+    Args:
+        frames: 프레임 배열
+        index: 프레임 위치
+
+    Returns:
+        DLC 길이만큼의 데이터
+    """
+    row = frames[index]
+    dlc = int(row['dlc'])
+    length = DLC_TO_LEN[min(dlc, 15)] if row['flags'] & FLAG_FDF else min(dlc, 8)
+    return row['data'][:min(length, row['data'].shape[0])].tobytes()
+
+
+def select_id(frames, can_id: int, extended_id: Optional[bool] = None):
+    """
+    특정 ID의 프레임만 골라내기
+
+    Args:
+        frames: 프레임 배열
+        can_id: CAN 메시지 ID
+        extended_id: None이면 표준/확장 구분 없이, 아니면 해당 형식만
+
+    Returns:
+        조건에 맞는 프레임 배열 (복사본)
+    """
+    mask = frames['id'] == can_id
+    if extended_id is not None:
+        xtd = (frames['flags'] & FLAG_XTD) != 0
+        mask &= xtd if extended_id else ~xtd
+    return frames[mask]
+
+
+def _signal_bytes(data, first: int, last: int, big_endian: bool):
+    """
+    data[:, first..last] 바이트를 uint64 정수 열로 합치기
+
+    big_endian이면 first가 최상위 바이트, 아니면 최하위 바이트
+    """
+    out = np.zeros(data.shape[0], dtype=np.uint64)
+    count = last - first + 1
+    for k in range(count):
+        shift = 8 * (count - 1 - k) if big_endian else 8 * k
+        out |= data[:, first + k].astype(np.uint64) << np.uint64(shift)
+    return out
+
+
+def _signal_raw(data, signal, length: int):
+    """
+    시그널 원시값 열 (uint64) 추출
+
+    Intel은 리틀 엔디언, Motorola는 빅 엔디언 정수 기준 LSB 위치에서
+    시그널이 걸친 바이트만 모아 시프트/마스크합니다.
+    """
+    lsb = signal.lsb_position(length)
+    msb = lsb + signal.length - 1
+    if signal.byte_order == 'little':
+        first, last = lsb // 8, msb // 8
+    else:
+        first, last = length - 1 - msb // 8, length - 1 - lsb // 8
+    if last - first >= 8:
+        raise ValueError(f"{signal.name}: 9바이트에 걸친 시그널은 지원하지 않습니다")
+
+    raw = _signal_bytes(data, first, last, signal.byte_order == 'big')
+    raw >>= np.uint64(lsb % 8)
+    if signal.length < 64:
+        raw &= np.uint64((1 << signal.length) - 1)
+    return raw
+
+
+def decode_signals(frames, message, select: bool = True) -> Dict[str, object]:
+    """
+    프레임 배열에서 DBC 메시지의 모든 시그널을 한 번에 디코딩
+
+    프레임마다 파이썬 디코더를 호출하지 않고 바이트 열에 대한 NumPy
+    비트 연산으로 시그널별 열 배열을 만듭니다. 다중화 시그널은
+    multiplexer 값이 다른 행이 NaN인 float64 열이 됩니다.
+
+    Args:
+        frames: 프레임 배열 (receive_array, LogReader.read_array 결과 등)
+        message: can_dbc.DBCMessage
+        select: True이면 message의 ID/형식과 일치하는 프레임만 골라서 디코딩
+
+    Returns:
+        {'timestamp': float64 열, 시그널 이름: 물리값 열} 딕셔너리
+    """
+    _require_numpy()
+    if select:
+        frames = select_id(frames, message.frame_id, message.extended_id)
+
+    length = message.length
+    data = frames['data']
+    if data.shape[1] < length:
+        data = np.pad(data, ((0, 0), (0, length - data.shape[1])))
+
+    columns = {'timestamp': np.array(frames['timestamp'], dtype=np.float64)}
+    raw_values = {}
+    for signal in message.signals:
+        raw = _signal_raw(data, signal, length)
+        if signal.signed:
+            raw = raw.astype(np.int64)
+            if signal.length < 64:
+                raw -= ((raw >> (signal.length - 1)) & 1) << signal.length
+        raw_values[signal.name] = raw
+
+        if isinstance(signal.scale, int) and isinstance(signal.offset, int):
+            # 정수 스케일/오프셋은 정수 열 유지
+            columns[signal.name] = raw if signal.scale == 1 and signal.offset == 0 else \
+                raw.astype(np.int64) * signal.scale + signal.offset
+        else:
+            columns[signal.name] = raw * float(signal.scale) + float(signal.offset)
+
+    multiplexer = next((signal for signal in message.signals if signal.is_multiplexer), None)
+    if multiplexer is not None:
+        mux = raw_values[multiplexer.name]
+        for signal in message.signals:
+            if signal.multiplexer_id is not None:
+                column = columns[signal.name].astype(np.float64)
+                column[mux != signal.multiplexer_id] = np.nan
+                columns[signal.name] = column
+
+    return columns
+
+
+def columns_to_arrow(columns: Dict[str, object]):
+    """
+    decode_signals 결과를 pyarrow.Table로 변환 (pyarrow 필요, 열은 복사 없이 공유)
+
+    Returns:
+        pyarrow.Table
+    """
+    import pyarrow
+    return pyarrow.table(columns)
+
+
+def write_parquet(columns: Dict[str, object], path: str, compression: str = 'zstd'):
+    """
+    decode_signals 결과를 Parquet 파일로 저장 (pyarrow 필요)
+
+    Args:
+        columns: {열 이름: 배열}
+        path: 저장 경로
+        compression: Parquet 압축 방식
+    """
+    import pyarrow.parquet
+    pyarrow.parquet.write_table(columns_to_arrow(columns), path, compression=compression)
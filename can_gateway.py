@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+채널 간 CAN 게이트웨이
+
+두 KvaserCAN 채널 사이에서 프레임을 묶음 단위로 중계합니다.
+방향마다 전용 스레드가 수신 채널에서 receive_many()로 읽고, 필터와
+ID/데이터 변환 규칙을 적용한 뒤 송신 채널에 send_many()로 보냅니다.
+방향별 필터는 수신 채널의 set_filter()로 설정하므로, 백엔드가 지원하면
+중계하지 않을 프레임은 하드웨어/커널에서 버려집니다.
+
+지표 (방향별):
+    received, forwarded, filtered(변환 규칙이 버린 프레임), dropped(송신 실패), busy_retries
+    fd_rejected: 중계하지 않은 CAN FD 프레임 (send_many()는 CAN 2.0 프레임만 송신)
+    latency: 수신 타임스탬프(벽시계 기반 백엔드) 또는 수신 완료 시각부터
+             송신 완료까지의 지연 p50/p99 (로그 버킷 히스토그램)
+
+사용 예:
+    gateway = CANGateway(powertrain, chassis)
+    gateway.route('a_to_b', ids=[0x2B0, 0x316],
+                  rewrites={0x2B0: RewriteRule(new_id=0x3B0, set_bytes={7: 0x00})})
+    result, replaced = gateway.route('b_to_a', ranges=[(0x500, 0x5FF)])
+    gateway.start()
+    ...
+    gateway.stop()
+    print(gateway.stats())
+"""
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from kvaser_can import KvaserCAN, CANERR_NOERROR, CANERR_RX_EMPTY
+from can_filter import AcceptanceFilter
+from can_instrument import LogHistogram
+from can_scheduler import TimingStats
+from can_virtual import CANERR_TX_BUSY, FLAG_XTD, FLAG_RTR
+
+DIRECTIONS = ('a_to_b', 'b_to_a')
+
+# 수신 타임스탬프를 벽시계로 볼 수 있는 최대 차이 (초)
+WALL_CLOCK_TOLERANCE = 60.0
+
+
+class RewriteRule:
+    """
+    ID/데이터 변환 규칙
+    """
+
+    def __init__(self, new_id: Optional[int] = None, extended_id: Optional[bool] = None,
+                 set_bytes: Optional[Dict[int, int]] = None,
+                 transform: Optional[Callable[[bytes], bytes]] = None):
+        """
+        Args:
+            new_id: 바꿀 ID (None이면 그대로)
+            extended_id: 바꿀 ID 형식 (None이면 그대로)
+            set_bytes: {바이트 위치: 값} 고정 값으로 덮어쓸 바이트
+            transform: 데이터를 받아 새 데이터를 돌려주는 함수 (set_bytes 다음에 적용)
+                       None을 돌려주면 해당 프레임은 중계하지 않음
+        """
+        self.new_id = new_id
+        self.extended_id = extended_id
+        self.set_bytes = sorted((set_bytes or {}).items())
+        self.transform = transform
+
+    def apply(self, msg_id: int, data: bytes, flags: int) -> Optional[Tuple[int, bytes, int]]:
+        """
+        규칙 적용
+
+        Returns:
+            (ID, 데이터, 플래그) 또는 중계하지 않으면 None
+        """
+        if self.new_id is not None:
+            msg_id = self.new_id
+        if self.extended_id is not None:
+            flags = flags | FLAG_XTD if self.extended_id else flags & ~FLAG_XTD
+
+        if self.set_bytes:
+            buffer = bytearray(data)
+            for index, value in self.set_bytes:
+                if index >= len(buffer):
+                    buffer.extend(bytes(index + 1 - len(buffer)))
+                buffer[index] = value
+            data = bytes(buffer)
+        if self.transform is not None:
+            data = self.transform(data)
+            if data is None:
+                return None
+        return msg_id, data, flags
+
+
+class RouteStats:
+    """
+    방향별 중계 지표
+    """
+
+    def __init__(self):
+        self.received = 0
+        self.forwarded = 0
+        self.filtered = 0
+        self.dropped = 0
+        self.busy_retries = 0
+        self.fd_rejected = 0
+        self.batches = 0
+        self.last_result = CANERR_NOERROR
+        self.latency = TimingStats()
+        self.histogram = LogHistogram()
+
+    def add_latency(self, latency: float):
+        """지연(초) 1개 기록"""
+        self.latency.add(latency)
+        self.histogram.record(int(latency * 1e9))
+
+    def percentile(self, fraction: float) -> float:
+        """지연 백분위수 (초, 로그 버킷 상한 기준)"""
+        return self.histogram.percentile(fraction) * 1e-9
+
+    def snapshot(self) -> Dict[str, object]:
+        latency = self.latency.snapshot()
+        latency.update({'p50': self.percentile(0.50), 'p99': self.percentile(0.99)})
+        return {
+            'received': self.received,
+            'forwarded': self.forwarded,
+            'filtered': self.filtered,
+            'dropped': self.dropped,
+            'busy_retries': self.busy_retries,
+            'fd_rejected': self.fd_rejected,
+            'batches': self.batches,
+            'last_result': self.last_result,
+            'latency': latency,
+        }
+
+
+class _Route:
+    """한 방향 중계 설정"""
+
+    def __init__(self, source: KvaserCAN, target: KvaserCAN, rewrites: Dict):
+        self.source = source
+        self.target = target
+        # 키: 표준 ID 그대로, 확장 ID는 bit31을 세운 값
+        self.rewrites = {}  # type: Dict[int, RewriteRule]
+        for key, rule in (rewrites or {}).items():
+            can_id, extended = (key, key > 0x7FF) if isinstance(key, int) else key
+            self.rewrites[can_id | 0x80000000 if extended else can_id] = rule
+        self.stats = RouteStats()
+        self.thread = None
+
+
+class CANGateway:
+    """
+    두 채널 사이 양방향 CAN 게이트웨이
+    """
+
+    def __init__(self, can_a: KvaserCAN, can_b: KvaserCAN, batch_size: int = 256,
+                 busy_timeout: float = 0.01):
+        """
+        게이트웨이 초기화
+
+        Args:
+            can_a: 시작된 KvaserCAN 인스턴스 (채널 A)
+            can_b: 시작된 KvaserCAN 인스턴스 (채널 B)
+            batch_size: 한 번에 수신/송신할 최대 프레임 수
+            busy_timeout: 송신 큐가 가득 찼을 때 재시도할 최대 시간 (초)
+        """
+        self.can_a = can_a
+        self.can_b = can_b
+        self.batch_size = batch_size
+        self.busy_timeout = busy_timeout
+
+        self.routes = {}  # type: Dict[str, _Route]
+        self._stop = threading.Event()
+
+    def route(self, direction: str, ids: Iterable = None, ranges: Iterable = None,
+              masks: Iterable = None, rewrites: Dict = None) -> Tuple[int, Optional[AcceptanceFilter]]:
+        """
+        중계 방향 설정 (start() 전에 호출)
+
+        필터 조건을 하나도 주지 않으면 모든 프레임을 중계합니다. 조건은 수신 채널의
+        set_filter()로 설정되므로 그 채널의 기존 필터를 대체하며, 대체된 필터는
+        반환값으로 알려 줍니다.
+
+        Args:
+            direction: 'a_to_b' 또는 'b_to_a'
+            ids, ranges, masks: 중계할 프레임 (KvaserCAN.set_filter와 같은 형식)
+            rewrites: {ID 또는 (ID, 확장): RewriteRule} 변환 규칙
+
+        Returns:
+            (결과, 대체된 수신 채널의 기존 필터 또는 None) 튜플. 결과는 수신 필터 설정 결과
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"지원하지 않는 방향: {direction} (사용 가능: {', '.join(DIRECTIONS)})")
+
+        source, target = (self.can_a, self.can_b) if direction == 'a_to_b' else (self.can_b, self.can_a)
+        self.routes[direction] = _Route(source, target, rewrites)
+        replaced = source.user_filter
+
+        if ids is None and ranges is None and masks is None:
+            return source.clear_filter(), replaced
+        return source.set_filter(ids=ids, ranges=ranges, masks=masks), replaced
+
+    def start(self) -> int:
+        """
+        방향별 중계 스레드 시작
+
+        Returns:
+            0 성공, 음수 오류 코드
+        """
+        if not self.can_a.is_started or not self.can_b.is_started:
+            return -95  # CANERR_NOTINIT
+
+        self._stop.clear()
+        for direction, route in self.routes.items():
+            if route.thread is None:
+                route.thread = threading.Thread(target=self._forward_loop, args=(route,),
+                                                name=f'CANGateway-{direction}', daemon=True)
+                route.thread.start()
+        return CANERR_NOERROR
+
+    def stop(self):
+        """중계 스레드 중지"""
+        self._stop.set()
+        for route in self.routes.values():
+            if route.thread is not None:
+                route.thread.join()
+                route.thread = None
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        """
+        방향별 중계 지표
+
+        Returns:
+            {방향: 지표} 딕셔너리. 지연 단위는 초
+        """
+        return {direction: route.stats.snapshot() for direction, route in self.routes.items()}
+
+    def _forward_loop(self, route: _Route):
+        """중계 스레드 본체"""
+        stats = route.stats
+        rewrites = route.rewrites
+        receive_many = route.source.receive_many
+        batch_size = self.batch_size
+
+        while not self._stop.is_set():
+            # 중지 요청을 확인할 수 있도록 타임아웃 100ms
+            result, messages = receive_many(max_frames=batch_size, timeout=100)
+            received_at = time.perf_counter()
+            if result != CANERR_NOERROR:
+                if result != CANERR_RX_EMPTY:
+                    stats.last_result = result
+                    time.sleep(0.01)
+                continue
+
+            stats.received += len(messages)
+            stats.batches += 1
+
+            frames = []  # type: List[Tuple[int, bytes, int]]
+            stamps = []  # type: List[float]
+            for msg in messages:
+                flags = msg.flags
+                if flags.fdf:
+                    # 8바이트로 잘라 CAN 2.0 프레임으로 보내지 않고 집계만 함
+                    stats.fd_rejected += 1
+                    continue
+                frame_flags = (FLAG_XTD if flags.xtd else 0) | (FLAG_RTR if flags.rtr else 0)
+                data = bytes(msg.data[:min(msg.dlc, 8)])
+                msg_id = msg.id
+
+                rule = rewrites.get(msg_id | 0x80000000 if flags.xtd else msg_id) if rewrites else None
+                if rule is not None:
+                    frame = rule.apply(msg_id, data, frame_flags)
+                    if frame is None:
+                        stats.filtered += 1
+                        continue
+                    frames.append(frame)
+                else:
+                    frames.append((msg_id, data, frame_flags))
+                stamps.append(msg.timestamp.sec + msg.timestamp.nsec * 1e-9)
+
+            if frames:
+                self._send(route, frames, stamps, received_at)
+
+    def _send(self, route: _Route, frames: List[Tuple[int, bytes, int]], stamps: List[float],
+              received_at: float):
+        """
+        묶음 송신
+
+        송신 큐가 가득 차면 busy_timeout까지 재시도하고, 그동안 한 프레임도 보내지
+        못하면 묶음의 나머지를 모두 dropped로 집계하고 버립니다.
+        """
+        stats = route.stats
+        send_many = route.target.send_many
+        position = 0
+        busy_since = None
+
+        while position < len(frames):
+            result, sent = send_many(frames[position:] if position else frames)
+            if sent:
+                self._record_latency(stats, stamps[position:position + sent], received_at)
+                # 송신 큐가 비워지고 있으므로 재시도 시간을 다시 잼
+                busy_since = None
+            stats.forwarded += sent
+            position += sent
+
+            if result == CANERR_NOERROR:
+                break
+            stats.last_result = result
+            if result == CANERR_TX_BUSY:
+                now = time.perf_counter()
+                if busy_since is None:
+                    busy_since = now
+                if now - busy_since < self.busy_timeout:
+                    stats.busy_retries += 1
+                    time.sleep(0.0001)
+                    continue
+                # 재시도 시간이 지나면 프레임마다 다시 기다리지 않고 나머지를 버림
+                stats.dropped += len(frames) - position
+                break
+            # 다른 오류면 해당 프레임만 버림
+            stats.dropped += 1
+            position += 1
+
+    @staticmethod
+    def _record_latency(stats: RouteStats, stamps: List[float], received_at: float):
+        """송신 완료 시점 기준 지연 기록"""
+        now_wall = time.time()
+        now = time.perf_counter()
+        for stamp in stamps:
+            # 벽시계 기반 수신 타임스탬프면 드라이버 큐 대기까지 포함해 측정
+            if abs(now_wall - stamp) < WALL_CLOCK_TOLERANCE:
+                stats.add_latency(max(0.0, now_wall - stamp))
+            else:
+                stats.add_latency(now - received_at)
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+주기 기반 CAN 침입 탐지
+
+정상 상태 캡처에서 ID별 수신 간격(주기) 기준값을 학습한 뒤, 실행 중에는
+프레임마다 상수 시간으로 다음을 탐지합니다.
+
+    rate        알려진 ID의 간격이 기준 주기보다 연속으로 짧음 (주입/스푸핑, ID2B0_Dos_attack.py 형태)
+    unknown_id  기준값에 없는 ID
+    flood       알려진 가장 높은 우선순위(가장 작은 ID)보다 높은 우선순위 프레임이
+                짧은 구간에 많이 들어옴 (0x000 등 버스 점유 공격)
+    missing     알려진 주기 ID가 오래 들어오지 않음 (check_missing() 호출 시)
+
+판정은 수신 타임스탬프 기준이며, 10ms 주기 ID에 1ms 간격으로 주입하면
+short_count(기본 3)개 간격, 즉 수 ms 안에 경보가 납니다.
+
+사용 예:
+    baseline = learn_baseline(load_frames('clean.kvlog'))
+    baseline.save('baseline.json')
+
+    detector = IntrusionDetector(IDSBaseline.load('baseline.json'), on_alert=print)
+    can.monitor(duration=60, callback=detector.on_message, background=True)
+"""
+import collections
+import json
+import math
+from typing import Callable, Dict, Iterable, List, Optional
+
+from can_log import message_unpacker
+
+# 확장 ID 키 표시 비트
+EXTENDED_KEY = 0x80000000
+
+# 경보 간격 확인용으로 기억하는 최대 (종류, ID) 수 (오래된 것부터 지움)
+MAX_ALERT_MARKERS = 4096
+
+
+def _key(can_id: int, extended: bool) -> int:
+    return can_id | EXTENDED_KEY if extended else can_id
+
+
+def _priority(key: int) -> int:
+    """중재 우선순위 비교값 (작을수록 높음). 같은 상위 11비트면 표준 ID가 이김"""
+    if key & EXTENDED_KEY:
+        can_id = key & 0x1FFFFFFF
+        return ((can_id >> 18) << 19) | (1 << 18) | (can_id & 0x3FFFF)
+    return key << 19
+
+
+class IDSBaseline:
+    """
+    ID별 수신 간격 기준값
+    """
+
+    def __init__(self, periods: Dict[int, Dict[str, float]] = None):
+        """
+        Args:
+            periods: {키: {'count', 'mean', 'stddev', 'min', 'max'}} (키는 확장 ID면 bit31을 세운 ID)
+        """
+        self.periods = periods or {}
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self.periods
+
+    def save(self, path: str):
+        """JSON 파일로 저장"""
+        with open(path, 'w') as stream:
+            json.dump({f'{key:08X}': value for key, value in sorted(self.periods.items())}, stream, indent=1)
+
+    @classmethod
+    def load(cls, path: str) -> 'IDSBaseline':
+        """JSON 파일에서 불러오기"""
+        with open(path, 'r') as stream:
+            data = json.load(stream)
+        return cls({int(key, 16): value for key, value in data.items()})
+
+
+def learn_baseline(frames: Iterable) -> IDSBaseline:
+    """
+    정상 상태 프레임에서 ID별 수신 간격 기준값 학습
+
+    Args:
+        frames: Message 목록 또는 (timestamp 초, id, flags, dlc, data) 튜플 반복자
+                (load_frames, LogReader.read 결과 등)
+
+    Returns:
+        IDSBaseline
+    """
+    last = {}  # type: Dict[int, float]
+    stats = {}  # type: Dict[int, List[float]]
+    message_type = None
+    unpacker = None
+
+    for frame in frames:
+        if isinstance(frame, tuple):
+            timestamp, can_id, flags = frame[0], frame[1], frame[2]
+        else:
+            if type(frame) is not message_type:
+                message_type = type(frame)
+                unpacker, _ = message_unpacker(message_type)
+            can_id, flags, _, _, sec, nsec = unpacker.unpack_from(frame)
+            timestamp = sec + nsec * 1e-9
+
+        key = _key(can_id, bool(flags & 0x01))
+        entry = stats.get(key)
+        if entry is None:
+            # [count, mean, m2, min, max] (간격 기준)
+            stats[key] = [0, 0.0, 0.0, math.inf, 0.0]
+            last[key] = timestamp
+            continue
+
+        period = timestamp - last[key]
+        last[key] = timestamp
+        entry[0] += 1
+        delta = period - entry[1]
+        entry[1] += delta / entry[0]
+        entry[2] += delta * (period - entry[1])
+        entry[3] = min(entry[3], period)
+        entry[4] = max(entry[4], period)
+
+    periods = {}
+    for key, (count, mean, m2, minimum, maximum) in stats.items():
+        periods[key] = {
+            'count': count,
+            'mean': mean,
+            'stddev': math.sqrt(m2 / (count - 1)) if count > 1 else 0.0,
+            'min': minimum if count else 0.0,
+            'max': maximum,
+        }
+    return IDSBaseline(periods)
+
+
+class Alert:
+    """
+    탐지 경보
+    """
+
+    __slots__ = ('kind', 'can_id', 'extended', 'timestamp', 'detail')
+
+    def __init__(self, kind: str, can_id: int, extended: bool, timestamp: float, detail: str = ''):
+        self.kind = kind
+        self.can_id = can_id
+        self.extended = extended
+        self.timestamp = timestamp
+        self.detail = detail
+
+    def __repr__(self) -> str:
+        return f"Alert({self.kind}, 0x{self.can_id:X}, t={self.timestamp:.6f}, {self.detail})"
+
+
+class IntrusionDetector:
+    """
+    스트리밍 침입 탐지기
+    """
+
+    def __init__(self, baseline: IDSBaseline, on_alert: Callable[[Alert], None] = None,
+                 short_ratio: float = 0.6, short_count: int = 3, min_frames: int = 4,
+                 flood_window: float = 0.01, flood_frames: int = 10,
+                 alert_interval: float = 1.0, missing_ratio: float = 5.0, history: int = 1000):
+        """
+        탐지기 초기화
+
+        Args:
+            baseline: 학습한 기준값
+            on_alert: 경보 콜백 (None이면 alerts에만 기록)
+            short_ratio: 기준 평균 주기의 이 비율보다 짧은 간격을 이상 간격으로 봄
+            short_count: 이상 간격이 이만큼 쌓이면 rate 경보 (정상 간격마다 1씩 감소)
+            min_frames: 기준 간격 수가 이보다 적은 ID는 rate 판정 제외
+            flood_window: flood 판정 구간 (초)
+            flood_frames: 구간 안 고우선순위 미등록 프레임이 이 수 이상이면 flood 경보
+            alert_interval: 같은 ID/종류 경보를 다시 내기까지 최소 간격 (초)
+            missing_ratio: 기준 평균 주기의 이 배수 동안 없으면 missing 경보
+            history: alerts에 보관할 최근 경보 수
+        """
+        self.baseline = baseline
+        self.on_alert = on_alert
+        self.short_count = short_count
+        self.flood_window = flood_window
+        self.flood_frames = flood_frames
+        self.alert_interval = alert_interval
+        self.missing_ratio = missing_ratio
+
+        self.alerts = collections.deque(maxlen=history)
+        self.frames = 0
+        self.alert_counts = collections.Counter()
+
+        # 알려진 ID별 상태: 최소 허용 간격, 마지막 수신 시각, 이상 간격 누적
+        self._min_gap = {}  # type: Dict[int, float]
+        self._mean = {}  # type: Dict[int, float]
+        for key, period in baseline.periods.items():
+            self._mean[key] = period['mean']
+            if period['count'] >= min_frames and period['mean'] > 0:
+                self._min_gap[key] = period['mean'] * short_ratio
+        self._last = {}  # type: Dict[int, float]
+        self._short = dict.fromkeys(self._min_gap, 0)
+        # 첫 프레임(또는 첫 check_missing) 시각: 한 번도 들어오지 않은 ID의 기준 시각
+        self._started = None  # type: Optional[float]
+
+        # 알려진 ID 중 가장 높은 우선순위
+        priorities = [_priority(key) for key in baseline.periods]
+        self._top_priority = min(priorities) if priorities else None
+        self._flood_start = 0.0
+        self._flood_count = 0
+
+        # (종류, 키) → 마지막 경보 시각 (최근 경보 순, 최대 MAX_ALERT_MARKERS개)
+        self._alerted = collections.OrderedDict()  # type: Dict[tuple, float]
+        self._message_type = None
+        self._unpacker = None
+
+    def on_message(self, msg) -> bool:
+        """KvaserCAN.monitor() 콜백으로 사용: 메시지를 검사하고 계속 모니터링"""
+        self.update_many((msg,))
+        return True
+
+    def update_many(self, messages: Iterable) -> int:
+        """
+        수신 Message 목록 검사
+
+        Returns:
+            검사한 메시지 수
+        """
+        update = self.update_frame
+        count = 0
+        for msg in messages:
+            if type(msg) is not self._message_type:
+                self._message_type = type(msg)
+                self._unpacker, _ = message_unpacker(self._message_type)
+            can_id, flags, _, _, sec, nsec = self._unpacker.unpack_from(msg)
+            update(sec + nsec * 1e-9, can_id, flags)
+            count += 1
+        return count
+
+    def update_frame(self, timestamp: float, can_id: int, flags: int = 0):
+        """
+        프레임 1개 검사
+
+        Args:
+            timestamp: 수신 시각 (초)
+            can_id: CAN 메시지 ID
+            flags: bit0 xtd (can_frames FLAG_* 비트 조합)
+        """
+        self.frames += 1
+        if self._started is None:
+            self._started = timestamp
+        key = can_id | EXTENDED_KEY if flags & 0x01 else can_id
+
+        min_gap = self._min_gap.get(key)
+        if min_gap is not None:
+            last = self._last.get(key)
+            self._last[key] = timestamp
+            if last is None:
+                return
+            if timestamp - last < min_gap:
+                short = self._short[key] + 1
+                self._short[key] = short
+                if short >= self.short_count:
+                    self._raise('rate', key, timestamp,
+                                f"간격 {(timestamp - last) * 1e3:.3f}ms < 기준 {self._mean[key] * 1e3:.3f}ms")
+            elif self._short[key]:
+                self._short[key] -= 1
+            return
+
+        if key in self._mean:
+            # 기준 간격 수가 적은 알려진 ID
+            self._last[key] = timestamp
+            return
+
+        self._raise('unknown_id', key, timestamp, '기준값에 없는 ID')
+
+        # 알려진 ID보다 높은 우선순위 미등록 프레임 집계
+        if self._top_priority is not None and _priority(key) < self._top_priority:
+            if timestamp - self._flood_start > self.flood_window:
+                self._flood_start = timestamp
+                self._flood_count = 0
+            self._flood_count += 1
+            if self._flood_count >= self.flood_frames:
+                self._raise('flood', key, timestamp,
+                            f"{self.flood_window * 1e3:.0f}ms 동안 고우선순위 프레임 {self._flood_count}개")
+
+    def check_missing(self, now: float) -> List[Alert]:
+        """
+        오래 들어오지 않은 주기 ID 확인 (주기적으로 호출)
+
+        기준값에 있지만 한 번도 들어오지 않은 ID는 첫 프레임 시각부터 잽니다.
+        프레임이 하나도 없으면 첫 호출 시각부터 잽니다.
+
+        Args:
+            now: 현재 시각 (수신 타임스탬프와 같은 기준, 초)
+
+        Returns:
+            이번에 낸 missing 경보 목록
+        """
+        if self._started is None:
+            self._started = now
+        started = self._started
+        last_seen = self._last
+
+        raised = []
+        for key, mean in self._mean.items():
+            last = last_seen.get(key, started)
+            if mean > 0 and now - last > mean * self.missing_ratio:
+                alert = self._raise('missing', key, now, f"{(now - last) * 1e3:.1f}ms 동안 수신 없음")
+                if alert is not None:
+                    raised.append(alert)
+        return raised
+
+    def stats(self) -> Dict[str, object]:
+        """검사 프레임 수와 종류별 경보 수"""
+        return {
+            'frames': self.frames,
+            'alerts': dict(self.alert_counts),
+            'known_ids': len(self._mean),
+        }
+
+    def _raise(self, kind: str, key: int, timestamp: float, detail: str) -> Optional[Alert]:
+        """경보 생성 (같은 종류/ID는 alert_interval마다 한 번)"""
+        marker = (kind, key if kind != 'flood' else None)
+        alerted = self._alerted
+        last = alerted.get(marker)
+        if last is not None and timestamp - last < self.alert_interval:
+            return None
+        alerted[marker] = timestamp
+        alerted.move_to_end(marker)
+        if len(alerted) > MAX_ALERT_MARKERS:
+            alerted.popitem(last=False)
+
+        alert = Alert(kind, key & 0x1FFFFFFF, bool(key & EXTENDED_KEY), timestamp, detail)
+        self.alerts.append(alert)
+        self.alert_counts[kind] += 1
+        if self.on_alert is not None:
+            self.on_alert(alert)
+        return alert
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+송수신 경로 계측
+
+KvaserCAN.enable_instrumentation()으로 켜면 다음 구간의 호출별 소요 시간과
+결과 코드를 로그 버킷 히스토그램(HDR 방식)에 기록합니다.
+
+    send, send_many, receive, receive_many   KvaserCAN 공개 메서드 (ctypes 구조체 준비 포함)
+    driver_read, driver_write                 CANAPI.read / CANAPI.write 호출 자체
+    callback                                  monitor() 콜백 / dispatch() 핸들러 실행
+
+메서드 계측은 인스턴스 속성으로 메서드를 감싸는 방식이라, 끄면 감싼 함수를
+지우고 원래 메서드로 돌아가므로 꺼진 상태에서는 추가 비용이 없습니다.
+receive_many()는 첫 메시지를 receive()로 기다리므로 그 호출은 receive에도 집계됩니다.
+
+사용 예:
+    can.enable_instrumentation()
+    can.monitor(duration=10, callback=handler)
+    print(can.stats()['receive']['p99'])
+"""
+import time
+from typing import Callable, Dict
+
+# 옥타브(2배 구간)마다 나누는 하위 버킷 비트 수 (상대 오차 약 1/2^(SUB_BITS-1))
+SUB_BITS = 7
+HALF_COUNT = 1 << (SUB_BITS - 1)
+# 기록할 수 있는 최대 값 비트 수 (나노초, 2^40ns ≈ 18분)
+MAX_BITS = 40
+BUCKET_COUNT = (MAX_BITS - SUB_BITS + 2) * HALF_COUNT
+
+# 스냅샷에 넣는 백분위수
+PERCENTILES = (('p50', 0.50), ('p90', 0.90), ('p99', 0.99), ('p999', 0.999))
+
+
+class LogHistogram:
+    """
+    나노초 값용 로그 버킷 히스토그램
+
+    2^SUB_BITS 미만은 1ns 단위, 그 이상은 옥타브마다 HALF_COUNT개 버킷으로
+    나누어 값 크기와 관계없이 상대 오차가 일정합니다.
+    """
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, value: int):
+        """값(나노초) 1개 기록"""
+        if value < 0:
+            value = 0
+        shift = value.bit_length() - SUB_BITS
+        if shift > 0:
+            index = (shift << (SUB_BITS - 1)) + (value >> shift)
+            if index >= BUCKET_COUNT:
+                index = BUCKET_COUNT - 1
+        else:
+            index = value
+        self.counts[index] += 1
+
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    @staticmethod
+    def bucket_value(index: int) -> int:
+        """버킷 상한 값 (나노초)"""
+        shift = max(0, index // HALF_COUNT - 1)
+        return ((index - (shift << (SUB_BITS - 1)) + 1) << shift) - 1
+
+    def percentile(self, fraction: float) -> int:
+        """백분위수 (나노초, 버킷 상한 기준)"""
+        if self.count == 0:
+            return 0
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                seen += count
+                if seen >= target:
+                    return min(self.bucket_value(index), self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        """개수와 통계 (초 단위)"""
+        result = {
+            'count': self.count,
+            'total': self.total * 1e-9,
+            'mean': self.total / self.count * 1e-9 if self.count else 0.0,
+            'min': self.min * 1e-9,
+            'max': self.max * 1e-9,
+        }
+        for name, fraction in PERCENTILES:
+            result[name] = self.percentile(fraction) * 1e-9
+        return result
+
+
+class Instrumentation:
+    """
+    구간별 히스토그램과 결과 코드 집계
+    """
+
+    def __init__(self):
+        self.histograms = {}  # type: Dict[str, LogHistogram]
+        self.results = {}  # type: Dict[str, Dict[int, int]]
+        self.started = time.time()
+
+    def histogram(self, name: str) -> LogHistogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LogHistogram()
+            self.results[name] = {}
+        return histogram
+
+    def wrap(self, name: str, function: Callable, results: bool = True) -> Callable:
+        """
+        호출 시간(과 결과 코드)을 기록하는 함수로 감싸기
+
+        Args:
+            name: 구간 이름
+            function: 감쌀 함수
+            results: True이면 반환값(정수 또는 튜플 첫 요소)을 결과 코드로 집계
+        """
+        record = self.histogram(name).record
+        codes = self.results[name]
+        clock = time.perf_counter_ns
+
+        if not results:
+            def timed(*args, **kwargs):
+                start = clock()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    record(clock() - start)
+            return timed
+
+        def timed_result(*args, **kwargs):
+            start = clock()
+            value = function(*args, **kwargs)
+            record(clock() - start)
+            code = value[0] if type(value) is tuple else value
+            codes[code] = codes.get(code, 0) + 1
+            return value
+
+        return timed_result
+
+    def snapshot(self) -> Dict[str, object]:
+        """
+        구간별 통계
+
+        Returns:
+            {'elapsed': 계측 시간, 구간 이름: {'count', 'total', 'mean', 'min', 'max',
+             'p50', 'p90', 'p99', 'p999', 'results': {결과 코드: 횟수}}}. 시간 단위는 초
+        """
+        result = {'elapsed': time.time() - self.started}  # type: Dict[str, object]
+        for name, histogram in self.histograms.items():
+            entry = histogram.snapshot()
+            entry['results'] = dict(self.results[name])
+            result[name] = entry
+        return result
+
+
+class InstrumentedAPI:
+    """
+    CANAPI 인스턴스의 read/write 호출을 계측하는 래퍼 (나머지 속성은 그대로 전달)
+    """
+
+    def __init__(self, api, instrumentation: Instrumentation):
+        self.api = api
+        self.read = instrumentation.wrap('driver_read', api.read)
+        self.write = instrumentation.wrap('driver_write', api.write)
+
+    def __getattr__(self, name: str):
+        return getattr(self.api, name)
+
+
+def unwrap_api(api):
+    """InstrumentedAPI면 원래 API 인스턴스 반환"""
+    return api.api if isinstance(api, InstrumentedAPI) else api
@@ -0,0 +1,885 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CAN 캡처 바이너리 로그
+
+수신 프레임을 메모리에 모았다가 고정 크기 청크 단위로 압축해 기록합니다.
+압축과 파일 쓰기는 별도 스레드에서 하므로 수신 루프를 막지 않습니다.
+청크를 넘길 때도 기다리지 않으며, 디스크가 밀려 대기 청크가 max_pending_chunks에
+이르면 새 청크를 버리고 stats()의 dropped_chunks/dropped_frames로 집계합니다.
+
+파일 구조 (리틀 엔디언):
+    파일 헤더 (16바이트)
+        magic 'KVCANLOG', version u16, record_size u16, reserved 4바이트
+    청크 반복
+        청크 헤더 (40바이트)
+            magic 'CHNK', codec u8, reserved 3바이트, count u32,
+            raw_size u32, stored_size u32, reserved 4바이트,
+            t_first u64, t_last u64 (나노초, 청크 안 레코드의 최소/최대 시각.
+            여러 채널이 한 기록기에 쓰면 레코드 순서와 시각 순서가 다를 수 있음)
+        청크 데이터 (stored_size 바이트, codec으로 압축된 레코드 배열)
+
+레코드 (record_size 바이트, CAN 2.0은 24, CAN FD는 80):
+    timestamp u64 (나노초), id u32, flags u8, dlc u8, 예약 2바이트, data 8/64바이트
+    flags: bit0 xtd, bit1 rtr, bit2 fdf, bit3 brs, bit4 esi (can_frames와 동일)
+
+압축: none, zlib (표준 라이브러리), lz4 / zstd (lz4, zstandard 패키지가 있을 때)
+
+LogReader는 파일을 메모리 매핑하고, 청크별 시간 범위와 ID별 청크 목록을
+사이드카 인덱스 파일('<로그>.idx')로 저장해 필요한 청크만 읽습니다.
+인덱스의 ID 키는 확장 ID에 bit31(EXTENDED_KEY)을 세워 같은 번호의 표준/확장 ID를 구분합니다.
+"""
+import bisect
+import collections
+import ctypes
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from can_virtual import DLC_TO_LEN
+
+LOG_MAGIC = b'KVCANLOG'
+LOG_VERSION = 1
+CHUNK_MAGIC = b'CHNK'
+
+FILE_HEADER = struct.Struct('<8sHH4x')
+CHUNK_HEADER = struct.Struct('<4sB3xIII4xQQ')
+RECORD_HEADER = struct.Struct('<QIBB2x')
+
+INDEX_MAGIC = b'KVCANIDX'
+INDEX_VERSION = 3
+INDEX_HEADER = struct.Struct('<8sHH4xQQII')
+INDEX_CHUNK = struct.Struct('<QB3xIIIQQ')
+INDEX_ID = struct.Struct('<II')
+
+RECORD_SIZE = RECORD_HEADER.size + 8
+RECORD_SIZE_FD = RECORD_HEADER.size + 64
+
+# 인덱스 ID 키의 확장 ID 표시 비트
+EXTENDED_KEY = 0x80000000
+
+# 압축 방식 코드
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_LZ4 = 2
+CODEC_ZSTD = 3
+
+CODECS = {'none': CODEC_NONE, 'zlib': CODEC_ZLIB, 'lz4': CODEC_LZ4, 'zstd': CODEC_ZSTD}
+
+# Message 타입별 언패커 캐시
+_unpackers = {}  # type: Dict[type, Tuple[struct.Struct, int]]
+
+
+def id_key(can_id, extended: Optional[bool] = None) -> int:
+    """
+    LogReader ID 키 생성
+
+    Args:
+        can_id: CAN ID 또는 (ID, 확장 여부) 튜플
+        extended: 확장 ID 여부 (None이면 0x7FF보다 큰 ID를 확장 ID로 봄)
+
+    Returns:
+        확장 ID면 EXTENDED_KEY 비트를 세운 키
+    """
+    if isinstance(can_id, tuple):
+        can_id, extended = can_id
+    if extended is None:
+        extended = can_id > 0x7FF
+    return can_id | EXTENDED_KEY if extended else can_id
+
+
+def available_codecs() -> List[str]:
+    """현재 환경에서 사용할 수 있는 압축 방식 이름 목록"""
+    names = ['none', 'zlib']
+    if lz4_frame is not None:
+        names.append('lz4')
+    if zstandard is not None:
+        names.append('zstd')
+    return names
+
+
+def compress(codec: int, data: bytes, level: int = 1) -> bytes:
+    """청크 데이터 압축"""
+    if codec == CODEC_NONE:
+        return bytes(data)
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data, level)
+    if codec == CODEC_LZ4 and lz4_frame is not None:
+        return lz4_frame.compress(bytes(data), compression_level=level)
+    if codec == CODEC_ZSTD and zstandard is not None:
+        return zstandard.ZstdCompressor(level=level).compress(bytes(data))
+    raise ValueError(f"지원하지 않는 압축 방식: {codec}")
+
+
+def decompress(codec: int, data: bytes, raw_size: int) -> bytes:
+    """청크 데이터 압축 해제"""
+    if codec == CODEC_NONE:
+        return bytes(data)
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    if codec == CODEC_LZ4 and lz4_frame is not None:
+        return lz4_frame.decompress(bytes(data))
+    if codec == CODEC_ZSTD and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(bytes(data), max_output_size=raw_size)
+    raise ValueError(f"지원하지 않는 압축 방식: {codec}")
+
+
+def message_unpacker(message_type: type) -> Tuple[struct.Struct, int]:
+    """
+    ctypes Message 구조체에서 필드를 한 번에 읽는 Struct 생성
+
+    필드 오프셋은 구조체 정의에서 읽으므로 CANAPI 버전과 관계없이 동작합니다.
+
+    Args:
+        message_type: Message 구조체 클래스
+
+    Returns:
+        (Struct, 데이터 폭) 튜플.
+        Struct.unpack_from(msg)은 (id, flags 첫 바이트, dlc, data, sec, nsec)를 돌려줌
+    """
+    cached = _unpackers.get(message_type)
+    if cached is not None:
+        return cached
+
+    fields = {field[0]: field[1] for field in message_type._fields_}
+    timestamp_type = fields['timestamp']
+    sec_name, sec_type = timestamp_type._fields_[0][:2]
+    nsec_name, nsec_type = timestamp_type._fields_[1][:2]
+    timestamp_offset = message_type.timestamp.offset
+    width = message_type.data.size
+    int_codes = {4: 'i', 8: 'q'}
+
+    items = [
+        (message_type.id.offset, 'I', 4),
+        (message_type.flags.offset, 'B', 1),
+        (message_type.dlc.offset, 'B', 1),
+        (message_type.data.offset, f'{width}s', width),
+        (timestamp_offset + getattr(timestamp_type, sec_name).offset,
+         int_codes[ctypes.sizeof(sec_type)], ctypes.sizeof(sec_type)),
+        (timestamp_offset + getattr(timestamp_type, nsec_name).offset,
+         int_codes[ctypes.sizeof(nsec_type)], ctypes.sizeof(nsec_type)),
+    ]
+
+    fmt = '<'
+    position = 0
+    for offset, code, size in items:
+        if offset < position:
+            raise ValueError("Message 필드 순서를 해석할 수 없습니다")
+        if offset > position:
+            fmt += f'{offset - position}x'
+        fmt += code
+        position = offset + size
+
+    cached = (struct.Struct(fmt), width)
+    _unpackers[message_type] = cached
+    return cached
+
+
+class CaptureRecorder:
+    """
+    청크 단위 압축 바이너리 로그 기록기
+    """
+
+    def __init__(self, path: str, fd: bool = False, chunk_frames: int = 4096,
+                 compression: str = 'zlib', level: int = 1, max_pending_chunks: int = 256):
+        """
+        기록기 초기화 (파일 헤더 기록 및 쓰기 스레드 시작)
+
+        Args:
+            path: 로그 파일 경로
+            fd: CAN FD 레코드(데이터 64바이트) 사용 여부
+            chunk_frames: 청크 하나에 담을 프레임 수
+            compression: 압축 방식 ('none', 'zlib', 'lz4', 'zstd')
+            level: 압축 레벨
+            max_pending_chunks: 쓰기 대기열 최대 청크 수 (가득 차면 기록 호출은 기다리지 않고
+                                새 청크를 버림, flush()/close()는 자리가 날 때까지 대기)
+        """
+        if compression not in available_codecs():
+            raise ValueError(f"사용할 수 없는 압축 방식: {compression} (사용 가능: {', '.join(available_codecs())})")
+
+        self.path = path
+        self.fd = fd
+        self.record_size = RECORD_SIZE_FD if fd else RECORD_SIZE
+        self.chunk_frames = chunk_frames
+        self.codec = CODECS[compression]
+        self.level = level
+
+        # 통계
+        self.frames = 0
+        self.chunks = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.dropped_chunks = 0
+        self.dropped_frames = 0
+        self.write_error = None
+
+        self._record = struct.Struct(f'<QIBB2x{self.record_size - RECORD_HEADER.size}s')
+        self._buffer = bytearray(self.record_size * chunk_frames)
+        self._count = 0
+        self._t_first = 0
+        self._t_last = 0
+        self._lock = threading.Lock()
+
+        self._file = open(path, 'wb')
+        self._file.write(FILE_HEADER.pack(LOG_MAGIC, LOG_VERSION, self.record_size))
+
+        # 쓰기 대기 청크 (수신 스레드는 추가만 하고 기다리지 않음, 최대 max_pending_chunks개)
+        self.max_pending_chunks = max(1, max_pending_chunks)
+        self._pending = collections.deque()
+        self._pending_cond = threading.Condition()
+        self._writing = False
+        self._closing = False
+        self._thread = threading.Thread(target=self._writer_loop, name='CaptureRecorder', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, msg) -> None:
+        """수신 메시지 1개 기록"""
+        self.write_many((msg,))
+
+    def write_many(self, messages) -> int:
+        """
+        수신 메시지 여러 개 기록
+
+        Args:
+            messages: Message 구조체 목록 (예: receive_many 결과)
+
+        Returns:
+            기록한 메시지 수
+        """
+        count = 0
+        ready = []
+        with self._lock:
+            unpacker = None
+            message_type = None
+            pack_into = self._record.pack_into
+            record_size = self.record_size
+            buffer = self._buffer
+
+            for msg in messages:
+                if type(msg) is not message_type:
+                    message_type = type(msg)
+                    unpacker, _ = message_unpacker(message_type)
+
+                msg_id, flags, dlc, data, sec, nsec = unpacker.unpack_from(msg)
+                stamp = sec * 1000000000 + nsec
+                pack_into(buffer, self._count * record_size, stamp, msg_id, flags & 0x1F, dlc, data)
+
+                if self._count == 0:
+                    self._t_first = self._t_last = stamp
+                elif stamp < self._t_first:
+                    self._t_first = stamp
+                elif stamp > self._t_last:
+                    self._t_last = stamp
+                self._count += 1
+                count += 1
+
+                if self._count == self.chunk_frames:
+                    ready.append(self._take_chunk_locked())
+
+            self.frames += count
+        for chunk in ready:
+            self._submit(chunk)
+        return count
+
+    def write_frame(self, timestamp: float, msg_id: int, data: bytes, flags: int = 0, dlc: int = None):
+        """
+        Message 구조체 없이 프레임 1개 기록 (변환 도구 등에서 사용)
+
+        Args:
+            timestamp: 수신 시각 (초)
+            msg_id: CAN 메시지 ID
+            data: 데이터 바이트
+            flags: can_frames FLAG_* 비트 조합
+            dlc: DLC (None이면 데이터 길이)
+        """
+        with self._lock:
+            stamp = int(round(timestamp * 1e9))
+            self._record.pack_into(self._buffer, self._count * self.record_size, stamp, msg_id,
+                                   flags & 0x1F, len(data) if dlc is None else dlc, bytes(data))
+            if self._count == 0:
+                self._t_first = self._t_last = stamp
+            elif stamp < self._t_first:
+                self._t_first = stamp
+            elif stamp > self._t_last:
+                self._t_last = stamp
+            self._count += 1
+            self.frames += 1
+            chunk = self._take_chunk_locked() if self._count == self.chunk_frames else None
+        if chunk is not None:
+            self._submit(chunk)
+
+    def on_message(self, msg) -> bool:
+        """KvaserCAN.monitor() 콜백으로 사용: 메시지를 기록하고 계속 모니터링"""
+        self.write_many((msg,))
+        return True
+
+    def record(self, can, duration: float, batch_size: int = 256) -> int:
+        """
+        KvaserCAN 백그라운드 수신으로 지정 시간 동안 기록
+
+        Args:
+            can: 시작된 KvaserCAN 인스턴스
+            duration: 기록 시간 (초)
+            batch_size: 한 번에 꺼낼 최대 메시지 수
+
+        Returns:
+            기록한 메시지 수, 음수면 오류 코드
+        """
+        owns_capture = not can.is_capturing()
+        if owns_capture:
+            result = can.start_capture(batch_size=batch_size)
+            if result != 0:
+                return result
+
+        count = 0
+        end_time = time.time() + duration
+        try:
+            while time.time() < end_time:
+                frames = can.read_capture(max_frames=batch_size, timeout=100)
+                if frames:
+                    count += self.write_many(frames)
+                elif not can.is_capturing():
+                    break
+        finally:
+            if owns_capture:
+                can.stop_capture()
+
+        return count
+
+    def flush(self):
+        """현재 청크를 쓰기 대기열로 넘기고 기록이 끝날 때까지 대기"""
+        with self._lock:
+            chunk = self._take_chunk_locked()
+        if chunk is not None:
+            self._submit(chunk, wait=True)
+        with self._pending_cond:
+            self._pending_cond.wait_for(lambda: not self._pending and not self._writing)
+        self._file.flush()
+
+    def close(self):
+        """남은 프레임을 기록하고 파일 닫기"""
+        if self._file is None:
+            return
+        with self._lock:
+            chunk = self._take_chunk_locked()
+        if chunk is not None:
+            self._submit(chunk, wait=True)
+        with self._pending_cond:
+            self._closing = True
+            self._pending_cond.notify_all()
+        self._thread.join()
+        self._file.close()
+        self._file = None
+
+    def stats(self) -> Dict[str, object]:
+        """기록 통계"""
+        return {
+            'frames': self.frames,
+            'chunks': self.chunks,
+            'pending_chunks': len(self._pending),
+            'dropped_chunks': self.dropped_chunks,
+            'dropped_frames': self.dropped_frames,
+            'raw_bytes': self.raw_bytes,
+            'stored_bytes': self.stored_bytes,
+            'ratio': self.stored_bytes / self.raw_bytes if self.raw_bytes else 0.0,
+            'write_error': self.write_error,
+        }
+
+    def _take_chunk_locked(self):
+        """버퍼의 레코드를 청크로 꺼냄 (잠금 보유 상태, 비어 있으면 None)"""
+        if self._count == 0:
+            return None
+        raw = bytes(self._buffer[:self._count * self.record_size])
+        chunk = (self._count, self._t_first, self._t_last, raw)
+        self._count = 0
+        return chunk
+
+    def _submit(self, chunk, wait: bool = False):
+        """
+        청크를 쓰기 스레드에 넘김 (기록 잠금 밖에서 호출)
+
+        Args:
+            chunk: _take_chunk_locked() 결과
+            wait: False이면 대기열이 가득 찼을 때 청크를 버림, True이면 자리가 날 때까지 대기
+        """
+        pending = self._pending
+        with self._pending_cond:
+            if len(pending) >= self.max_pending_chunks:
+                if not wait:
+                    self.dropped_chunks += 1
+                    self.dropped_frames += chunk[0]
+                    return
+                self._pending_cond.wait_for(lambda: len(pending) < self.max_pending_chunks)
+            pending.append(chunk)
+            self._pending_cond.notify_all()
+
+    def _writer_loop(self):
+        """쓰기 스레드 본체: 청크 압축 후 파일에 기록"""
+        pending = self._pending
+        cond = self._pending_cond
+        while True:
+            with cond:
+                while not pending and not self._closing:
+                    cond.wait()
+                if not pending:
+                    return
+                count, t_first, t_last, raw = pending.popleft()
+                self._writing = True
+
+            try:
+                if self.write_error is not None:
+                    continue
+                stored = compress(self.codec, raw, self.level)
+                header = CHUNK_HEADER.pack(CHUNK_MAGIC, self.codec, count, len(raw), len(stored),
+                                           t_first, t_last)
+                try:
+                    self._file.write(header)
+                    self._file.write(stored)
+                except OSError as error:
+                    self.write_error = error
+                    continue
+                self.chunks += 1
+                self.raw_bytes += len(raw)
+                self.stored_bytes += len(stored)
+            finally:
+                with cond:
+                    self._writing = False
+                    cond.notify_all()
+
+
+def read_file_header(stream) -> int:
+    """
+    파일 헤더 확인
+
+    Returns:
+        레코드 크기
+    """
+    header = stream.read(FILE_HEADER.size)
+    if len(header) < FILE_HEADER.size:
+        raise ValueError("로그 파일 헤더가 없습니다")
+    magic, version, record_size = FILE_HEADER.unpack(header)
+    if magic != LOG_MAGIC:
+        raise ValueError("KvaserCAN 캡처 로그가 아닙니다")
+    if version > LOG_VERSION:
+        raise ValueError(f"지원하지 않는 로그 버전: {version}")
+    return record_size
+
+
+def iter_records(raw: bytes, record_size: int) -> Iterator[Tuple[float, int, int, int, bytes]]:
+    """
+    청크 데이터의 레코드 순회
+
+    Returns:
+        (timestamp 초, id, flags, dlc, data) 튜플 반복자. data는 실제 길이만큼
+    """
+    header = RECORD_HEADER
+    width = record_size - header.size
+    for offset in range(0, len(raw) - record_size + 1, record_size):
+        stamp, msg_id, flags, dlc = header.unpack_from(raw, offset)
+        length = DLC_TO_LEN[min(dlc, 15)] if flags & 0x04 else min(dlc, 8)
+        start = offset + header.size
+        yield stamp / 1e9, msg_id, flags, dlc, raw[start:start + min(length, width)]
+
+
+def read_log(path: str) -> Iterator[Tuple[float, int, int, int, bytes]]:
+    """
+    캡처 로그를 처음부터 순서대로 읽기
+
+    Args:
+        path: 로그 파일 경로
+
+    Returns:
+        (timestamp 초, id, flags, dlc, data) 튜플 반복자
+    """
+    with open(path, 'rb') as stream:
+        record_size = read_file_header(stream)
+        while True:
+            header = stream.read(CHUNK_HEADER.size)
+            if len(header) < CHUNK_HEADER.size:
+                break
+            magic, codec, count, raw_size, stored_size, _, _ = CHUNK_HEADER.unpack(header)
+            if magic != CHUNK_MAGIC:
+                raise ValueError("손상된 청크 헤더")
+            stored = stream.read(stored_size)
+            if len(stored) < stored_size:
+                # 기록 도중 중단된 마지막 청크
+                break
+            yield from iter_records(decompress(codec, stored, raw_size), record_size)
+
+
+class ChunkInfo:
+    """로그 청크 1개의 위치와 시간 범위"""
+
+    __slots__ = ('offset', 'codec', 'count', 'raw_size', 'stored_size', 't_first', 't_last')
+
+    def __init__(self, offset: int, codec: int, count: int, raw_size: int, stored_size: int,
+                 t_first: int, t_last: int):
+        self.offset = offset
+        self.codec = codec
+        self.count = count
+        self.raw_size = raw_size
+        self.stored_size = stored_size
+        self.t_first = t_first
+        self.t_last = t_last
+
+
+class LogReader:
+    """
+    메모리 매핑 캡처 로그 리더 (시간/ID 인덱스 사용)
+
+    사용 예:
+        with LogReader('capture.kvlog') as log:
+            for timestamp, msg_id, flags, dlc, data in log.read(ids=[0x2B0], t0=t, t1=t + 10):
+                ...
+
+    ids 인자의 ID는 정수(0x7FF보다 크면 확장 ID) 또는 (ID, 확장 여부) 튜플입니다.
+    """
+
+    def __init__(self, path: str, index_path: str = None, save_index: bool = True):
+        """
+        로그 열기 및 인덱스 불러오기 (없거나 오래되었으면 새로 생성)
+
+        Args:
+            path: 로그 파일 경로
+            index_path: 인덱스 파일 경로 (None이면 '<로그>.idx')
+            save_index: 새로 만든 인덱스를 파일로 저장할지 여부
+        """
+        self.path = path
+        self.index_path = index_path or path + '.idx'
+
+        self.chunks = []  # type: List[ChunkInfo]
+        self.id_chunks = {}  # type: Dict[int, List[int]]  (id_key → 청크 번호)
+
+        self._map = None
+        self._file = open(path, 'rb')
+        try:
+            self.record_size = read_file_header(self._file)
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            stat = os.fstat(self._file.fileno())
+            self._file_size = stat.st_size
+            self._file_mtime = stat.st_mtime_ns
+
+            if not self._load_index():
+                self._build_index()
+                if save_index:
+                    self.save_index()
+        except BaseException:
+            self.close()
+            raise
+
+        # 청크 시간 범위의 시작과 끝이 모두 파일 순서대로 늘어날 때만 이분 탐색/조기 종료
+        chunks = self.chunks
+        self._chunk_last = [chunk.t_last for chunk in chunks]
+        self._sorted = all(chunks[i].t_first <= chunks[i + 1].t_first and
+                           chunks[i].t_last <= chunks[i + 1].t_last
+                           for i in range(len(chunks) - 1))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(chunk.count for chunk in self.chunks)
+
+    def close(self):
+        """매핑과 파일 닫기"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def ids(self) -> List[Tuple[int, bool]]:
+        """로그에 들어 있는 (CAN ID, 확장 여부) 목록"""
+        return [(key & 0x1FFFFFFF, bool(key & EXTENDED_KEY)) for key in sorted(self.id_chunks)]
+
+    def time_range(self) -> Tuple[float, float]:
+        """로그의 첫/마지막 프레임 시각 (초)"""
+        if not self.chunks:
+            return 0.0, 0.0
+        return (min(chunk.t_first for chunk in self.chunks) / 1e9,
+                max(chunk.t_last for chunk in self.chunks) / 1e9)
+
+    def select_chunks(self, ids: Optional[List[int]] = None, t0: Optional[float] = None,
+                      t1: Optional[float] = None) -> List[int]:
+        """
+        조건에 맞는 프레임이 있을 수 있는 청크 번호
+
+        Args:
+            ids: CAN ID 또는 (ID, 확장 여부) 목록 (None이면 전체)
+            t0: 시작 시각 (초, None이면 처음부터)
+            t1: 끝 시각 (초, None이면 끝까지)
+
+        Returns:
+            청크 번호 리스트 (파일 순서)
+        """
+        lo = None if t0 is None else int(t0 * 1e9)
+        hi = None if t1 is None else int(t1 * 1e9)
+
+        if ids is None:
+            candidates = range(len(self.chunks))
+            if self._sorted and lo is not None:
+                # 청크가 시간순이면 t_last로 시작 청크를 이분 탐색
+                start = bisect.bisect_left(self._chunk_last, lo)
+                candidates = range(start, len(self.chunks))
+        else:
+            selected = set()
+            for can_id in ids:
+                selected.update(self.id_chunks.get(id_key(can_id), ()))
+            candidates = sorted(selected)
+
+        chunks = self.chunks
+        result = []
+        for index in candidates:
+            chunk = chunks[index]
+            if hi is not None and chunk.t_first > hi:
+                if self._sorted and ids is None:
+                    break
+                continue
+            if lo is not None and chunk.t_last < lo:
+                continue
+            result.append(index)
+        return result
+
+    def chunk_data(self, index: int) -> bytes:
+        """
+        청크의 레코드 데이터
+
+        압축하지 않은 청크도 복사본을 반환하므로, 돌려받은 데이터가 남아 있어도
+        close()로 매핑을 닫을 수 있습니다.
+        """
+        chunk = self.chunks[index]
+        with memoryview(self._map) as view:
+            stored = view[chunk.offset:chunk.offset + chunk.stored_size]
+            try:
+                return decompress(chunk.codec, stored, chunk.raw_size)
+            finally:
+                stored.release()
+
+    def read(self, ids: Optional[List[int]] = None, t0: Optional[float] = None,
+             t1: Optional[float] = None) -> Iterator[Tuple[float, int, int, int, bytes]]:
+        """
+        조건에 맞는 프레임 읽기 (관련 청크만 접근)
+
+        Args:
+            ids: CAN ID 또는 (ID, 확장 여부) 목록 (None이면 전체)
+            t0: 시작 시각 (초, 포함)
+            t1: 끝 시각 (초, 포함)
+
+        Returns:
+            (timestamp 초, id, flags, dlc, data) 튜플 반복자
+        """
+        wanted = None if ids is None else {id_key(can_id) for can_id in ids}
+        for index in self.select_chunks(ids, t0, t1):
+            for record in iter_records(self.chunk_data(index), self.record_size):
+                if wanted is not None and (record[1] | EXTENDED_KEY if record[2] & 0x01
+                                           else record[1]) not in wanted:
+                    continue
+                if t0 is not None and record[0] < t0:
+                    continue
+                if t1 is not None and record[0] > t1:
+                    continue
+                yield record
+
+    def read_array(self, ids: Optional[List[int]] = None, t0: Optional[float] = None,
+                   t1: Optional[float] = None):
+        """
+        조건에 맞는 프레임을 can_frames 형식 NumPy 배열로 읽기 (NumPy 필요)
+
+        Returns:
+            timestamp, id, flags, dlc, data 필드를 가진 구조화 배열
+        """
+        if np is None:
+            raise ImportError("NumPy가 설치되어 있지 않습니다: pip install numpy")
+
+        from can_frames import frame_dtype
+
+        record_dtype = self.record_dtype()
+        wanted = None if ids is None else np.asarray(sorted(id_key(can_id) for can_id in ids),
+                                                     dtype='<u4')
+        parts = []
+        for index in self.select_chunks(ids, t0, t1):
+            records = np.frombuffer(self.chunk_data(index), dtype=record_dtype)
+            mask = np.ones(len(records), dtype=bool)
+            if wanted is not None:
+                mask &= np.isin(self._record_keys(records), wanted)
+            if t0 is not None:
+                mask &= records['timestamp'] >= int(t0 * 1e9)
+            if t1 is not None:
+                mask &= records['timestamp'] <= int(t1 * 1e9)
+            parts.append(records[mask])
+
+        width = self.record_size - RECORD_HEADER.size
+        out = np.zeros(sum(len(part) for part in parts), dtype=frame_dtype(width > 8))
+        position = 0
+        for part in parts:
+            rows = out[position:position + len(part)]
+            rows['timestamp'] = part['timestamp'] / 1e9
+            rows['id'] = part['id']
+            rows['flags'] = part['flags']
+            rows['dlc'] = part['dlc']
+            rows['data'] = part['data']
+            position += len(part)
+        return out
+
+    def record_dtype(self):
+        """로그 레코드와 같은 레이아웃의 NumPy dtype"""
+        return np.dtype([
+            ('timestamp', '<u8'),
+            ('id', '<u4'),
+            ('flags', 'u1'),
+            ('dlc', 'u1'),
+            ('_reserved', 'u1', (2,)),
+            ('data', 'u1', (self.record_size - RECORD_HEADER.size,)),
+        ])
+
+    def save_index(self):
+        """인덱스를 사이드카 파일로 저장"""
+        parts = [INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self.record_size,
+                                   self._file_size, self._file_mtime,
+                                   len(self.chunks), len(self.id_chunks))]
+        for chunk in self.chunks:
+            parts.append(INDEX_CHUNK.pack(chunk.offset, chunk.codec, chunk.count, chunk.raw_size,
+                                          chunk.stored_size, chunk.t_first, chunk.t_last))
+        for can_id in sorted(self.id_chunks):
+            chunk_list = self.id_chunks[can_id]
+            parts.append(INDEX_ID.pack(can_id, len(chunk_list)))
+            parts.append(struct.pack(f'<{len(chunk_list)}I', *chunk_list))
+
+        # 쓰는 도중 중단되어도 기존 인덱스가 깨지지 않도록 임시 파일 후 교체
+        temp_path = self.index_path + '.tmp'
+        try:
+            with open(temp_path, 'wb') as stream:
+                stream.write(b''.join(parts))
+            os.replace(temp_path, self.index_path)
+        except OSError:
+            # 읽기 전용 위치 등: 인덱스는 메모리에만 유지
+            pass
+
+    def _load_index(self) -> bool:
+        """사이드카 인덱스 불러오기 (로그 크기/수정 시각이 다르면 무시)"""
+        try:
+            with open(self.index_path, 'rb') as stream:
+                data = stream.read()
+        except OSError:
+            return False
+
+        try:
+            magic, version, record_size, file_size, file_mtime, n_chunks, n_ids = \
+                INDEX_HEADER.unpack_from(data, 0)
+            if (magic != INDEX_MAGIC or version != INDEX_VERSION or record_size != self.record_size
+                    or file_size != self._file_size or file_mtime != self._file_mtime):
+                return False
+
+            offset = INDEX_HEADER.size
+            chunks = []
+            for _ in range(n_chunks):
+                chunks.append(ChunkInfo(*INDEX_CHUNK.unpack_from(data, offset)))
+                offset += INDEX_CHUNK.size
+
+            id_chunks = {}
+            for _ in range(n_ids):
+                can_id, count = INDEX_ID.unpack_from(data, offset)
+                offset += INDEX_ID.size
+                id_chunks[can_id] = list(struct.unpack_from(f'<{count}I', data, offset))
+                offset += 4 * count
+        except struct.error:
+            return False
+
+        self.chunks = chunks
+        self.id_chunks = id_chunks
+        return True
+
+    def _build_index(self):
+        """로그 전체를 한 번 훑어 청크 표와 ID별 청크 목록 생성"""
+        data = self._map
+        offset = FILE_HEADER.size
+        chunks = []
+        id_chunks = {}
+
+        while offset + CHUNK_HEADER.size <= len(data):
+            magic, codec, count, raw_size, stored_size, t_first, t_last = \
+                CHUNK_HEADER.unpack_from(data, offset)
+            if magic != CHUNK_MAGIC:
+                raise ValueError(f"손상된 청크 헤더 (오프셋 {offset})")
+            start = offset + CHUNK_HEADER.size
+            if start + stored_size > len(data):
+                # 기록 도중 중단된 마지막 청크
+                break
+
+            with memoryview(data) as view:
+                stored = view[start:start + stored_size]
+                try:
+                    raw = decompress(codec, stored, raw_size)
+                finally:
+                    stored.release()
+
+            # 헤더 대신 레코드에서 실제 최소/최대 시각을 계산 (이전 기록기는 첫/마지막 시각을 저장)
+            keys, t_min, t_max = self._scan_chunk(raw)
+            index = len(chunks)
+            chunks.append(ChunkInfo(start, codec, count, raw_size, stored_size,
+                                    t_first if t_min is None else t_min,
+                                    t_last if t_max is None else t_max))
+            for key in keys:
+                id_chunks.setdefault(key, []).append(index)
+
+            offset = start + stored_size
+
+        self.chunks = chunks
+        self.id_chunks = id_chunks
+
+    @staticmethod
+    def _record_keys(records):
+        """레코드 배열의 ID 키 배열 (확장 ID는 EXTENDED_KEY 비트 포함)"""
+        return records['id'] | ((records['flags'] & 0x01).astype('<u4') << 31)
+
+    def _scan_chunk(self, raw) -> Tuple[set, Optional[int], Optional[int]]:
+        """청크 레코드의 ID 키 집합과 최소/최대 시각 (레코드가 없으면 시각은 None)"""
+        if np is not None:
+            records = np.frombuffer(raw, dtype=self.record_dtype())
+            if len(records) == 0:
+                return set(), None, None
+            stamps = records['timestamp']
+            return (set(np.unique(self._record_keys(records)).tolist()),
+                    int(stamps.min()), int(stamps.max()))
+
+        unpack_from = RECORD_HEADER.unpack_from
+        keys = set()
+        t_min = t_max = None
+        for offset in range(0, len(raw) - self.record_size + 1, self.record_size):
+            stamp, can_id, flags, _ = unpack_from(raw, offset)
+            keys.add(can_id | EXTENDED_KEY if flags & 0x01 else can_id)
+            if t_min is None or stamp < t_min:
+                t_min = stamp
+            if t_max is None or stamp > t_max:
+                t_max = stamp
+        return keys, t_min, t_max
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+다중 채널 동시 수신
+
+여러 CAN 채널(예: 파워트레인 + 섀시)을 한꺼번에 열고 채널마다 수신기를 하나씩
+실행한 뒤, 각 채널의 수신 스트림을 타임스탬프 순서의 단일 스트림으로 합칩니다.
+
+수신기:
+    mode='thread'  채널마다 KvaserCAN 백그라운드 수신 스레드 + 링 버퍼
+    mode='process' 채널마다 별도 프로세스 (GIL이 병목일 때).
+                   프레임은 (timestamp, id, flags, dlc, data) 튜플 묶음으로 전달
+    mode='shm'     채널마다 별도 프로세스가 공유 메모리 링(can_shmring)에 기록.
+                   피클링이 없고, 다른 소비 프로세스도 ring_names()의 이름으로
+                   같은 링에 붙어 읽을 수 있음
+
+병합은 채널별 선두 프레임만 담는 힙(k-way merge)으로 하며, 채널별 대기 프레임은
+링 버퍼/큐 크기로 제한됩니다. 모든 채널에 대기 프레임이 있을 때만 가장 이른
+프레임을 내보내고, 조용한 채널 때문에 max_delay(초)보다 오래 기다리지는 않습니다.
+
+사용 예:
+    bus = MultiChannelBus([0, 1], bitrate_index=-2)
+    bus.open()
+    for channel, msg in bus:
+        print(channel, hex(msg.id))
+"""
+import collections
+import heapq
+import itertools
+import multiprocessing
+import queue
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from kvaser_can import KvaserCAN, Message, CANERR_NOERROR, CANERR_RX_EMPTY
+from can_shmring import SharedFrameRing, capture_to_ring
+
+MODES = ('thread', 'process', 'shm')
+
+# 프로세스 수신기 시작 결과를 기다릴 최대 시간 (초)
+PROCESS_START_TIMEOUT = 5.0
+
+
+def _message_time(msg) -> float:
+    return msg.timestamp.sec + msg.timestamp.nsec * 1e-9
+
+
+def _to_message(frame: Tuple[float, int, int, int, bytes]) -> Message:
+    """프로세스 수신기가 보낸 튜플을 Message로 변환"""
+    timestamp, msg_id, flags, dlc, data = frame
+    msg = Message()
+    msg.id = msg_id
+    msg.flags.xtd = flags & 0x01
+    msg.flags.rtr = (flags >> 1) & 0x01
+    msg.flags.fdf = (flags >> 2) & 0x01
+    msg.flags.brs = (flags >> 3) & 0x01
+    msg.flags.esi = (flags >> 4) & 0x01
+    msg.dlc = dlc
+    msg.data[:len(data)] = data
+    msg.timestamp.sec = int(timestamp)
+    msg.timestamp.nsec = int((timestamp - int(timestamp)) * 1e9)
+    return msg
+
+
+def _process_reader(channel: int, backend: str, lib_name: Optional[str], bitrate_index: int,
+                    monitor_mode: bool, frames: multiprocessing.Queue, stop, batch_size: int):
+    """
+    프로세스 수신기 본체
+
+    첫 항목으로 open/start 결과 코드를, 이후 프레임 튜플 리스트를, 끝나면 None을 보냅니다.
+    """
+    can = KvaserCAN(lib_name=lib_name, backend=backend)
+    result = can.open(channel=channel, monitor_mode=monitor_mode)
+    if result == CANERR_NOERROR:
+        result = can.start(bitrate_index=bitrate_index)
+    frames.put(result)
+
+    try:
+        while result == CANERR_NOERROR and not stop.is_set():
+            result, messages = can.receive_many(max_frames=batch_size, timeout=100)
+            if result == CANERR_RX_EMPTY:
+                result = CANERR_NOERROR
+                continue
+            if result != CANERR_NOERROR:
+                break
+
+            batch = [(_message_time(msg), msg.id,
+                      msg.flags.xtd | msg.flags.rtr << 1 | msg.flags.fdf << 2 |
+                      msg.flags.brs << 3 | msg.flags.esi << 4,
+                      msg.dlc, bytes(msg.data[:64 if msg.flags.fdf else 8]))
+                     for msg in messages]
+            # 큐가 가득 차면 드라이버 큐 쪽으로 역압 (중지 요청은 계속 확인)
+            while not stop.is_set():
+                try:
+                    frames.put(batch, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+    finally:
+        can.close()
+        frames.put(None)
+
+
+class _ThreadSource:
+    """KvaserCAN 백그라운드 수신 스레드 기반 채널 수신기"""
+
+    def __init__(self, channel: int, bus: 'MultiChannelBus'):
+        self.channel = channel
+        self.can = KvaserCAN(lib_name=bus.lib_name, backend=bus.backend)
+        self.finished = False
+        self._bus = bus
+
+    def start(self) -> int:
+        bus = self._bus
+        result = self.can.open(channel=self.channel, monitor_mode=bus.monitor_mode)
+        if result == CANERR_NOERROR:
+            result = self.can.start(bitrate_index=bus.bitrate_index)
+        if result == CANERR_NOERROR:
+            result = self.can.start_capture(buffer_size=bus.buffer_size, batch_size=bus.batch_size)
+        return result
+
+    def pull(self, max_items: int) -> List[Message]:
+        buffer = self.can.capture_buffer
+        messages = buffer.pop_many(max_items=max_items, timeout=0)
+        if not messages and not self.can.is_capturing() and len(buffer) == 0:
+            self.finished = True
+        return messages
+
+    def dropped(self) -> int:
+        buffer = self.can.capture_buffer
+        return buffer.dropped if buffer is not None else 0
+
+    def stop(self):
+        self.can.close()
+
+
+class _ProcessSource:
+    """별도 프로세스 채널 수신기"""
+
+    def __init__(self, channel: int, bus: 'MultiChannelBus'):
+        self.channel = channel
+        self.finished = False
+        self._bus = bus
+        self._context = multiprocessing.get_context()
+        self._queue = self._context.Queue(maxsize=max(1, bus.buffer_size // bus.batch_size))
+        self._stop = self._context.Event()
+        self._process = None
+
+    def start(self) -> int:
+        bus = self._bus
+        self._process = self._context.Process(
+            target=_process_reader,
+            args=(self.channel, bus.backend, bus.lib_name, bus.bitrate_index, bus.monitor_mode,
+                  self._queue, self._stop, bus.batch_size),
+            name=f'MultiChannelBus-{self.channel}',
+            daemon=True
+        )
+        self._process.start()
+
+        try:
+            return self._queue.get(timeout=PROCESS_START_TIMEOUT)
+        except queue.Empty:
+            return -95  # CANERR_NOTINIT
+
+    def pull(self, max_items: int) -> List[Message]:
+        messages = []
+        while len(messages) < max_items:
+            try:
+                batch = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if batch is None:
+                self.finished = True
+                break
+            messages.extend(_to_message(frame) for frame in batch)
+        return messages
+
+    def dropped(self) -> int:
+        return 0
+
+    def stop(self):
+        if self._process is None:
+            return
+        self._stop.set()
+        # 프로세스가 큐에 넣다 막히지 않도록 남은 항목 비우기
+        deadline = time.monotonic() + PROCESS_START_TIMEOUT
+        while self._process.is_alive() and time.monotonic() < deadline:
+            try:
+                self._queue.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        self._process.join(timeout=1.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+
+
+class _SharedMemorySource:
+    """공유 메모리 링에 기록하는 별도 프로세스 채널 수신기"""
+
+    def __init__(self, channel: int, bus: 'MultiChannelBus'):
+        self.channel = channel
+        self.finished = False
+        self._bus = bus
+        self._context = multiprocessing.get_context()
+        self._stop = self._context.Event()
+        self._process = None
+
+        self.ring = SharedFrameRing.create(capacity=bus.buffer_size)
+        self._reader = self.ring.reader(from_oldest=True)
+
+    def start(self) -> int:
+        bus = self._bus
+        status = self._context.Queue()
+        self._process = self._context.Process(
+            target=capture_to_ring,
+            args=(self.channel, self.ring.name, bus.backend, bus.lib_name, bus.bitrate_index,
+                  bus.monitor_mode, self._stop, status, bus.batch_size),
+            name=f'MultiChannelBus-{self.channel}',
+            daemon=True
+        )
+        self._process.start()
+
+        try:
+            return status.get(timeout=PROCESS_START_TIMEOUT)
+        except queue.Empty:
+            return -95  # CANERR_NOTINIT
+
+    def pull(self, max_items: int) -> List[Message]:
+        messages = [_to_message(frame) for frame in self._reader.read(max_items)]
+        if not messages and self._reader.finished():
+            self.finished = True
+        return messages
+
+    def dropped(self) -> int:
+        return self._reader.lost
+
+    def stop(self):
+        if self._process is not None:
+            self._stop.set()
+            self._process.join(timeout=PROCESS_START_TIMEOUT)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        self.ring.close()
+
+
+class MultiChannelBus:
+    """
+    여러 채널을 동시에 수신해 타임스탬프 순서로 병합
+    """
+
+    def __init__(self, channels: List[int], backend: str = 'kvaser', lib_name: str = None,
+                 bitrate_index: int = -3, monitor_mode: bool = False, mode: str = 'thread',
+                 buffer_size: int = 4096, batch_size: int = 256, max_delay: float = 0.05):
+        """
+        다중 채널 수신기 초기화
+
+        Args:
+            channels: 채널 번호 목록 (scan_channels() 결과 등)
+            backend: KvaserCAN 백엔드 이름
+            lib_name: KvaserCAN lib_name
+            bitrate_index: 모든 채널에 사용할 비트레이트 인덱스
+            monitor_mode: 모니터 모드로 열기
+            mode: 'thread', 'process' 또는 'shm'
+            buffer_size: 채널별 최대 대기 프레임 수 (링 버퍼 크기 / 큐 용량 / 공유 메모리 링 크기)
+            batch_size: 수신기가 한 번에 읽는 최대 메시지 수
+            max_delay: 다른 채널의 프레임을 기다리는 최대 시간 (초)
+        """
+        if mode not in MODES:
+            raise ValueError(f"지원하지 않는 수신 방식: {mode} (사용 가능: {', '.join(MODES)})")
+
+        self.channels = list(channels)
+        self.backend = backend
+        self.lib_name = lib_name
+        self.bitrate_index = bitrate_index
+        self.monitor_mode = monitor_mode
+        self.mode = mode
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+
+        self.sources = []  # type: List[object]
+        self.merged = 0
+
+        self._heap = []
+        self._pending = []  # type: List[collections.deque]
+        self._in_heap = []  # type: List[bool]
+        self._seq = itertools.count()
+
+    def open(self) -> int:
+        """
+        모든 채널 열기 및 수신 시작
+
+        Returns:
+            0 성공, 음수 오류 코드 (한 채널이라도 실패하면 모두 닫음)
+        """
+        if self.sources:
+            return CANERR_NOERROR
+
+        source_type = {'thread': _ThreadSource, 'process': _ProcessSource,
+                       'shm': _SharedMemorySource}[self.mode]
+        for channel in self.channels:
+            source = source_type(channel, self)
+            self.sources.append(source)
+            result = source.start()
+            if result != CANERR_NOERROR:
+                self.close()
+                return result
+
+        self._heap = []
+        self._pending = [collections.deque() for _ in self.sources]
+        self._in_heap = [False] * len(self.sources)
+        return CANERR_NOERROR
+
+    def close(self):
+        """모든 채널 수신 중지 및 닫기"""
+        for source in self.sources:
+            source.stop()
+        self.sources = []
+        self._heap = []
+        self._pending = []
+        self._in_heap = []
+
+    def __enter__(self) -> 'MultiChannelBus':
+        result = self.open()
+        if result != CANERR_NOERROR:
+            raise OSError(f"채널 열기 실패: {result}")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __iter__(self) -> Iterator[Tuple[int, Message]]:
+        """(채널, 메시지)를 타임스탬프 순서로 계속 수신 (모든 수신기가 끝나면 종료)"""
+        while self.sources:
+            frames = self.read(timeout=100)
+            if not frames and all(source.finished for source in self.sources):
+                return
+            yield from frames
+
+    def read(self, max_frames: int = 256, timeout: int = 1000) -> List[Tuple[int, Message]]:
+        """
+        병합된 메시지 읽기
+
+        Args:
+            max_frames: 최대 메시지 수
+            timeout: 메시지가 없을 때 대기할 시간 (밀리초)
+
+        Returns:
+            (채널, 메시지) 리스트 (타임스탬프 순서)
+        """
+        heap = self._heap
+        out = []
+        deadline = time.perf_counter() + timeout / 1000.0
+
+        while len(out) < max_frames:
+            self._fill()
+            if heap:
+                _, _, arrival, index, msg = heap[0]
+                if self._complete() or time.perf_counter() - arrival >= self.max_delay:
+                    heapq.heappop(heap)
+                    self._in_heap[index] = False
+                    self._push_head(index)
+                    out.append((self.sources[index].channel, msg))
+                    continue
+
+            if out:
+                break
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, self.max_delay / 4, 0.001))
+
+        self.merged += len(out)
+        return out
+
+    def ring_names(self):
+        """
+        mode='shm'에서 채널별 공유 메모리 링 이름
+
+        다른 프로세스는 SharedFrameRing.attach(이름).reader()로 같은 프레임을 읽을 수 있습니다.
+
+        Returns:
+            {채널: 링 이름} 딕셔너리
+        """
+        return {source.channel: source.ring.name for source in self.sources
+                if isinstance(source, _SharedMemorySource)}
+
+    def stats(self):
+        """채널별 대기 프레임 수와 링 버퍼 손실 수"""
+        return {
+            'merged': self.merged,
+            'channels': {
+                source.channel: {
+                    'pending': len(pending) + (1 if in_heap else 0),
+                    'dropped': source.dropped(),
+                    'finished': source.finished,
+                }
+                for source, pending, in_heap in zip(self.sources, self._pending, self._in_heap)
+            },
+        }
+
+    def _fill(self):
+        """선두 프레임이 없는 채널에서 새 프레임을 가져와 힙에 넣기"""
+        for index, source in enumerate(self.sources):
+            if self._in_heap[index] or source.finished:
+                continue
+            pending = self._pending[index]
+            if not pending:
+                messages = source.pull(self.batch_size)
+                if not messages:
+                    continue
+                arrival = time.perf_counter()
+                pending.extend((arrival, msg) for msg in messages)
+            self._push_head(index)
+
+    def _push_head(self, index: int):
+        pending = self._pending[index]
+        if pending:
+            arrival, msg = pending.popleft()
+            heapq.heappush(self._heap, (_message_time(msg), next(self._seq), arrival, index, msg))
+            self._in_heap[index] = True
+
+    def _complete(self) -> bool:
+        """모든 채널이 선두 프레임을 가지고 있는지 (끝난 채널은 제외)"""
+        for in_heap, source in zip(self._in_heap, self.sources):
+            if not in_heap and not source.finished:
+                return False
+        return True
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CAN 로그 재생 엔진
+
+기록된 프레임을 원래 시간 간격(또는 N배속, 최대 속도)으로 버스에 다시 송신합니다.
+각 프레임의 송신 시각은 재생 시작 시각 기준 절대 마감 시각으로 계산하고,
+마감 직전까지는 sleep, 마지막 구간은 바쁜 대기로 맞춥니다.
+마감이 가까운 프레임들은 묶어서 send_many()로 한 번에 송신합니다.
+
+지원 입력:
+    - can_log 바이너리 캡처 로그 (.kvlog)
+    - candump -l 형식 텍스트 로그: (1436509052.249713) can0 2B0#0102030405060708
+    - (timestamp 초, id, flags, dlc, data) 튜플 반복자
+
+사용 예:
+    engine = ReplayEngine(can, speed=2.0)
+    report = engine.run(load_frames('capture.kvlog'))
+    print(report)
+"""
+import time
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from kvaser_can import KvaserCAN, CANERR_NOERROR
+from can_frames import FLAG_XTD, FLAG_RTR, FLAG_FDF, FLAG_BRS, FLAG_ESI
+from can_instrument import LogHistogram
+from can_log import LOG_MAGIC, read_log
+from can_scheduler import TimingStats, wait_until, SPIN_THRESHOLD
+from can_virtual import CANERR_TX_BUSY, len_to_dlc
+
+
+def read_candump(path: str) -> Iterator[Tuple[float, int, int, int, bytes]]:
+    """
+    candump -l 형식 로그 읽기
+
+    Args:
+        path: 로그 파일 경로
+
+    Returns:
+        (timestamp 초, id, flags, dlc, data) 튜플 반복자
+    """
+    with open(path, 'r') as stream:
+        for line in stream:
+            parts = line.split()
+            if len(parts) < 3 or not parts[0].startswith('('):
+                continue
+            timestamp = float(parts[0][1:-1])
+            frame = parts[2]
+
+            if '##' in frame:
+                # CAN FD: ID##<플래그 1자리><데이터>
+                can_id, body = frame.split('##', 1)
+                fd_flags = int(body[0], 16)
+                data = bytes.fromhex(body[1:])
+                flags = FLAG_FDF
+                flags |= FLAG_BRS if fd_flags & 0x01 else 0
+                flags |= FLAG_ESI if fd_flags & 0x02 else 0
+                dlc = len_to_dlc(len(data))
+            else:
+                can_id, body = frame.split('#', 1)
+                flags = 0
+                if body.upper().startswith('R'):
+                    flags |= FLAG_RTR
+                    data = b''
+                    dlc = int(body[1:], 16) if len(body) > 1 else 0
+                else:
+                    data = bytes.fromhex(body)
+                    dlc = len(data)
+
+            if len(can_id) > 3:
+                flags |= FLAG_XTD
+            yield timestamp, int(can_id, 16), flags, dlc, data
+
+
+def load_frames(source) -> Iterable[Tuple[float, int, int, int, bytes]]:
+    """
+    입력 형식을 판별해 프레임 반복자 반환
+
+    Args:
+        source: 로그 파일 경로 또는 (timestamp, id, flags, dlc, data) 튜플 반복자
+
+    Returns:
+        프레임 튜플 반복자
+    """
+    if not isinstance(source, str):
+        return source
+
+    with open(source, 'rb') as stream:
+        magic = stream.read(len(LOG_MAGIC))
+    if magic == LOG_MAGIC:
+        return read_log(source)
+    return read_candump(source)
+
+
+class ReplayReport:
+    """
+    재생 결과 (송신 수, 타이밍 오차 분포)
+    """
+
+    def __init__(self):
+        self.frames = 0
+        self.sent = 0
+        self.failed = 0
+        self.busy_retries = 0
+        self.duration = 0.0
+        self.timing = TimingStats()
+        self.histogram = LogHistogram()
+
+    def add_error(self, error: float):
+        """프레임 1개의 타이밍 오차(초) 기록"""
+        self.timing.add(error)
+        self.histogram.record(int(error * 1e9))
+
+    def percentile(self, fraction: float) -> float:
+        """
+        타이밍 오차 백분위수 (초, 로그 버킷 상한 기준, 앞선 송신은 0으로 집계)
+
+        Args:
+            fraction: 0~1 (예: 0.99)
+        """
+        return self.histogram.percentile(fraction) * 1e-9
+
+    def summary(self) -> Dict[str, object]:
+        """결과 딕셔너리 (오차 단위: 초)"""
+        timing = self.timing.snapshot()
+        timing.update({
+            'p50': self.percentile(0.50),
+            'p90': self.percentile(0.90),
+            'p99': self.percentile(0.99),
+            'p999': self.percentile(0.999),
+        })
+        return {
+            'frames': self.frames,
+            'sent': self.sent,
+            'failed': self.failed,
+            'busy_retries': self.busy_retries,
+            'duration': self.duration,
+            'timing_error': timing,
+        }
+
+    def __str__(self) -> str:
+        timing = self.summary()['timing_error']
+        return (f"재생: {self.sent}/{self.frames}개 송신 (실패 {self.failed}), {self.duration:.3f}초, "
+                f"오차 평균 {timing['mean'] * 1e6:.1f}us / p50 {timing['p50'] * 1e6:.0f}us / "
+                f"p99 {timing['p99'] * 1e6:.0f}us / 최대 {timing['max'] * 1e6:.1f}us")
+
+
+class ReplayEngine:
+    """
+    KvaserCAN 기반 로그 재생 엔진
+    """
+
+    def __init__(self, can: KvaserCAN, speed: float = 1.0, batch_window: float = 0.0002,
+                 max_batch: int = 256, spin_threshold: float = SPIN_THRESHOLD,
+                 busy_timeout: float = 0.1):
+        """
+        재생 엔진 초기화
+
+        Args:
+            can: 시작된 KvaserCAN 인스턴스
+            speed: 재생 배속 (1.0 원래 속도, 2.0 두 배, 0이면 최대 속도)
+            batch_window: 첫 프레임 마감 후 이 시간(초) 안에 마감인 프레임은 함께 송신
+            max_batch: 한 번에 송신할 최대 프레임 수
+            spin_threshold: 마감 직전 바쁜 대기로 전환할 남은 시간 (초)
+            busy_timeout: 송신 큐가 가득 찼을 때 재시도할 최대 시간 (초)
+        """
+        self.can = can
+        self.speed = speed
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.spin_threshold = spin_threshold
+        self.busy_timeout = busy_timeout
+        self._stopped = False
+
+    def stop(self):
+        """재생 중단 요청 (다른 스레드나 시그널 핸들러에서 호출)"""
+        self._stopped = True
+
+    def run(self, frames: Iterable[Tuple[float, int, int, int, bytes]],
+            lead_time: float = 0.01) -> ReplayReport:
+        """
+        프레임 재생
+
+        Args:
+            frames: (timestamp 초, id, flags, dlc, data) 튜플 반복자 (load_frames 결과 등)
+            lead_time: 재생 시작 전 준비 시간 (초)
+
+        Returns:
+            ReplayReport
+        """
+        report = ReplayReport()
+        self._stopped = False
+        if not self.can.is_started:
+            return report
+
+        realtime = self.speed > 0
+        scale = 1.0 / self.speed if realtime else 0.0
+        origin = None
+        start = time.perf_counter() + lead_time
+
+        batch = []  # type: List[Tuple[int, bytes, int]]
+        deadlines = []  # type: List[float]
+
+        for timestamp, msg_id, flags, dlc, data in frames:
+            if self._stopped:
+                break
+            if origin is None:
+                origin = timestamp
+            deadline = start + (timestamp - origin) * scale
+            report.frames += 1
+
+            if batch and (len(batch) >= self.max_batch or
+                          (realtime and deadline > deadlines[0] + self.batch_window)):
+                self._flush(batch, deadlines, report)
+
+            batch.append((msg_id, data, flags))
+            deadlines.append(deadline)
+
+        if batch and not self._stopped:
+            self._flush(batch, deadlines, report)
+
+        report.duration = max(0.0, time.perf_counter() - start)
+        return report
+
+    def _flush(self, batch: List[Tuple[int, bytes, int]], deadlines: List[float], report: ReplayReport):
+        """
+        묶음의 첫 마감 시각까지 대기 후 일괄 송신
+
+        송신 큐가 가득 차면 busy_timeout까지 재시도하고, 그동안 한 프레임도 보내지
+        못하면 묶음의 나머지를 모두 failed로 집계하고 건너뜁니다.
+        """
+        if self.speed > 0:
+            wait_until(deadlines[0], self.spin_threshold)
+
+        position = 0
+        busy_since = None
+        while position < len(batch):
+            result, sent = self.can.send_many(batch[position:] if position else batch)
+            now = time.perf_counter()
+            if self.speed > 0:
+                for index in range(position, position + sent):
+                    report.add_error(now - deadlines[index])
+            report.sent += sent
+            position += sent
+            if sent:
+                # 송신 큐가 비워지고 있으므로 재시도 시간을 다시 잼
+                busy_since = None
+
+            if result == CANERR_NOERROR:
+                break
+            if result == CANERR_TX_BUSY:
+                # 송신 큐가 비워질 때까지 잠시 대기 후 재시도
+                if busy_since is None:
+                    busy_since = now
+                if now - busy_since < self.busy_timeout:
+                    report.busy_retries += 1
+                    time.sleep(0.0002)
+                    continue
+                # 재시도 시간이 지나면 프레임마다 다시 기다리지 않고 나머지를 건너뜀
+                report.failed += len(batch) - position
+                break
+            # 다른 오류면 해당 프레임만 건너뜀
+            report.failed += 1
+            position += 1
+
+        batch.clear()
+        deadlines.clear()
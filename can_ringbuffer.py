@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CAN 프레임 링 버퍼
+
+수신 스레드(생산자 1개)와 소비자 1개 사이에서 프레임을 전달하는
+고정 크기 링 버퍼입니다. 슬롯은 생성 시 미리 할당되며, 쓰기 위치는
+생산자만, 읽기 위치는 소비자만 갱신하므로 데이터 경로에 잠금이 없습니다.
+"""
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class FrameRingBuffer:
+    """
+    단일 생산자/단일 소비자 고정 크기 링 버퍼
+
+    버퍼가 가득 차면 새로 들어온 프레임을 버리고 dropped 카운터를 증가시킵니다.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        """
+        링 버퍼 초기화
+
+        Args:
+            capacity: 슬롯 수 (2의 거듭제곱으로 올림)
+        """
+        size = 1
+        while size < capacity:
+            size <<= 1
+
+        # 미리 할당된 슬롯
+        self._slots = [None] * size
+        self._mask = size - 1
+        self.capacity = size
+
+        # 쓰기 위치는 생산자만, 읽기 위치는 소비자만 갱신
+        self._head = 0
+        self._tail = 0
+
+        # 통계 카운터
+        self.pushed = 0
+        self.popped = 0
+        self.dropped = 0
+        self.overflows = 0
+        self.high_watermark = 0
+        self._overflowing = False
+
+        # 빈 버퍼에서 대기하는 소비자를 깨우기 위한 이벤트
+        self._event = threading.Event()
+
+    def __len__(self) -> int:
+        return self._head - self._tail
+
+    def push(self, item: Any) -> bool:
+        """
+        프레임 1개 추가 (생산자 전용)
+
+        Args:
+            item: 저장할 프레임
+
+        Returns:
+            저장 성공 여부. 버퍼가 가득 차 있으면 False
+        """
+        return self.push_many((item,)) == 1
+
+    def push_many(self, items: Iterable[Any]) -> int:
+        """
+        여러 프레임 추가 (생산자 전용)
+
+        Args:
+            items: 저장할 프레임 목록
+
+        Returns:
+            저장된 프레임 수
+        """
+        head = self._head
+        limit = self._tail + self.capacity
+        slots = self._slots
+        mask = self._mask
+        accepted = 0
+        rejected = 0
+
+        for item in items:
+            if head < limit:
+                slots[head & mask] = item
+                head += 1
+                accepted += 1
+            else:
+                rejected += 1
+
+        if rejected:
+            self.dropped += rejected
+            # 가득 찬 상태로 전환된 횟수 기록
+            if not self._overflowing:
+                self._overflowing = True
+                self.overflows += 1
+        elif accepted:
+            self._overflowing = False
+
+        if accepted:
+            # 슬롯을 채운 뒤에 쓰기 위치 공개
+            self._head = head
+            self.pushed += accepted
+            fill = head - self._tail
+            if fill > self.high_watermark:
+                self.high_watermark = fill
+            self._event.set()
+
+        return accepted
+
+    def pop(self) -> Optional[Any]:
+        """
+        프레임 1개 꺼내기 (소비자 전용, 대기 없음)
+
+        Returns:
+            프레임. 버퍼가 비어 있으면 None
+        """
+        items = self.pop_many(max_items=1, timeout=0)
+        return items[0] if items else None
+
+    def pop_many(self, max_items: int = 256, timeout: Optional[float] = 0) -> List[Any]:
+        """
+        여러 프레임 꺼내기 (소비자 전용)
+
+        Args:
+            max_items: 꺼낼 최대 프레임 수
+            timeout: 버퍼가 비어 있을 때 대기할 시간 (초, None이면 무한 대기)
+
+        Returns:
+            프레임 리스트 (비어 있을 수 있음)
+        """
+        if self._head == self._tail and timeout != 0:
+            # 이벤트를 먼저 지운 뒤 다시 확인해야 깨우기 신호를 놓치지 않음
+            self._event.clear()
+            if self._head == self._tail:
+                self._event.wait(timeout)
+
+        tail = self._tail
+        count = min(self._head - tail, max_items)
+        if count <= 0:
+            return []
+
+        slots = self._slots
+        mask = self._mask
+        items = []
+        append = items.append
+        for index in range(tail, tail + count):
+            slot = index & mask
+            append(slots[slot])
+            slots[slot] = None
+
+        # 슬롯을 비운 뒤에 읽기 위치 공개
+        self._tail = tail + count
+        self.popped += count
+        return items
+
+    def wakeup(self):
+        """대기 중인 소비자 깨우기 (종료 시 사용)"""
+        self._event.set()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        버퍼 통계 확인
+
+        Returns:
+            카운터 딕셔너리
+        """
+        return {
+            'capacity': self.capacity,
+            'fill': len(self),
+            'pushed': self.pushed,
+            'popped': self.popped,
+            'dropped': self.dropped,
+            'overflows': self.overflows,
+            'high_watermark': self.high_watermark,
+        }
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+주기 송신 스케줄러
+
+여러 개의 주기 메시지(ID, 주기, 데이터 생성기)를 타이밍 스레드 하나로 송신합니다.
+각 작업의 송신 시각은 시작 시각 + k * 주기의 절대 기준으로 계산하므로
+send()에 걸린 시간이나 sleep 오차가 누적되지 않습니다.
+
+사용 예:
+    scheduler = CyclicScheduler(can)
+    scheduler.add(0x2B0, 0.010, lambda: create_sas1_message(angle=0))
+    scheduler.add(0x100, 0.100, [0x11, 0x22])
+    scheduler.start()
+    ...
+    scheduler.stop()
+    print(scheduler.stats())
+"""
+import heapq
+import itertools
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+from kvaser_can import KvaserCAN, CANERR_NOERROR
+
+# 이 시간(초)보다 마감이 가까우면 sleep 대신 바쁜 대기로 맞춤
+SPIN_THRESHOLD = 0.001
+
+
+def wait_until(deadline: float, spin_threshold: float = SPIN_THRESHOLD,
+               event: threading.Event = None) -> bool:
+    """
+    perf_counter 기준 절대 시각까지 대기 (sleep 후 짧은 바쁜 대기)
+
+    Args:
+        deadline: 목표 시각 (time.perf_counter 기준)
+        spin_threshold: 바쁜 대기로 전환할 남은 시간 (초)
+        event: 설정되면 대기를 중단할 이벤트
+
+    Returns:
+        목표 시각에 도달했으면 True, event로 중단되었으면 False
+    """
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= spin_threshold:
+            break
+        if event is not None:
+            if event.wait(remaining - spin_threshold):
+                return False
+        else:
+            time.sleep(remaining - spin_threshold)
+
+    while time.perf_counter() < deadline:
+        pass
+    return True
+
+
+class TimingStats:
+    """
+    송신 시각 오차 통계 (Welford 누적, 최소/최대)
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, error: float):
+        """오차(초) 1개 추가"""
+        self.count += 1
+        delta = error - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (error - self.mean)
+        if error < self.min:
+            self.min = error
+        if error > self.max:
+            self.max = error
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        """통계 딕셔너리 (단위: 초)"""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'stddev': self.stddev,
+            'min': self.min if self.count else 0.0,
+            'max': self.max if self.count else 0.0,
+        }
+
+
+class CyclicJob:
+    """
+    주기 송신 작업 1개
+    """
+
+    def __init__(self, job_id: int, can_id: int, period: float,
+                 payload: Union[bytes, List[int], Callable[[], Union[bytes, List[int]]], Iterator],
+                 extended_id: bool = False):
+        self.job_id = job_id
+        self.can_id = can_id
+        self.period = period
+        self.payload = payload
+        self.extended_id = extended_id
+
+        self.sent = 0
+        self.errors = 0
+        self.missed = 0
+        self.last_result = CANERR_NOERROR
+        self.jitter = TimingStats()
+        self.active = True
+
+        self._start = 0.0
+        self._index = 0
+
+    def next_data(self) -> Optional[Union[bytes, List[int]]]:
+        """다음 송신 데이터 (반복자가 끝나면 None)"""
+        payload = self.payload
+        if callable(payload):
+            return payload()
+        if isinstance(payload, (bytes, bytearray, list, tuple)):
+            return payload
+        return next(payload, None)
+
+    def deadline(self) -> float:
+        """현재 순번의 절대 송신 시각"""
+        return self._start + self._index * self.period
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            'id': self.can_id,
+            'period': self.period,
+            'sent': self.sent,
+            'errors': self.errors,
+            'missed': self.missed,
+            'last_result': self.last_result,
+            'jitter': self.jitter.snapshot(),
+        }
+
+
+class CyclicScheduler:
+    """
+    KvaserCAN 기반 주기 송신 스케줄러 (타이밍 스레드 1개, 마감 시각 힙)
+    """
+
+    def __init__(self, can: KvaserCAN, spin_threshold: float = SPIN_THRESHOLD):
+        """
+        스케줄러 초기화
+
+        Args:
+            can: 시작된 KvaserCAN 인스턴스
+            spin_threshold: 마감 직전 바쁜 대기로 전환할 남은 시간 (초)
+        """
+        self.can = can
+        self.spin_threshold = spin_threshold
+        self.jobs = {}  # type: Dict[int, CyclicJob]
+
+        self._heap = []
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, can_id: int, period: float,
+            payload: Union[bytes, List[int], Callable[[], Union[bytes, List[int]]], Iterator],
+            extended_id: bool = False, start_delay: float = 0.0) -> int:
+        """
+        주기 송신 작업 추가 (실행 중에도 가능)
+
+        Args:
+            can_id: CAN 메시지 ID
+            period: 송신 주기 (초)
+            payload: 고정 데이터, 데이터를 돌려주는 함수, 또는 데이터 반복자
+                     (반복자가 끝나면 작업 종료)
+            extended_id: 확장 ID 사용 여부
+            start_delay: 첫 송신까지의 지연 (초)
+
+        Returns:
+            작업 ID
+        """
+        if period <= 0:
+            raise ValueError("period는 0보다 커야 합니다")
+
+        job = CyclicJob(next(self._ids), can_id, period, payload, extended_id)
+        job._start = time.perf_counter() + start_delay
+
+        with self._lock:
+            self.jobs[job.job_id] = job
+            heapq.heappush(self._heap, (job.deadline(), next(self._seq), job))
+
+        # 타이밍 스레드가 더 이른 마감을 보도록 깨우기
+        self._wakeup.set()
+        return job.job_id
+
+    def remove(self, job_id: int) -> bool:
+        """
+        작업 제거
+
+        Returns:
+            제거했으면 True
+        """
+        with self._lock:
+            job = self.jobs.pop(job_id, None)
+        if job is None:
+            return False
+        job.active = False
+        return True
+
+    def start(self) -> int:
+        """
+        타이밍 스레드 시작
+
+        Returns:
+            0 성공, 음수 오류 코드
+        """
+        if not self.can.is_started:
+            return -95  # CANERR_NOTINIT
+        if self._thread is not None:
+            return CANERR_NOERROR
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='CyclicScheduler', daemon=True)
+        self._thread.start()
+        return CANERR_NOERROR
+
+    def stop(self):
+        """타이밍 스레드 중지"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+
+    def stats(self) -> Dict[int, Dict[str, object]]:
+        """
+        작업별 송신 통계
+
+        Returns:
+            {작업 ID: 통계} 딕셔너리. jitter 단위는 초
+        """
+        with self._lock:
+            jobs = list(self.jobs.values())
+        return {job.job_id: job.stats() for job in jobs}
+
+    def _run(self):
+        """타이밍 스레드 본체"""
+        heap = self._heap
+        send = self.can.send
+
+        while not self._stop.is_set():
+            # 새 작업이 추가되면 대기를 중단하고 마감 시각을 다시 확인
+            self._wakeup.clear()
+
+            with self._lock:
+                # 제거된 작업 정리
+                while heap and not heap[0][2].active:
+                    heapq.heappop(heap)
+                deadline = heap[0][0] if heap else None
+
+            if deadline is None:
+                self._wakeup.wait(0.1)
+                continue
+
+            if not wait_until(deadline, self.spin_threshold, self._wakeup):
+                continue
+
+            with self._lock:
+                if not heap or heap[0][0] > deadline:
+                    continue
+                _, _, job = heapq.heappop(heap)
+
+            if not job.active:
+                continue
+
+            data = job.next_data()
+            if data is None:
+                # 반복자가 끝난 작업은 통계 확인을 위해 목록에 남겨 둠
+                job.active = False
+                continue
+
+            now = time.perf_counter()
+            result = send(job.can_id, data, extended_id=job.extended_id)
+            job.jitter.add(now - job.deadline())
+            job.last_result = result
+            if result == CANERR_NOERROR:
+                job.sent += 1
+            else:
+                job.errors += 1
+
+            # 다음 절대 마감 시각. 한 주기 이상 밀렸으면 놓친 주기는 건너뜀
+            job._index += 1
+            now = time.perf_counter()
+            if now - job.deadline() > job.period:
+                skipped = int((now - job.deadline()) / job.period)
+                job._index += skipped
+                job.missed += skipped
+
+            with self._lock:
+                if job.active:
+                    heapq.heappush(heap, (job.deadline(), next(self._seq), job))
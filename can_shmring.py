@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+공유 메모리 프레임 링 버퍼
+
+채널 수신 프로세스가 multiprocessing.shared_memory 위의 링에 프레임 레코드를
+쓰고, 다른 프로세스(디코딩, 저장 등)는 링 이름으로 붙어서 피클링 없이 읽습니다.
+쓰는 쪽은 하나, 읽는 쪽은 여럿일 수 있으며 읽는 쪽마다 자기 읽기 위치를 가집니다.
+쓰는 쪽은 기다리지 않고 가장 오래된 레코드를 덮어쓰며, 너무 늦은 읽는 쪽은
+덮어쓴 만큼을 lost로 집계하고 건너뜁니다.
+
+레코드 형식은 can_log 레코드와 같습니다 (24바이트, CAN FD는 80바이트):
+    timestamp u64 (나노초), id u32, flags u8, dlc u8, 예약 2바이트, data 8/64바이트
+
+공유 메모리 구조:
+    0   magic 'KVCANSHM', version u16, record_size u16, capacity u32
+    64  head u64     (공개된 레코드 수)
+    128 reserve u64  (쓰는 중인 레코드까지 포함한 수, 읽는 쪽의 덮어쓰기 확인용)
+    192 closed u64   (쓰는 쪽 종료 표시)
+    256 레코드 배열 (capacity개, capacity는 2의 거듭제곱)
+
+multiprocessing.shared_memory가 필요합니다 (Python 3.8 이상).
+
+사용 예:
+    # 수신 프로세스
+    ring = SharedFrameRing.create('powertrain', capacity=1 << 16)
+    ring.write_messages(messages)
+
+    # 소비 프로세스
+    reader = SharedFrameRing.attach('powertrain').reader()
+    for timestamp, msg_id, flags, dlc, data in reader.read(timeout=100):
+        ...
+"""
+import struct
+import sys
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from multiprocessing import shared_memory
+    from multiprocessing import resource_tracker
+except ImportError:
+    shared_memory = None
+    resource_tracker = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from can_log import RECORD_HEADER, RECORD_SIZE, RECORD_SIZE_FD, message_unpacker, iter_records
+
+RING_MAGIC = b'KVCANSHM'
+RING_VERSION = 1
+RING_HEADER = struct.Struct('<8sHHI')
+
+HEAD_OFFSET = 64
+RESERVE_OFFSET = 128
+CLOSED_OFFSET = 192
+DATA_OFFSET = 256
+
+_COUNTER = struct.Struct('<Q')
+
+
+def _require_shared_memory():
+    if shared_memory is None:
+        raise ImportError("multiprocessing.shared_memory가 필요합니다 (Python 3.8 이상)")
+
+
+class SharedFrameRing:
+    """
+    공유 메모리 프레임 링 (생성 또는 이름으로 연결)
+    """
+
+    def __init__(self, shm, owner: bool):
+        self.shm = shm
+        self.name = shm.name
+        self.owner = owner
+
+        magic, version, self.record_size, self.capacity = RING_HEADER.unpack_from(shm.buf, 0)
+        if magic != RING_MAGIC or version != RING_VERSION:
+            raise ValueError(f"프레임 링이 아닙니다: {shm.name}")
+
+        self.fd = self.record_size == RECORD_SIZE_FD
+        self.written = 0
+        self._mask = self.capacity - 1
+        self._record = struct.Struct(f'<QIBB2x{self.record_size - RECORD_HEADER.size}s')
+
+    @classmethod
+    def create(cls, name: str = None, capacity: int = 65536, fd: bool = False) -> 'SharedFrameRing':
+        """
+        새 링 생성 (생성한 쪽이 close()할 때 공유 메모리를 해제)
+
+        Args:
+            name: 공유 메모리 이름 (None이면 자동 생성)
+            capacity: 레코드 수 (2의 거듭제곱으로 올림)
+            fd: CAN FD 레코드(데이터 64바이트) 사용 여부
+        """
+        _require_shared_memory()
+        size = 1
+        while size < capacity:
+            size <<= 1
+        record_size = RECORD_SIZE_FD if fd else RECORD_SIZE
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=DATA_OFFSET + size * record_size)
+        shm.buf[:DATA_OFFSET] = bytes(DATA_OFFSET)
+        RING_HEADER.pack_into(shm.buf, 0, RING_MAGIC, RING_VERSION, record_size, size)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedFrameRing':
+        """
+        이름으로 기존 링에 연결
+
+        Args:
+            name: 공유 메모리 이름
+        """
+        _require_shared_memory()
+        # 연결한 프로세스가 끝날 때 resource_tracker가 공유 메모리를 지우지 않도록
+        # 추적하지 않고 연결 (해제는 생성한 쪽 책임)
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            register = resource_tracker.register
+            resource_tracker.register = lambda *args: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+        return cls(shm, owner=False)
+
+    def __enter__(self) -> 'SharedFrameRing':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """공유 메모리 연결 해제 (생성한 쪽이면 공유 메모리 삭제)"""
+        if self.shm is None:
+            return
+        shm = self.shm
+        self.shm = None
+        shm.close()
+        if self.owner:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    @property
+    def head(self) -> int:
+        """지금까지 공개된 레코드 수"""
+        return _COUNTER.unpack_from(self.shm.buf, HEAD_OFFSET)[0]
+
+    @property
+    def closed(self) -> bool:
+        """쓰는 쪽 종료 여부"""
+        return _COUNTER.unpack_from(self.shm.buf, CLOSED_OFFSET)[0] != 0
+
+    def mark_closed(self, closed: bool = True):
+        """쓰는 쪽 종료 표시 (읽는 쪽이 남은 레코드를 읽은 뒤 종료할 수 있도록)"""
+        _COUNTER.pack_into(self.shm.buf, CLOSED_OFFSET, 1 if closed else 0)
+
+    def reader(self, from_oldest: bool = False) -> 'SharedRingReader':
+        """
+        이 링의 읽기 위치 생성
+
+        Args:
+            from_oldest: True이면 링에 남아 있는 가장 오래된 레코드부터, 아니면 새 레코드부터
+        """
+        return SharedRingReader(self, from_oldest)
+
+    def write_messages(self, messages: Iterable) -> int:
+        """
+        수신 Message 목록 기록 (쓰는 쪽 전용)
+
+        Returns:
+            기록한 메시지 수
+        """
+        records = []
+        message_type = None
+        unpacker = None
+        for msg in messages:
+            if type(msg) is not message_type:
+                message_type = type(msg)
+                unpacker, _ = message_unpacker(message_type)
+            msg_id, flags, dlc, data, sec, nsec = unpacker.unpack_from(msg)
+            records.append((sec * 1000000000 + nsec, msg_id, flags & 0x1F, dlc, data))
+        return self.write_records(records)
+
+    def write_frame(self, timestamp: float, msg_id: int, data: bytes, flags: int = 0, dlc: int = None):
+        """Message 구조체 없이 프레임 1개 기록 (쓰는 쪽 전용)"""
+        self.write_records([(int(round(timestamp * 1e9)), msg_id, flags & 0x1F,
+                             len(data) if dlc is None else dlc, bytes(data))])
+
+    def write_records(self, records: List[Tuple[int, int, int, int, bytes]]) -> int:
+        """
+        (timestamp 나노초, id, flags, dlc, data) 레코드 기록 (쓰는 쪽 전용)
+
+        한 번에 링 크기만큼씩 예약(reserve)한 뒤 쓰고, 다 쓴 다음 head를 공개합니다.
+
+        Returns:
+            기록한 레코드 수
+        """
+        buf = self.shm.buf
+        pack_into = self._record.pack_into
+        record_size = self.record_size
+        mask = self._mask
+        head = _COUNTER.unpack_from(buf, HEAD_OFFSET)[0]
+
+        for start in range(0, len(records), self.capacity):
+            part = records[start:start + self.capacity]
+            _COUNTER.pack_into(buf, RESERVE_OFFSET, head + len(part))
+            for record in part:
+                pack_into(buf, DATA_OFFSET + (head & mask) * record_size, *record)
+                head += 1
+            _COUNTER.pack_into(buf, HEAD_OFFSET, head)
+
+        self.written += len(records)
+        return len(records)
+
+
+class SharedRingReader:
+    """
+    공유 메모리 링의 읽기 위치 (프로세스마다 따로 생성)
+    """
+
+    def __init__(self, ring: SharedFrameRing, from_oldest: bool = False):
+        self.ring = ring
+        self.lost = 0
+        self.read_count = 0
+
+        head = ring.head
+        self.cursor = max(0, head - ring.capacity) if from_oldest else head
+
+    def __len__(self) -> int:
+        """읽지 않은 레코드 수 (덮어쓰인 것 제외)"""
+        return min(self.ring.head - self.cursor, self.ring.capacity)
+
+    def read_raw(self, max_frames: int = 4096, timeout: int = 0) -> Tuple[bytes, int]:
+        """
+        읽지 않은 레코드를 원시 바이트로 복사
+
+        Args:
+            max_frames: 최대 레코드 수
+            timeout: 새 레코드가 없을 때 대기할 시간 (밀리초)
+
+        Returns:
+            (레코드 바이트, 레코드 수) 튜플
+        """
+        ring = self.ring
+        buf = ring.shm.buf
+        capacity = ring.capacity
+        record_size = ring.record_size
+
+        head = _COUNTER.unpack_from(buf, HEAD_OFFSET)[0]
+        if head == self.cursor and timeout > 0:
+            # 프로세스 사이에 공유할 이벤트가 없으므로 짧게 폴링
+            deadline = time.perf_counter() + timeout / 1000.0
+            while head == self.cursor and not ring.closed and time.perf_counter() < deadline:
+                time.sleep(0.0005)
+                head = _COUNTER.unpack_from(buf, HEAD_OFFSET)[0]
+
+        cursor = self.cursor
+        if head - cursor > capacity:
+            self.lost += head - capacity - cursor
+            cursor = head - capacity
+
+        count = min(head - cursor, max_frames)
+        if count <= 0:
+            return b'', 0
+
+        first = cursor & ring._mask
+        end = first + count
+        if end <= capacity:
+            raw = bytes(buf[DATA_OFFSET + first * record_size:DATA_OFFSET + end * record_size])
+        else:
+            raw = bytes(buf[DATA_OFFSET + first * record_size:DATA_OFFSET + capacity * record_size]) + \
+                bytes(buf[DATA_OFFSET:DATA_OFFSET + (end - capacity) * record_size])
+
+        # 복사하는 동안 쓰는 쪽이 덮어쓴 레코드는 버림
+        reserve = _COUNTER.unpack_from(buf, RESERVE_OFFSET)[0]
+        overwritten = min(count, reserve - capacity - cursor)
+        self.cursor = cursor + count
+        if overwritten > 0:
+            self.lost += overwritten
+            raw = raw[overwritten * record_size:]
+            count -= overwritten
+
+        self.read_count += count
+        return raw, count
+
+    def read(self, max_frames: int = 4096, timeout: int = 0) -> Iterator[Tuple[float, int, int, int, bytes]]:
+        """
+        읽지 않은 레코드 읽기
+
+        Returns:
+            (timestamp 초, id, flags, dlc, data) 튜플 반복자
+        """
+        raw, _ = self.read_raw(max_frames, timeout)
+        return iter_records(raw, self.ring.record_size)
+
+    def read_array(self, max_frames: int = 4096, timeout: int = 0):
+        """
+        읽지 않은 레코드를 NumPy 구조화 배열로 읽기 (NumPy 필요)
+
+        Returns:
+            timestamp(나노초), id, flags, dlc, data 필드 배열 (LogReader.record_dtype과 같은 형식)
+        """
+        if np is None:
+            raise ImportError("NumPy가 설치되어 있지 않습니다: pip install numpy")
+
+        raw, _ = self.read_raw(max_frames, timeout)
+        return np.frombuffer(raw, dtype=np.dtype([
+            ('timestamp', '<u8'),
+            ('id', '<u4'),
+            ('flags', 'u1'),
+            ('dlc', 'u1'),
+            ('_reserved', 'u1', (2,)),
+            ('data', 'u1', (self.ring.record_size - RECORD_HEADER.size,)),
+        ]))
+
+    def finished(self) -> bool:
+        """쓰는 쪽이 종료했고 남은 레코드도 모두 읽었는지"""
+        return self.ring.closed and self.ring.head == self.cursor
+
+
+def capture_to_ring(channel: int, ring_name: str, backend: str = 'kvaser', lib_name: str = None,
+                    bitrate_index: int = -3, monitor_mode: bool = False, stop=None,
+                    status=None, batch_size: int = 256, duration: Optional[float] = None) -> int:
+    """
+    채널을 열어 수신한 메시지를 공유 메모리 링에 기록 (수신 프로세스 본체)
+
+    Args:
+        channel: CAN 채널 번호
+        ring_name: 기록할 링 이름 (SharedFrameRing.create로 미리 생성)
+        backend, lib_name: KvaserCAN 생성 인자
+        bitrate_index: 비트레이트 인덱스
+        monitor_mode: 모니터 모드로 열기
+        stop: 설정되면 수신을 멈출 multiprocessing.Event
+        status: open/start 결과 코드를 보낼 multiprocessing.Queue
+        batch_size: 한 번에 읽는 최대 메시지 수
+        duration: 수신 시간 (초, None이면 stop까지)
+
+    Returns:
+        마지막 결과 코드
+    """
+    from kvaser_can import KvaserCAN, CANERR_NOERROR, CANERR_RX_EMPTY
+
+    ring = SharedFrameRing.attach(ring_name)
+    can = KvaserCAN(lib_name=lib_name, backend=backend)
+    try:
+        result = can.open(channel=channel, monitor_mode=monitor_mode)
+        if result == CANERR_NOERROR:
+            result = can.start(bitrate_index=bitrate_index)
+        if status is not None:
+            status.put(result)
+
+        end_time = None if duration is None else time.monotonic() + duration
+        while result == CANERR_NOERROR:
+            if stop is not None and stop.is_set():
+                break
+            if end_time is not None and time.monotonic() >= end_time:
+                break
+            result, messages = can.receive_many(max_frames=batch_size, timeout=100)
+            if result == CANERR_NOERROR:
+                ring.write_messages(messages)
+            elif result == CANERR_RX_EMPTY:
+                result = CANERR_NOERROR
+        return result
+    finally:
+        can.close()
+        ring.mark_closed()
+        ring.close()
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Linux SocketCAN 백엔드
+
+CANAPI 공유 라이브러리 대신 AF_CAN raw 소켓을 직접 사용하는 백엔드입니다.
+CANAPI와 같은 init/start/read/write/status/busload/bitrate/test/reset/exit
+메서드를 제공하므로 KvaserCAN(backend='socketcan')으로 선택할 수 있습니다.
+
+채널 번호 N은 인터페이스 '<접두사>N' (기본 can0, can1, ...)에 대응합니다.
+비트레이트와 listen-only 모드는 SocketCAN에서 ip link로 설정하므로
+start()에 전달한 비트레이트 인덱스는 기록만 합니다. 예:
+
+    sudo ip link set can0 type can bitrate 500000 && sudo ip link set can0 up
+
+vcan 모듈로 테스트하는 경우:
+
+    sudo modprobe vcan
+    sudo ip link add dev vcan0 type vcan && sudo ip link set vcan0 up
+    KvaserCAN(lib_name='vcan', backend='socketcan').open(channel=0)
+
+수신은 glibc의 recvmmsg()가 있으면 시스템 호출 한 번에 여러 프레임을 읽고,
+없으면 recvmsg()로 한 프레임씩 읽습니다.
+"""
+import collections
+import ctypes
+import errno
+import os
+import select
+import socket
+import struct
+import time
+from typing import List, Optional, Tuple
+
+from can_virtual import OpMode, Bitrate, Message, Status, BusSpeed
+from can_virtual import CANREAD_INFINITE, CANBTR_INDEX_250K, BITRATE_INDEX_BPS
+from can_virtual import CANERR_NOERROR, CANERR_OFFLINE, CANERR_TX_BUSY, CANERR_RX_EMPTY, CANERR_NOTINIT
+from can_virtual import CANBRD_PRESENT, CANBRD_NOT_PRESENT, DLC_TO_LEN, len_to_dlc, frame_bits
+
+# linux/can.h
+CAN_EFF_FLAG = 0x80000000
+CAN_RTR_FLAG = 0x40000000
+CAN_EFF_MASK = 0x1FFFFFFF
+CAN_SFF_MASK = 0x7FF
+CANFD_BRS = 0x01
+CANFD_ESI = 0x02
+
+CAN_MTU = 16
+CANFD_MTU = 72
+
+# 소켓 옵션 (socket 모듈에 없는 플랫폼 대비)
+SOL_CAN_RAW = getattr(socket, 'SOL_CAN_RAW', 101)
+CAN_RAW_FILTER = getattr(socket, 'CAN_RAW_FILTER', 1)
+CAN_RAW_FD_FRAMES = getattr(socket, 'CAN_RAW_FD_FRAMES', 5)
+SO_TIMESTAMP = getattr(socket, 'SO_TIMESTAMP', 29)
+
+# 시스템 호출 한 번에 읽을 최대 프레임 수
+RECV_BATCH = 64
+
+_CAN_FILTER = struct.Struct('=II')
+_CAN_FRAME = struct.Struct('=IB3x8s')
+_CANFD_FRAME = struct.Struct('=IBB2x64s')
+_TIMEVAL = struct.Struct('@ll')
+_CMSG_HDR = struct.Struct('@Lii')
+_CMSG_DATA_OFFSET = (_CMSG_HDR.size + ctypes.sizeof(ctypes.c_size_t) - 1) & ~(ctypes.sizeof(ctypes.c_size_t) - 1)
+_CMSG_SPACE = 64
+_MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0x40)
+
+
+class _IoVec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ('msg_name', ctypes.c_void_p),
+        ('msg_namelen', ctypes.c_uint32),
+        ('msg_iov', ctypes.POINTER(_IoVec)),
+        ('msg_iovlen', ctypes.c_size_t),
+        ('msg_control', ctypes.c_void_p),
+        ('msg_controllen', ctypes.c_size_t),
+        ('msg_flags', ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', _MsgHdr), ('msg_len', ctypes.c_uint)]
+
+
+def _load_recvmmsg():
+    """glibc recvmmsg() 함수 가져오기 (없으면 None)"""
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        func = libc.recvmmsg
+    except (OSError, AttributeError):
+        return None
+
+    func.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+    func.restype = ctypes.c_int
+    return func
+
+
+_recvmmsg = _load_recvmmsg()
+
+
+class _BatchReceiver:
+    """recvmmsg()용으로 미리 할당한 버퍼 묶음"""
+
+    def __init__(self, batch: int):
+        self.batch = batch
+        self.frames = ctypes.create_string_buffer(CANFD_MTU * batch)
+        self.controls = ctypes.create_string_buffer(_CMSG_SPACE * batch)
+        self.iovecs = (_IoVec * batch)()
+        self.headers = (_MMsgHdr * batch)()
+
+        frames_addr = ctypes.addressof(self.frames)
+        controls_addr = ctypes.addressof(self.controls)
+        for i in range(batch):
+            self.iovecs[i].iov_base = frames_addr + i * CANFD_MTU
+            self.iovecs[i].iov_len = CANFD_MTU
+            hdr = self.headers[i].msg_hdr
+            hdr.msg_iov = ctypes.pointer(self.iovecs[i])
+            hdr.msg_iovlen = 1
+            hdr.msg_control = controls_addr + i * _CMSG_SPACE
+
+    def receive(self, fd: int):
+        """
+        대기 없이 여러 프레임 읽기
+
+        Returns:
+            (프레임 바이트, 수신 시각 또는 None) 리스트
+        """
+        headers = self.headers
+        for i in range(self.batch):
+            headers[i].msg_hdr.msg_controllen = _CMSG_SPACE
+
+        count = _recvmmsg(fd, headers, self.batch, _MSG_DONTWAIT, None)
+        if count <= 0:
+            return []
+
+        raw = self.frames.raw
+        controls = self.controls.raw
+        items = []
+        for i in range(count):
+            start = i * CANFD_MTU
+            cstart = i * _CMSG_SPACE
+            control = controls[cstart:cstart + headers[i].msg_hdr.msg_controllen]
+            items.append((raw[start:start + headers[i].msg_len], _parse_timestamp(control)))
+        return items
+
+
+def _parse_timestamp(control: bytes) -> Optional[float]:
+    """SCM_TIMESTAMP 제어 메시지에서 수신 시각 추출"""
+    align = ctypes.sizeof(ctypes.c_size_t)
+    offset = 0
+    while offset + _CMSG_HDR.size <= len(control):
+        length, level, kind = _CMSG_HDR.unpack_from(control, offset)
+        if length < _CMSG_HDR.size:
+            break
+        if level == socket.SOL_SOCKET and kind == SO_TIMESTAMP:
+            sec, usec = _TIMEVAL.unpack_from(control, offset + _CMSG_DATA_OFFSET)
+            return sec + usec / 1e6
+        offset += (length + align - 1) & ~(align - 1)
+    return None
+
+
+class SocketCANAPI:
+    """
+    CANAPI와 같은 인터페이스를 제공하는 SocketCAN 백엔드
+    """
+
+    def __init__(self, interface_prefix: str = None, batch: int = RECV_BATCH):
+        """
+        SocketCAN 백엔드 초기화
+
+        Args:
+            interface_prefix: 인터페이스 이름 접두사 (None이면 'can')
+            batch: 시스템 호출 한 번에 읽을 최대 프레임 수
+        """
+        self.interface_prefix = interface_prefix or 'can'
+        self.interface = None
+        self.sock = None
+        self.mode = OpMode()
+        self.bitrate_index = CANBTR_INDEX_250K
+        self.started = False
+
+        self._rx = collections.deque()
+        self._batch = _BatchReceiver(batch) if _recvmmsg is not None else None
+        self._tx_buffer = bytearray(CANFD_MTU)
+        self._bits = 0
+        self._busload_bits = 0
+        self._busload_time = time.time()
+
+    @staticmethod
+    def version() -> str:
+        return 'SocketCANAPI 1.0'
+
+    def hardware(self) -> str:
+        return f'SocketCAN {self.interface}'
+
+    def firmware(self) -> str:
+        return f'Linux {os.uname().release}'
+
+    def serial_number(self) -> Optional[str]:
+        """
+        USB 어댑터 시리얼 번호 (sysfs의 USB 장치 serial 속성)
+
+        Returns:
+            시리얼 번호, 알 수 없으면(vcan 등 가상 인터페이스) None
+        """
+        if self.interface is None:
+            return None
+        device = os.path.realpath(os.path.join('/sys/class/net', self.interface, 'device'))
+        # 네트워크 장치는 USB 인터페이스에 붙고, serial은 그 상위 USB 장치에 있음
+        for directory in (device, os.path.dirname(device)):
+            try:
+                with open(os.path.join(directory, 'serial')) as stream:
+                    return stream.read().strip() or None
+            except OSError:
+                continue
+        return None
+
+    def interface_name(self, channel: int) -> str:
+        """채널 번호에 해당하는 인터페이스 이름"""
+        return f'{self.interface_prefix}{channel}'
+
+    def test(self, channel: int, mode: OpMode = None, param=None) -> Tuple[int, int]:
+        """
+        인터페이스 존재 여부 확인
+
+        Returns:
+            (결과, 상태) 튜플. 상태 0이면 사용 가능
+        """
+        if os.path.exists(os.path.join('/sys/class/net', self.interface_name(channel))):
+            return CANERR_NOERROR, CANBRD_PRESENT
+        return CANERR_NOERROR, CANBRD_NOT_PRESENT
+
+    def init(self, channel: int, mode: OpMode = None, param=None) -> int:
+        """raw CAN 소켓 생성 및 인터페이스에 바인딩"""
+        if self.sock is not None:
+            self.exit()
+
+        if mode is not None:
+            self.mode.byte = mode.byte
+
+        interface = self.interface_name(channel)
+        try:
+            sock = socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW)
+        except (AttributeError, OSError):
+            return CANERR_NOTINIT
+
+        try:
+            if self.mode.bits.fdoe:
+                sock.setsockopt(SOL_CAN_RAW, CAN_RAW_FD_FRAMES, 1)
+            sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMP, 1)
+            sock.setblocking(False)
+            sock.bind((interface,))
+        except OSError:
+            sock.close()
+            return CANERR_NOTINIT
+
+        self.sock = sock
+        self.interface = interface
+        return CANERR_NOERROR
+
+    def attach_socket(self, sock, interface: str = 'socket') -> int:
+        """
+        이미 만들어진 소켓 사용 (테스트 및 소켓을 직접 관리하는 경우)
+
+        Args:
+            sock: CAN 프레임을 주고받는 데이터그램 소켓
+            interface: 표시용 인터페이스 이름
+        """
+        if self.sock is not None:
+            self.exit()
+
+        sock.setblocking(False)
+        self.sock = sock
+        self.interface = interface
+        return CANERR_NOERROR
+
+    def exit(self) -> int:
+        """소켓 닫기"""
+        if self.sock is None:
+            return CANERR_NOTINIT
+
+        self.reset()
+        self.sock.close()
+        self.sock = None
+        self.interface = None
+        return CANERR_NOERROR
+
+    def start(self, bitrate: Bitrate) -> int:
+        """수신 시작 (비트레이트는 ip link로 설정된 값을 사용)"""
+        if self.sock is None:
+            return CANERR_NOTINIT
+
+        self.bitrate_index = bitrate.index
+
+        # 시작 전에 쌓인 프레임 버리기
+        self._rx.clear()
+        while self._receive_batch():
+            self._rx.clear()
+
+        self._busload_bits = self._bits
+        self._busload_time = time.time()
+        self.started = True
+        return CANERR_NOERROR
+
+    def reset(self) -> int:
+        """수신 중지"""
+        if self.sock is None:
+            return CANERR_NOTINIT
+
+        self.started = False
+        return CANERR_NOERROR
+
+    def write(self, message, timeout: int = 0) -> int:
+        """CAN 프레임 송신"""
+        if self.sock is None:
+            return CANERR_NOTINIT
+        if not self.started:
+            return CANERR_OFFLINE
+
+        # 표준 ID는 kvaser 백엔드처럼 하위 11비트만 사용
+        can_id = message.id
+        if message.flags.xtd:
+            can_id = (can_id & CAN_EFF_MASK) | CAN_EFF_FLAG
+        else:
+            can_id &= CAN_SFF_MASK
+        if message.flags.rtr:
+            can_id |= CAN_RTR_FLAG
+
+        buffer = self._tx_buffer
+        if message.flags.fdf:
+            flags = (CANFD_BRS if message.flags.brs else 0) | (CANFD_ESI if message.flags.esi else 0)
+            length = DLC_TO_LEN[min(message.dlc, 15)]
+            _CANFD_FRAME.pack_into(buffer, 0, can_id, length, flags, bytes(message.data[:length]))
+            size = CANFD_MTU
+        else:
+            length = min(message.dlc, 8)
+            _CAN_FRAME.pack_into(buffer, 0, can_id, length, bytes(message.data[:length]))
+            size = CAN_MTU
+
+        view = memoryview(buffer)[:size]
+        try:
+            self.sock.send(view)
+        except (BlockingIOError, InterruptedError):
+            # 송신 큐가 가득 찬 경우 타임아웃만큼 기다렸다가 한 번 더 시도
+            if timeout <= 0:
+                return CANERR_TX_BUSY
+            wait = None if timeout == CANREAD_INFINITE else timeout / 1000.0
+            _, writable, _ = select.select([], [self.sock], [], wait)
+            if not writable:
+                return CANERR_TX_BUSY
+            try:
+                self.sock.send(view)
+            except (BlockingIOError, InterruptedError):
+                return CANERR_TX_BUSY
+        except OSError as error:
+            # 인터페이스 송신 큐 초과
+            if error.errno == errno.ENOBUFS:
+                return CANERR_TX_BUSY
+            return CANERR_OFFLINE
+
+        self._bits += frame_bits(length, bool(message.flags.xtd))
+        return CANERR_NOERROR
+
+    def set_filter(self, filters: Optional[List[Tuple[int, int, bool]]]) -> int:
+        """
+        커널 수신 필터(CAN_RAW_FILTER) 설정
+
+        걸러진 프레임은 소켓 버퍼에 들어오지 않으므로 시스템 호출과
+        Message 생성 비용이 들지 않습니다.
+
+        Args:
+            filters: (code, mask, 확장 ID) 목록. None이면 모두 수신
+        """
+        if self.sock is None:
+            return CANERR_NOTINIT
+
+        if filters is None:
+            packed = _CAN_FILTER.pack(0, 0)
+        else:
+            packed = b''.join(
+                _CAN_FILTER.pack((code & CAN_EFF_MASK) | CAN_EFF_FLAG if extended else code & CAN_SFF_MASK,
+                                 (mask & CAN_EFF_MASK) | CAN_EFF_FLAG)
+                for code, mask, extended in filters
+            )
+        try:
+            self.sock.setsockopt(SOL_CAN_RAW, CAN_RAW_FILTER, packed)
+        except OSError:
+            return CANERR_NOTINIT
+        return CANERR_NOERROR
+
+    def read(self, timeout: int = CANREAD_INFINITE) -> Tuple[int, Optional[Message]]:
+        """
+        CAN 프레임 수신
+
+        소켓에 쌓인 프레임은 한 번에 읽어 내부 큐에 보관하므로,
+        이어지는 read() 호출은 시스템 호출 없이 처리됩니다.
+
+        Args:
+            timeout: 대기 시간 (밀리초, CANREAD_INFINITE이면 무한 대기)
+
+        Returns:
+            (결과, 메시지) 튜플
+        """
+        if self.sock is None:
+            return CANERR_NOTINIT, None
+        if not self.started:
+            return CANERR_OFFLINE, None
+
+        rx = self._rx
+        if rx:
+            return CANERR_NOERROR, rx.popleft()
+
+        if not self._receive_batch() and timeout > 0:
+            wait = None if timeout == CANREAD_INFINITE else timeout / 1000.0
+            readable, _, _ = select.select([self.sock], [], [], wait)
+            if readable:
+                self._receive_batch()
+
+        if rx:
+            return CANERR_NOERROR, rx.popleft()
+        return CANERR_RX_EMPTY, None
+
+    def status(self) -> Tuple[int, Optional[Status]]:
+        """소켓 상태 확인"""
+        if self.sock is None:
+            return CANERR_NOTINIT, None
+
+        status = Status()
+        status.bits.can_stopped = 0 if self.started else 1
+        status.bits.receiver_empty = 0 if self._rx else 1
+        return CANERR_NOERROR, status
+
+    def busload(self) -> Tuple[int, float, Optional[Status]]:
+        """
+        직전 호출 이후 이 소켓이 보고 받은 프레임으로 버스 부하(%) 근사
+
+        SocketCAN에는 컨트롤러 버스 부하 값이 없으므로, 필터 없이 수신한
+        프레임과 송신한 프레임의 비트 수로 계산합니다.
+        """
+        result, status = self.status()
+        if result != CANERR_NOERROR:
+            return result, 0.0, None
+
+        now = time.time()
+        elapsed = now - self._busload_time
+        bps = BITRATE_INDEX_BPS.get(self.bitrate_index, 250000)
+        load = 0.0
+        if self.started and elapsed > 0:
+            load = min(100.0, (self._bits - self._busload_bits) * 100.0 / (elapsed * bps))
+        self._busload_bits = self._bits
+        self._busload_time = now
+        return CANERR_NOERROR, load, status
+
+    def bitrate(self) -> Tuple[int, Optional[Bitrate], Optional[BusSpeed]]:
+        """start()에 전달된 비트레이트 확인"""
+        if self.sock is None:
+            return CANERR_NOTINIT, None, None
+
+        bitrate = Bitrate()
+        bitrate.index = self.bitrate_index
+        speed = BusSpeed()
+        speed.nominal.speed = float(BITRATE_INDEX_BPS.get(self.bitrate_index, 0))
+        speed.nominal.samplepoint = 0.875
+        return CANERR_NOERROR, bitrate, speed
+
+    def _receive_batch(self) -> int:
+        """소켓에 쌓인 프레임을 대기 없이 읽어 내부 큐에 추가"""
+        if self._batch is not None:
+            items = self._batch.receive(self.sock.fileno())
+        else:
+            items = []
+            for _ in range(RECV_BATCH):
+                try:
+                    data, ancdata, _, _ = self.sock.recvmsg(CANFD_MTU, _CMSG_SPACE)
+                except (BlockingIOError, InterruptedError):
+                    break
+                stamp = None
+                for level, kind, value in ancdata:
+                    if level == socket.SOL_SOCKET and kind == SO_TIMESTAMP:
+                        sec, usec = _TIMEVAL.unpack_from(value)
+                        stamp = sec + usec / 1e6
+                items.append((data, stamp))
+
+        append = self._rx.append
+        count = 0
+        for data, stamp in items:
+            msg = self._decode(data, stamp)
+            if msg is not None:
+                append(msg)
+                count += 1
+        return count
+
+    def _decode(self, data: bytes, stamp: Optional[float]) -> Optional[Message]:
+        """커널 can_frame/canfd_frame을 Message로 변환"""
+        msg = Message()
+        if len(data) == CANFD_MTU:
+            can_id, length, flags, payload = _CANFD_FRAME.unpack(data)
+            msg.flags.fdf = 1
+            msg.flags.brs = 1 if flags & CANFD_BRS else 0
+            msg.flags.esi = 1 if flags & CANFD_ESI else 0
+            length = min(length, 64)
+        elif len(data) == CAN_MTU:
+            can_id, length, payload = _CAN_FRAME.unpack(data)
+            length = min(length, 8)
+        else:
+            return None
+
+        if can_id & CAN_EFF_FLAG:
+            msg.flags.xtd = 1
+            msg.id = can_id & CAN_EFF_MASK
+        else:
+            msg.id = can_id & CAN_SFF_MASK
+        msg.flags.rtr = 1 if can_id & CAN_RTR_FLAG else 0
+        msg.dlc = len_to_dlc(length) if msg.flags.fdf else length
+        msg.data[:length] = payload[:length]
+
+        if stamp is None:
+            stamp = time.time()
+        msg.timestamp.sec = int(stamp)
+        msg.timestamp.nsec = int((stamp - int(stamp)) * 1e9)
+
+        self._bits += frame_bits(length, bool(msg.flags.xtd))
+        return msg
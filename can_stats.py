@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+프레임 스트림 기반 버스 통계
+
+monitor() 콜백이나 receive_many() 결과를 그대로 넣으면 프레임마다 상수 시간으로
+ID별 프레임 수, 주기 평균/표준편차(Welford), 주기 흔들림(jitter) 히스토그램,
+비트 단위 버스 점유율을 누적합니다. 수신을 멈추지 않고 언제든 snapshot()으로
+현재 값을 읽을 수 있습니다.
+
+ID별 누적값은 ID로 바로 찾는 고정 크기 배열에 저장합니다.
+표준 ID(11비트)는 0~2047칸을 그대로 쓰고, 확장 ID는 처음 볼 때 그 뒤의 칸을
+하나씩 배정합니다 (max_extended_ids를 넘으면 '기타' 칸에 합산).
+
+비트 수는 SOF부터 IFS까지이며, CAN 2.0 프레임은 실제 ID/데이터/CRC-15로
+비트 스터핑 수를 계산합니다. CAN FD 프레임은 스터핑 없이 근사합니다.
+
+사용 예:
+    stats = BusStatistics(bitrate=500000)
+    can.monitor(duration=10, callback=stats.on_message, background=True)
+    print(stats.snapshot()['utilisation'])
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from can_log import message_unpacker
+from can_virtual import DLC_TO_LEN, frame_bits
+
+STD_IDS = 0x800
+
+# 주기 흔들림 히스토그램: 평균 주기와의 차이 |dt - mean|를 2배씩 커지는 구간으로
+# 구간 0은 1us 미만, 구간 k는 [2^(k-1), 2^k) us, 마지막 구간은 그 이상
+JITTER_BUCKETS = 24
+
+CRC15_POLY = 0x4599
+
+
+def _build_crc15_table() -> List[int]:
+    table = []
+    for byte in range(256):
+        crc = byte << 7
+        for _ in range(8):
+            crc = ((crc << 1) ^ CRC15_POLY if crc & 0x4000 else crc << 1) & 0x7FFF
+        table.append(crc)
+    return table
+
+
+def _stuff_step(state: int, bit: int) -> Tuple[int, int]:
+    """상태(마지막 비트 * 6 + 연속 길이)에서 비트 1개 처리: (새 상태, 삽입한 스터프 비트 수)"""
+    last, run = divmod(state, 6)
+    stuffed = 0
+    if run == 5:
+        # 같은 비트 5개 뒤에는 반대 비트 삽입
+        last, run = 1 - last, 1
+        stuffed = 1
+    if run and bit == last:
+        run += 1
+    else:
+        last, run = bit, 1
+    return last * 6 + run, stuffed
+
+
+def _build_stuff_table() -> List[Tuple[int, int]]:
+    """(상태, 바이트) → (새 상태, 스터프 비트 수) 표 (인덱스: 상태 * 256 + 바이트)"""
+    table = []
+    for state in range(12):
+        for byte in range(256):
+            current, stuffed = state, 0
+            for shift in range(7, -1, -1):
+                current, added = _stuff_step(current, (byte >> shift) & 1)
+                stuffed += added
+            table.append((current, stuffed))
+    return table
+
+
+_CRC15_TABLE = _build_crc15_table()
+_STUFF_TABLE = _build_stuff_table()
+
+
+def crc15(value: int, nbits: int) -> int:
+    """
+    CAN CRC-15 (다항식 0x4599)
+
+    Args:
+        value: SOF부터 데이터 끝까지의 비트열 (MSB 먼저)
+        nbits: 비트 수
+    """
+    crc = 0
+    head = nbits % 8
+    for shift in range(nbits - 1, nbits - head - 1, -1):
+        bit = (value >> shift) & 1
+        crc = ((crc << 1) ^ CRC15_POLY if bit ^ (crc >> 14) else crc << 1) & 0x7FFF
+    table = _CRC15_TABLE
+    for byte in (value & ((1 << (nbits - head)) - 1)).to_bytes((nbits - head) // 8, 'big'):
+        crc = ((crc << 8) & 0x7FFF) ^ table[((crc >> 7) ^ byte) & 0xFF]
+    return crc
+
+
+def stuff_bit_count(value: int, nbits: int) -> int:
+    """
+    비트열에 삽입되는 스터프 비트 수
+
+    Args:
+        value: 스터핑 대상 비트열 (SOF부터 CRC 끝까지, MSB 먼저)
+        nbits: 비트 수
+    """
+    state = 0
+    stuffed = 0
+    head = nbits % 8
+    for shift in range(nbits - 1, nbits - head - 1, -1):
+        state, added = _stuff_step(state, (value >> shift) & 1)
+        stuffed += added
+    table = _STUFF_TABLE
+    for byte in (value & ((1 << (nbits - head)) - 1)).to_bytes((nbits - head) // 8, 'big'):
+        state, added = table[state * 256 + byte]
+        stuffed += added
+    # CRC 마지막 비트 뒤에도 같은 비트 5개면 스터프 비트가 들어감
+    if state % 6 == 5:
+        stuffed += 1
+    return stuffed
+
+
+def can_frame_bits(can_id: int, extended: bool, rtr: bool, dlc: int, data: bytes) -> int:
+    """
+    CAN 2.0 프레임의 실제 비트 수 (SOF부터 IFS까지, 스터프 비트 포함)
+
+    Args:
+        can_id: CAN 메시지 ID
+        extended: 확장 ID 여부
+        rtr: 원격 프레임 여부
+        dlc: DLC
+        data: 데이터 바이트
+    """
+    dlc &= 0x0F
+    length = 0 if rtr else min(dlc, 8)
+    if extended:
+        # SOF, ID-A(11), SRR, IDE, ID-B(18), RTR, r1, r0, DLC(4)
+        header = ((can_id >> 18) & 0x7FF) << 27 | 0b11 << 25 | (can_id & 0x3FFFF) << 7 | \
+            (1 if rtr else 0) << 6 | dlc
+        header_bits = 39
+    else:
+        # SOF, ID(11), RTR, IDE, r0, DLC(4)
+        header = (can_id & 0x7FF) << 7 | (1 if rtr else 0) << 6 | dlc
+        header_bits = 19
+
+    value = header << (8 * length) | int.from_bytes(data[:length], 'big')
+    nbits = header_bits + 8 * length
+    value = value << 15 | crc15(value, nbits)
+    nbits += 15
+
+    # CRC 구분자, ACK 슬롯/구분자, EOF 7비트, IFS 3비트
+    return nbits + stuff_bit_count(value, nbits) + 13
+
+
+class BusStatistics:
+    """
+    스트리밍 버스 통계
+    """
+
+    def __init__(self, bitrate: float = 500000, max_extended_ids: int = 4096,
+                 exact_stuffing: bool = True):
+        """
+        통계 초기화
+
+        Args:
+            bitrate: 버스 비트레이트 (bit/s)
+            max_extended_ids: 따로 집계할 최대 확장 ID 수
+            exact_stuffing: False이면 스터프 비트를 계산하지 않음 (더 빠름)
+        """
+        self.bitrate = bitrate
+        self.max_extended_ids = max_extended_ids
+        self.exact_stuffing = exact_stuffing
+
+        slots = STD_IDS + max_extended_ids + 1
+        self._other_slot = slots - 1
+        self._ext_slots = {}  # type: Dict[int, int]
+
+        # 칸별 누적값
+        self.count = [0] * slots
+        self.bits = [0] * slots
+        self.last_time = [0.0] * slots
+        self.period_mean = [0.0] * slots
+        self.period_m2 = [0.0] * slots
+        self.period_min = [math.inf] * slots
+        self.period_max = [0.0] * slots
+        self.jitter = [0] * (slots * JITTER_BUCKETS)
+
+        # 전체 누적값
+        self.frames = 0
+        self.total_bits = 0
+        self.first_time = None  # type: Optional[float]
+        self.latest_time = 0.0
+
+        # 직전 snapshot 이후 구간
+        self._window_time = None  # type: Optional[float]
+        self._window_bits = 0
+
+    @classmethod
+    def for_channel(cls, can, **kwargs) -> 'BusStatistics':
+        """
+        KvaserCAN 채널의 현재 비트레이트로 통계 생성
+
+        Args:
+            can: 시작된 KvaserCAN 인스턴스
+        """
+        result, _, speed = can.get_bitrate()
+        bitrate = speed.nominal.speed if result == 0 and speed is not None and speed.nominal.speed else 500000
+        return cls(bitrate=bitrate, **kwargs)
+
+    def on_message(self, msg) -> bool:
+        """KvaserCAN.monitor() 콜백으로 사용: 메시지를 집계하고 계속 모니터링"""
+        self.update_many((msg,))
+        return True
+
+    def update_many(self, messages: Iterable) -> int:
+        """
+        수신 Message 목록 집계
+
+        Args:
+            messages: Message 구조체 목록 (receive_many, read_capture 결과 등)
+
+        Returns:
+            집계한 메시지 수
+        """
+        message_type = None
+        unpacker = None
+        update = self.update_frame
+        count = 0
+        for msg in messages:
+            if type(msg) is not message_type:
+                message_type = type(msg)
+                unpacker, _ = message_unpacker(message_type)
+            msg_id, flags, dlc, data, sec, nsec = unpacker.unpack_from(msg)
+            update(sec + nsec * 1e-9, msg_id, flags & 0x1F, dlc, data)
+            count += 1
+        return count
+
+    def update_frame(self, timestamp: float, can_id: int, flags: int, dlc: int, data: bytes):
+        """
+        프레임 1개 집계
+
+        Args:
+            timestamp: 수신 시각 (초)
+            can_id: CAN 메시지 ID
+            flags: can_frames FLAG_* 비트 조합 (bit0 xtd, bit1 rtr, bit2 fdf)
+            dlc: DLC
+            data: 데이터 바이트
+        """
+        extended = flags & 0x01
+        if extended:
+            slot = self._ext_slots.get(can_id)
+            if slot is None:
+                slot = self._assign_slot(can_id)
+        else:
+            slot = can_id & 0x7FF
+
+        if flags & 0x04:
+            # CAN FD: 데이터 길이만큼 스터핑 없이 근사
+            bits = frame_bits(0, bool(extended)) + 8 * DLC_TO_LEN[dlc & 0x0F]
+        elif self.exact_stuffing:
+            bits = can_frame_bits(can_id, bool(extended), bool(flags & 0x02), dlc, data)
+        else:
+            bits = frame_bits(0 if flags & 0x02 else dlc, bool(extended))
+
+        self.frames += 1
+        self.total_bits += bits
+        self._window_bits += bits
+        if self.first_time is None:
+            self.first_time = timestamp
+            self._window_time = timestamp
+        if timestamp > self.latest_time:
+            self.latest_time = timestamp
+
+        count = self.count[slot] + 1
+        self.count[slot] = count
+        self.bits[slot] += bits
+        last = self.last_time[slot]
+        self.last_time[slot] = timestamp
+        if count == 1:
+            return
+
+        # 주기 Welford 누적 (주기 개수 = count - 1)
+        period = timestamp - last
+        n = count - 1
+        mean = self.period_mean[slot]
+        delta = period - mean
+        mean += delta / n
+        self.period_mean[slot] = mean
+        self.period_m2[slot] += delta * (period - mean)
+        if period < self.period_min[slot]:
+            self.period_min[slot] = period
+        if period > self.period_max[slot]:
+            self.period_max[slot] = period
+
+        if n > 1:
+            deviation_us = int(abs(period - mean) * 1e6)
+            bucket = min(deviation_us.bit_length(), JITTER_BUCKETS - 1)
+            self.jitter[slot * JITTER_BUCKETS + bucket] += 1
+
+    def _assign_slot(self, can_id: int) -> int:
+        if len(self._ext_slots) >= self.max_extended_ids:
+            return self._other_slot
+        slot = STD_IDS + len(self._ext_slots)
+        self._ext_slots[can_id] = slot
+        return slot
+
+    def id_stats(self, can_id: int, extended: Optional[bool] = None) -> Optional[Dict[str, object]]:
+        """
+        ID 하나의 통계
+
+        Args:
+            can_id: CAN 메시지 ID
+            extended: 확장 ID 여부 (None이면 0x7FF보다 크면 확장 ID)
+
+        Returns:
+            통계 딕셔너리 (수신한 적이 없으면 None). 시간 단위는 초
+        """
+        if extended is None:
+            extended = can_id > 0x7FF
+        slot = self._ext_slots.get(can_id) if extended else can_id & 0x7FF
+        if slot is None or self.count[slot] == 0:
+            return None
+        return self._slot_stats(slot)
+
+    def _slot_stats(self, slot: int) -> Dict[str, object]:
+        count = self.count[slot]
+        periods = count - 1
+        mean = self.period_mean[slot]
+        elapsed = self.latest_time - self.first_time if self.first_time is not None else 0.0
+        return {
+            'count': count,
+            'rate': count / elapsed if elapsed > 0 else 0.0,
+            'bits': self.bits[slot],
+            'utilisation': self.bits[slot] / (elapsed * self.bitrate) * 100.0 if elapsed > 0 else 0.0,
+            'period_mean': mean,
+            'period_stddev': math.sqrt(self.period_m2[slot] / (periods - 1)) if periods > 1 else 0.0,
+            'period_min': self.period_min[slot] if periods else 0.0,
+            'period_max': self.period_max[slot] if periods else 0.0,
+            'jitter_histogram': self.jitter[slot * JITTER_BUCKETS:(slot + 1) * JITTER_BUCKETS],
+        }
+
+    def snapshot(self, reset_window: bool = True) -> Dict[str, object]:
+        """
+        현재 통계 (수신 중에도 호출 가능)
+
+        Args:
+            reset_window: True이면 window_utilisation 구간을 지금부터 다시 시작
+
+        Returns:
+            {'frames', 'bits', 'elapsed', 'utilisation'(%), 'window_utilisation'(%),
+             'ids': {ID: ID별 통계}} 딕셔너리. 확장 ID 키는 bit31을 세운 값,
+            max_extended_ids를 넘은 확장 ID는 키 'other'에 합산
+        """
+        elapsed = self.latest_time - self.first_time if self.first_time is not None else 0.0
+        window_elapsed = self.latest_time - self._window_time if self._window_time is not None else 0.0
+        window_bits = self._window_bits
+
+        ids = {}
+        count = self.count
+        for slot in range(STD_IDS):
+            if count[slot]:
+                ids[slot] = self._slot_stats(slot)
+        for can_id, slot in list(self._ext_slots.items()):
+            if count[slot]:
+                ids[can_id | 0x80000000] = self._slot_stats(slot)
+        if count[self._other_slot]:
+            ids['other'] = self._slot_stats(self._other_slot)
+
+        if reset_window:
+            self._window_time = self.latest_time
+            self._window_bits -= window_bits
+
+        return {
+            'frames': self.frames,
+            'bits': self.total_bits,
+            'elapsed': elapsed,
+            'utilisation': self.total_bits / (elapsed * self.bitrate) * 100.0 if elapsed > 0 else 0.0,
+            'window_utilisation': window_bits / (window_elapsed * self.bitrate) * 100.0
+            if window_elapsed > 0 else 0.0,
+            'ids': ids,
+        }
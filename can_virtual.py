@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+가상 CAN 백엔드
+
+CANAPI 공유 라이브러리나 실제 디바이스 없이 KvaserCAN을 실행하기 위한
+순수 Python 백엔드입니다. CANAPI와 같은 init/start/read/write/status/
+busload/bitrate/test/reset/exit 메서드를 제공하며, 같은 채널 번호로 연
+VirtualCANAPI 인스턴스끼리는 하나의 가상 버스를 공유해 서로의 메시지를 받습니다.
+
+메시지 구조체는 CANAPI와 같은 필드 이름(id, flags, dlc, data, timestamp)을 사용합니다.
+"""
+import collections
+import threading
+import time
+from ctypes import LittleEndianStructure, Structure, Union
+from ctypes import c_uint8, c_uint32, c_int32, c_long, c_int, c_float
+from typing import List, Tuple, Optional
+
+from can_filter import AcceptanceFilter
+
+# 모드 / 읽기 관련 상수 (CANAPI와 동일한 값)
+CANMODE_DEFAULT = 0x00
+CANBTR_INDEX_1M = 0
+CANBTR_INDEX_250K = -3
+CANREAD_INFINITE = 65535
+CANFD_MAX_LEN = 64
+
+# 결과 코드 (CANAPI와 동일한 값)
+CANERR_NOERROR = 0
+CANERR_OFFLINE = -9
+CANERR_TX_BUSY = -20
+CANERR_RX_EMPTY = -30
+CANERR_NOTINIT = -95
+
+# 채널 상태 (test 결과)
+CANBRD_PRESENT = 0
+CANBRD_NOT_PRESENT = -1
+
+# 가상 버스로 제공할 채널 수
+VIRTUAL_CHANNELS = 8
+
+# 비트레이트 인덱스 → bit/s
+BITRATE_INDEX_BPS = {
+    0: 1000000,
+    -1: 800000,
+    -2: 500000,
+    -3: 250000,
+    -4: 125000,
+    -5: 100000,
+    -6: 50000,
+    -7: 20000,
+    -8: 10000,
+}
+
+
+class OpModeBits(LittleEndianStructure):
+    _fields_ = [
+        ("fdoe", c_uint8, 1),
+        ("brse", c_uint8, 1),
+        ("niso", c_uint8, 1),
+        ("shrd", c_uint8, 1),
+        ("nxtd", c_uint8, 1),
+        ("nrtr", c_uint8, 1),
+        ("err", c_uint8, 1),
+        ("mon", c_uint8, 1),
+    ]
+
+
+class OpMode(Union):
+    _fields_ = [("byte", c_uint8), ("bits", OpModeBits)]
+
+
+class Bitrate(Structure):
+    _fields_ = [("index", c_int32)]
+
+
+class StatusBits(LittleEndianStructure):
+    _fields_ = [
+        ("queue_overrun", c_uint8, 1),
+        ("message_lost", c_uint8, 1),
+        ("receiver_empty", c_uint8, 1),
+        ("transmitter_busy", c_uint8, 1),
+        ("bus_error", c_uint8, 1),
+        ("warning_level", c_uint8, 1),
+        ("bus_off", c_uint8, 1),
+        ("can_stopped", c_uint8, 1),
+    ]
+
+
+class Status(Union):
+    _fields_ = [("byte", c_uint8), ("bits", StatusBits)]
+
+
+class Speed(Structure):
+    _fields_ = [("fdoe", c_int), ("speed", c_float), ("samplepoint", c_float)]
+
+
+class BusSpeed(Structure):
+    _fields_ = [("nominal", Speed), ("data", Speed)]
+
+
+class MsgFlags(LittleEndianStructure):
+    _fields_ = [
+        ("xtd", c_uint32, 1),
+        ("rtr", c_uint32, 1),
+        ("fdf", c_uint32, 1),
+        ("brs", c_uint32, 1),
+        ("esi", c_uint32, 1),
+        ("_reserved", c_uint32, 2),
+        ("sts", c_uint32, 1),
+    ]
+
+
+class Timestamp(Structure):
+    _fields_ = [("sec", c_long), ("nsec", c_long)]
+
+
+class Message(Structure):
+    _fields_ = [
+        ("id", c_uint32),
+        ("flags", MsgFlags),
+        ("dlc", c_uint8),
+        ("data", c_uint8 * CANFD_MAX_LEN),
+        ("timestamp", Timestamp),
+    ]
+
+
+# CAN FD DLC 코드 → 데이터 길이
+DLC_TO_LEN = (0, 1, 2, 3, 4, 5, 6, 7, 8, 12, 16, 20, 24, 32, 48, 64)
+
+# 프레임 플래그 비트 (can_frames 배열의 flags 필드, send_many 등의 튜플 플래그)
+FLAG_XTD = 0x01
+FLAG_RTR = 0x02
+FLAG_FDF = 0x04
+FLAG_BRS = 0x08
+FLAG_ESI = 0x10
+
+
+def len_to_dlc(length: int) -> int:
+    """
+    데이터 길이를 CAN FD DLC 코드로 변환 (길이 이상인 가장 작은 코드)
+
+    Args:
+        length: 데이터 길이 (0~64)
+
+    Returns:
+        DLC 코드 (0~15)
+    """
+    for dlc, size in enumerate(DLC_TO_LEN):
+        if size >= length:
+            return dlc
+    return 15
+
+
+def frame_bits(dlc: int, extended_id: bool = False) -> int:
+    """
+    CAN 2.0 프레임 비트 수 근사값 (스터프 비트 제외)
+
+    Args:
+        dlc: 데이터 길이
+        extended_id: 확장 ID 여부
+
+    Returns:
+        SOF부터 IFS까지의 비트 수
+    """
+    return (67 if extended_id else 47) + 8 * min(dlc, 8)
+
+
+class VirtualBus:
+    """
+    가상 CAN 버스: 연결된 노드 사이에서 메시지를 전달
+    """
+
+    def __init__(self, channel: int):
+        self.channel = channel
+        self.nodes = []
+        self.lock = threading.Lock()
+
+        # 버스 부하 계산용 누적 비트 수
+        self.bits = 0
+
+    def attach(self, node: 'VirtualCANAPI'):
+        with self.lock:
+            if node not in self.nodes:
+                self.nodes.append(node)
+
+    def detach(self, node: 'VirtualCANAPI'):
+        with self.lock:
+            if node in self.nodes:
+                self.nodes.remove(node)
+
+    def transmit(self, sender: 'VirtualCANAPI', message) -> int:
+        """
+        메시지를 송신 노드를 제외한 모든 노드에 전달
+
+        수신 노드들은 같은 메시지 객체를 공유하므로 읽기 전용으로 다뤄야 합니다.
+        """
+        msg = Message()
+        msg.id = message.id
+        msg.flags.xtd = message.flags.xtd
+        msg.flags.rtr = message.flags.rtr
+        msg.flags.fdf = message.flags.fdf
+        msg.flags.brs = message.flags.brs
+        msg.flags.esi = message.flags.esi
+        msg.dlc = message.dlc
+        msg.data[:] = message.data[:CANFD_MAX_LEN]
+
+        now = time.time()
+        msg.timestamp.sec = int(now)
+        msg.timestamp.nsec = int((now - int(now)) * 1e9)
+
+        with self.lock:
+            self.bits += frame_bits(msg.dlc, bool(msg.flags.xtd))
+            for node in self.nodes:
+                if node is not sender:
+                    node._deliver(msg)
+
+        return CANERR_NOERROR
+
+
+# 채널 번호 → 가상 버스
+_buses = {}
+_buses_lock = threading.Lock()
+
+
+def get_bus(channel: int) -> VirtualBus:
+    """
+    채널 번호에 해당하는 가상 버스 가져오기 (없으면 생성)
+
+    Args:
+        channel: 채널 번호
+
+    Returns:
+        가상 버스
+    """
+    with _buses_lock:
+        bus = _buses.get(channel)
+        if bus is None:
+            bus = _buses[channel] = VirtualBus(channel)
+        return bus
+
+
+class VirtualCANAPI:
+    """
+    CANAPI와 같은 인터페이스를 제공하는 가상 CAN 노드
+    """
+
+    def __init__(self, library: str = None, queue_size: int = 65536):
+        """
+        가상 노드 초기화
+
+        Args:
+            library: 사용하지 않음 (CANAPI와 생성자 형태를 맞추기 위한 인자)
+            queue_size: 수신 큐 크기 (초과 시 메시지 손실)
+        """
+        self.queue_size = queue_size
+        self.bus = None
+        self.mode = OpMode()
+        self.bitrate_index = CANBTR_INDEX_250K
+        self.started = False
+
+        self._rx = collections.deque()
+        self._rx_ready = threading.Condition(threading.Lock())
+        self._message_lost = False
+        self._busload_bits = 0
+        self._busload_time = time.time()
+        self._filter = None
+
+    @staticmethod
+    def version() -> str:
+        return 'VirtualCANAPI 1.0'
+
+    def hardware(self) -> str:
+        return 'Virtual CAN'
+
+    def firmware(self) -> str:
+        return 'Virtual CAN'
+
+    def serial_number(self) -> Optional[str]:
+        """연결된 가상 버스 기준 고정 시리얼 번호 (연결 전이면 None)"""
+        return None if self.bus is None else f'VCAN-{self.bus.channel:04d}'
+
+    def test(self, channel: int, mode: OpMode = None, param=None) -> Tuple[int, int]:
+        """
+        채널 존재 여부 확인
+
+        Returns:
+            (결과, 상태) 튜플. 상태 0이면 사용 가능
+        """
+        if 0 <= channel < VIRTUAL_CHANNELS:
+            return CANERR_NOERROR, CANBRD_PRESENT
+        return CANERR_NOERROR, CANBRD_NOT_PRESENT
+
+    def init(self, channel: int, mode: OpMode = None, param=None) -> int:
+        """가상 버스에 연결"""
+        if not (0 <= channel < VIRTUAL_CHANNELS):
+            return CANERR_NOTINIT
+        if self.bus is not None:
+            self.exit()
+
+        if mode is not None:
+            self.mode.byte = mode.byte
+        self.bus = get_bus(channel)
+        self.bus.attach(self)
+        return CANERR_NOERROR
+
+    def exit(self) -> int:
+        """가상 버스에서 분리"""
+        if self.bus is None:
+            return CANERR_NOTINIT
+
+        self.reset()
+        self.bus.detach(self)
+        self.bus = None
+        return CANERR_NOERROR
+
+    def start(self, bitrate: Bitrate) -> int:
+        """가상 컨트롤러 시작"""
+        if self.bus is None:
+            return CANERR_NOTINIT
+
+        self.bitrate_index = bitrate.index
+        with self._rx_ready:
+            self._rx.clear()
+            self._message_lost = False
+        self._busload_bits = self.bus.bits
+        self._busload_time = time.time()
+        self.started = True
+        return CANERR_NOERROR
+
+    def reset(self) -> int:
+        """가상 컨트롤러 중지"""
+        if self.bus is None:
+            return CANERR_NOTINIT
+
+        self.started = False
+        with self._rx_ready:
+            # 대기 중인 read() 깨우기
+            self._rx_ready.notify_all()
+        return CANERR_NOERROR
+
+    def write(self, message, timeout: int = 0) -> int:
+        """가상 버스로 메시지 송신"""
+        if self.bus is None:
+            return CANERR_NOTINIT
+        if not self.started:
+            return CANERR_OFFLINE
+
+        return self.bus.transmit(self, message)
+
+    def set_filter(self, filters: Optional[List[Tuple[int, int, bool]]]) -> int:
+        """
+        수신 필터 설정 (걸러진 메시지는 수신 큐에 들어가지 않음)
+
+        Args:
+            filters: (code, mask, 확장 ID) 목록. None이면 모두 수신
+        """
+        self._filter = None if filters is None else AcceptanceFilter(masks=filters)
+        return CANERR_NOERROR
+
+    def read(self, timeout: int = CANREAD_INFINITE) -> Tuple[int, Optional[Message]]:
+        """
+        수신 큐에서 메시지 읽기
+
+        Args:
+            timeout: 대기 시간 (밀리초, CANREAD_INFINITE이면 무한 대기)
+
+        Returns:
+            (결과, 메시지) 튜플
+        """
+        if self.bus is None:
+            return CANERR_NOTINIT, None
+        if not self.started:
+            return CANERR_OFFLINE, None
+
+        rx = self._rx
+        if rx:
+            return CANERR_NOERROR, rx.popleft()
+
+        if timeout > 0:
+            with self._rx_ready:
+                if not rx and self.started:
+                    if timeout == CANREAD_INFINITE:
+                        self._rx_ready.wait()
+                    else:
+                        self._rx_ready.wait(timeout / 1000.0)
+
+        if rx:
+            return CANERR_NOERROR, rx.popleft()
+        return CANERR_RX_EMPTY, None
+
+    def status(self) -> Tuple[int, Optional[Status]]:
+        """가상 컨트롤러 상태 확인 (메시지 손실 플래그는 읽으면 초기화)"""
+        if self.bus is None:
+            return CANERR_NOTINIT, None
+
+        status = Status()
+        status.bits.can_stopped = 0 if self.started else 1
+        status.bits.receiver_empty = 0 if self._rx else 1
+        with self._rx_ready:
+            status.bits.message_lost = 1 if self._message_lost else 0
+            self._message_lost = False
+        return CANERR_NOERROR, status
+
+    def busload(self) -> Tuple[int, float, Optional[Status]]:
+        """직전 호출 이후 가상 버스에 실린 비트 수로 버스 부하(%) 계산"""
+        result, status = self.status()
+        if result != CANERR_NOERROR:
+            return result, 0.0, None
+
+        now = time.time()
+        bits = self.bus.bits
+        elapsed = now - self._busload_time
+        bps = BITRATE_INDEX_BPS.get(self.bitrate_index, 250000)
+        load = 0.0
+        if self.started and elapsed > 0:
+            load = min(100.0, (bits - self._busload_bits) * 100.0 / (elapsed * bps))
+        self._busload_bits = bits
+        self._busload_time = now
+        return CANERR_NOERROR, load, status
+
+    def bitrate(self) -> Tuple[int, Optional[Bitrate], Optional[BusSpeed]]:
+        """설정된 비트레이트 확인"""
+        if self.bus is None:
+            return CANERR_NOTINIT, None, None
+
+        bitrate = Bitrate()
+        bitrate.index = self.bitrate_index
+        speed = BusSpeed()
+        speed.nominal.speed = float(BITRATE_INDEX_BPS.get(self.bitrate_index, 0))
+        speed.nominal.samplepoint = 0.875
+        return CANERR_NOERROR, bitrate, speed
+
+    def _deliver(self, msg: Message):
+        """버스에서 호출: 수신 큐에 메시지 추가"""
+        if not self.started:
+            return
+        if self._filter is not None and not self._filter.accepts_message(msg):
+            return
+
+        with self._rx_ready:
+            if len(self._rx) >= self.queue_size:
+                self._message_lost = True
+                return
+            self._rx.append(msg)
+            self._rx_ready.notify()
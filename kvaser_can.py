@@ -4,9 +4,10 @@
 Kvaser CAN 클래스 라이브러리
 """
 import sys
-import platform
 import time
-from typing import List, Tuple, Optional, Union
+import threading
+import ctypes
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Tuple, Optional, Union
 import os
 
 """
@@ -42,32 +43,90 @@ OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
 OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
-# 사용자 홈 디렉토리 가져오기
-home_dir = os.path.expanduser('~')
-# KvaserCAN-Library 예제 경로 설정
-canapi_path = os.path.join(home_dir, 'KvaserCAN-Library', 'Examples', 'Python')
+# CANAPI.py가 있는 디렉토리 (KvaserCAN-Library 예제 경로)
+# 환경 변수 KVASER_CANAPI_PATH 또는 set_canapi_path()로 바꿀 수 있음
+CANAPI_PATH_ENV = 'KVASER_CANAPI_PATH'
+DEFAULT_CANAPI_PATH = os.path.join(os.path.expanduser('~'), 'KvaserCAN-Library', 'Examples', 'Python')
+canapi_path = os.environ.get(CANAPI_PATH_ENV) or DEFAULT_CANAPI_PATH
+
+# 처음 KvaserCAN(backend='kvaser')를 만들 때 불러온 CANAPI 모듈
+_canapi = None
+
+# 구조체와 상수는 CANAPI와 같은 정의를 가진 가상 백엔드 것을 기본으로 사용
+# (kvaser 백엔드 인스턴스는 불러온 CANAPI 모듈의 구조체를 사용)
+import can_virtual
+from can_virtual import OpMode, Bitrate, Message, Status
+from can_virtual import CANMODE_DEFAULT, CANBTR_INDEX_250K, CANREAD_INFINITE
+from can_virtual import CANERR_NOERROR, CANERR_RX_EMPTY
+from can_virtual import FLAG_XTD, FLAG_RTR
+from can_filter import AcceptanceFilter
+# 백엔드(can_socketcan)와 NumPy를 쓰는 can_frames, 캡처/계측 모듈은
+# 사용하는 메서드에서 불러옴 (import kvaser_can 시간을 줄이기 위함)
+if TYPE_CHECKING:
+    from can_frames import FrameArrayCapture
+    from can_ringbuffer import FrameRingBuffer
+
+# 사용 가능한 백엔드 이름
+BACKENDS = ('kvaser', 'virtual', 'socketcan')
+
+# enable_instrumentation()이 계측하는 메서드
+INSTRUMENTED_METHODS = ('send', 'send_many', 'receive', 'receive_many')
+
+
+def set_canapi_path(path: str):
+    """
+    CANAPI.py 위치 설정 (첫 KvaserCAN(backend='kvaser') 생성 전에 호출)
 
-# CANAPI 모듈 경로 추가
-sys.path.append(canapi_path)
-from CANAPI import CANAPI, OpMode, Bitrate, Message, Status
-from CANAPI import CANMODE_DEFAULT, CANBTR_INDEX_250K, CANREAD_INFINITE
-from CANAPI import CANERR_NOERROR, CANERR_RX_EMPTY
+    Args:
+        path: CANAPI.py가 있는 디렉토리
+    """
+    global canapi_path
+    canapi_path = path
 
 
-class KvaserCAN:
+def load_canapi():
     """
-    Kvaser CAN 인터페이스 클래스
+    CANAPI 모듈 불러오기
+
+    처음 호출할 때 canapi_path를 모듈 검색 경로에 추가하고 CANAPI를 불러옵니다.
+    (네이티브 드라이버도 이때 로드) 이후에는 불러온 모듈을 그대로 돌려줍니다.
+
+    Returns:
+        CANAPI 모듈
+
+    Raises:
+        ImportError: CANAPI 모듈을 찾을 수 없을 때
     """
+    global _canapi
+    if _canapi is None:
+        if canapi_path not in sys.path:
+            sys.path.append(canapi_path)
+        try:
+            import CANAPI
+        except ImportError as error:
+            raise ImportError(f"CANAPI 모듈을 찾을 수 없습니다: {canapi_path} "
+                              f"({CANAPI_PATH_ENV} 환경 변수로 위치 지정 가능)") from error
+        _canapi = CANAPI
+    return _canapi
 
-    def __init__(self, lib_name: str = None):
-        """
-        Kvaser CAN 클래스 초기화
 
-        Args:
-            lib_name: 드라이버 라이브러리 파일명 (None이면 자동 선택)
-        """
+def create_api(backend: str = 'kvaser', lib_name: str = None):
+    """
+    백엔드 API 인스턴스 생성
+
+    Args:
+        backend: 'kvaser', 'virtual' 또는 'socketcan'
+        lib_name: 드라이버 라이브러리 파일명 또는 socketcan 인터페이스 이름 접두사 (None이면 자동 선택)
+
+    Returns:
+        (API 인스턴스, 구조체/상수를 정의한 모듈) 튜플
+    """
+    if backend == 'kvaser':
+        canapi = load_canapi()
+
         # 드라이버 라이브러리 파일명 자동 선택
         if lib_name is None:
+            import platform
             if platform.system() == 'Darwin':
                 lib_name = 'libUVCANKVL.dylib'
             elif platform.system() != 'Windows':
@@ -75,11 +134,69 @@ class KvaserCAN:
             else:
                 lib_name = 'u3cankvl.dll'
 
-        # API 인스턴스 생성
-        self.api = CANAPI(lib_name)
+        return canapi.CANAPI(lib_name), canapi
+    if backend == 'virtual':
+        return can_virtual.VirtualCANAPI(lib_name), can_virtual
+    if backend == 'socketcan':
+        from can_socketcan import SocketCANAPI
+        return SocketCANAPI(lib_name), can_virtual
+    raise ValueError(f"지원하지 않는 백엔드: {backend} (사용 가능: {', '.join(BACKENDS)})")
+
+
+class KvaserCAN:
+    """
+    Kvaser CAN 인터페이스 클래스
+    """
+
+    def __init__(self, lib_name: str = None, backend: str = 'kvaser'):
+        """
+        Kvaser CAN 클래스 초기화
+
+        Args:
+            lib_name: 드라이버 라이브러리 파일명 (None이면 자동 선택)
+                      socketcan 백엔드에서는 인터페이스 이름 접두사 (None이면 'can')
+            backend: 'kvaser' (CANAPI 드라이버), 'virtual' (프로세스 내 가상 버스)
+                     또는 'socketcan' (Linux AF_CAN raw 소켓)
+        """
         self.channel = -1
         self.is_initialized = False
         self.is_started = False
+        self.backend = backend
+        self.lib_name = lib_name
+
+        # API 인스턴스 생성
+        self.api, canapi = create_api(backend, lib_name)
+
+        # 드라이버에 넘기는 구조체 타입 (백엔드 모듈의 정의)
+        self._types = canapi
+        self._message_type = canapi.Message
+
+        # 백그라운드 수신 스레드 상태
+        self.capture_buffer = None
+        self.capture_result = CANERR_NOERROR
+        self._capture_thread = None
+        self._capture_stop = threading.Event()
+
+        # send_many()에서 재사용하는 송신 메시지 구조체
+        self._tx_message = self._message_type()
+        # send()/send_many()로 드라이버가 받아들인 메시지 수 (계측 여부와 무관)
+        self.tx_frames = 0
+
+        # 수신 ID 필터 (None이면 모두 수신)
+        # rx_filter는 실제 적용 중인 필터, _user_filter는 set_filter()로 지정한 필터
+        self.rx_filter = None
+        self._accept = None
+        self._user_filter = None
+
+        # ID별 구독 핸들러 {키: (메시지별 핸들러 목록, 묶음 핸들러 목록)}
+        # 키는 표준 ID 그대로, 확장 ID는 bit31을 세운 값
+        self._subscriptions = {}  # type: Dict[int, Tuple[List[Callable], List[Callable]]]
+        # subscribe(narrow_filter=True)로 수신 필터를 구독 ID로 좁혔는지 여부
+        self._narrow_filter = False
+
+        # 송수신 계측 (None이면 꺼짐, 끈 뒤에도 마지막 결과는 stats()로 조회 가능)
+        self.instrumentation = None
+        self._instrumented = False
 
         # 드라이버 버전 정보
         self.version = self.api.version()
@@ -104,7 +221,7 @@ class KvaserCAN:
             self.close()
 
         # 작동 모드 설정
-        op_mode = OpMode()
+        op_mode = self._types.OpMode()
         op_mode.byte = CANMODE_DEFAULT
 
         # 모니터 모드 활성화 (요청 시)
@@ -118,6 +235,10 @@ class KvaserCAN:
             self.channel = channel
             self.is_initialized = True
 
+            # 열기 전에 설정한 필터를 하드웨어에 적용
+            if self.rx_filter is not None:
+                self._program_filter()
+
         return result
 
     def start(self, bitrate_index: int = -3) -> int:
@@ -134,7 +255,7 @@ class KvaserCAN:
             return -95  # CANERR_NOTINIT
 
         # 비트레이트 설정
-        bit_rate = Bitrate()
+        bit_rate = self._types.Bitrate()
         bit_rate.index = bitrate_index
 
         # CAN 컨트롤러 시작
@@ -154,6 +275,13 @@ class KvaserCAN:
         """
         result = CANERR_NOERROR
 
+        # 생성자에서 백엔드 생성에 실패한 경우
+        if not hasattr(self, 'api'):
+            return result
+
+        # 백그라운드 수신 스레드가 있으면 먼저 중지
+        self.stop_capture()
+
         if self.is_started:
             # CAN 컨트롤러 중지
             result = self.api.reset()
@@ -167,6 +295,235 @@ class KvaserCAN:
 
         return result
 
+    def set_filter(self, ids: Iterable = None, ranges: Iterable = None,
+                   masks: Iterable = None) -> int:
+        """
+        수신 ID 필터 설정
+
+        조건은 비트맵(11비트)/해시 집합(29비트)으로 컴파일되어 receive(),
+        receive_many(), monitor(), 백그라운드 수신에서 걸러집니다. 백엔드가
+        수신 필터(set_filter)를 지원하면 같은 조건을 하드웨어/커널에도 설정해
+        원하지 않는 메시지가 Python까지 올라오지 않게 합니다.
+
+        Args:
+            ids: ID 또는 (ID, 확장) 목록
+            ranges: (첫 ID, 마지막 ID[, 확장]) 목록
+            masks: (code, mask[, 확장]) 목록
+            (확장 여부를 생략하면 0x7FF보다 큰 ID를 확장 ID로 보며, 0x7FF를 넘어가는
+             범위는 표준 ID 부분과 확장 ID 부분으로 나눔)
+
+        Returns:
+            0 성공, 음수 오류 코드 (하드웨어 필터 설정 실패 시에도 소프트웨어 필터는 적용됨)
+        """
+        self._user_filter = AcceptanceFilter(ids, ranges, masks)
+        return self._apply_filter()
+
+    @property
+    def user_filter(self) -> Optional[AcceptanceFilter]:
+        """set_filter()로 지정한 필터 (없으면 None, 구독으로 좁힌 조건은 rx_filter에 반영)"""
+        return self._user_filter
+
+    def clear_filter(self) -> int:
+        """
+        수신 ID 필터 해제 (모든 메시지 수신, subscribe(narrow_filter=True)로 좁힌 조건은 유지)
+
+        Returns:
+            0 성공, 음수 오류 코드
+        """
+        self._user_filter = None
+        return self._apply_filter()
+
+    def subscribe(self, can_id: int, handler: Callable, extended_id: Optional[bool] = None,
+                  batch: bool = False, narrow_filter: bool = False) -> int:
+        """
+        ID별 핸들러 등록
+
+        monitor(callback=None)과 dispatch()가 등록된 핸들러를 호출합니다.
+        기본적으로 수신 필터는 바꾸지 않으므로 receive()/monitor(callback)은 계속
+        set_filter()로 지정한 조건대로 수신합니다. narrow_filter=True이면 이후 수신
+        필터를 구독 ID 중 set_filter() 조건을 통과하는 ID로 좁혀, 구독하지 않은 ID를
+        하드웨어/커널 필터나 비트맵 단계에서 버립니다 (구독이 모두 해제되면 원래 필터로 복귀).
+
+        Args:
+            can_id: CAN 메시지 ID
+            handler: batch=False이면 handler(msg), True이면 handler(msgs: List[Message])
+                     (한 번의 수신 묶음에 들어 있던 해당 ID 메시지를 한 번에 전달)
+            extended_id: 확장 ID 여부 (None이면 0x7FF보다 크면 확장 ID)
+            batch: 묶음 단위 호출 여부
+            narrow_filter: True이면 수신 필터를 구독 ID로 좁힘
+
+        Returns:
+            0 성공, 음수 오류 코드 (수신 필터 설정 결과)
+        """
+        extended = can_id > 0x7FF if extended_id is None else extended_id
+        key = can_id | 0x80000000 if extended else can_id
+        single, batched = self._subscriptions.setdefault(key, ([], []))
+        (batched if batch else single).append(handler)
+        if narrow_filter:
+            self._narrow_filter = True
+        if not self._narrow_filter:
+            return CANERR_NOERROR
+        return self._apply_filter()
+
+    def unsubscribe(self, can_id: int, handler: Callable = None,
+                    extended_id: Optional[bool] = None) -> int:
+        """
+        ID별 핸들러 해제
+
+        Args:
+            can_id: CAN 메시지 ID
+            handler: 해제할 핸들러 (None이면 해당 ID의 모든 핸들러)
+            extended_id: 확장 ID 여부 (None이면 0x7FF보다 크면 확장 ID)
+
+        Returns:
+            0 성공, 음수 오류 코드 (수신 필터 설정 결과)
+        """
+        extended = can_id > 0x7FF if extended_id is None else extended_id
+        key = can_id | 0x80000000 if extended else can_id
+        entry = self._subscriptions.get(key)
+        if entry is None:
+            return CANERR_NOERROR
+
+        if handler is None:
+            del self._subscriptions[key]
+        else:
+            for handlers in entry:
+                if handler in handlers:
+                    handlers.remove(handler)
+            if not entry[0] and not entry[1]:
+                del self._subscriptions[key]
+
+        if not self._narrow_filter:
+            return CANERR_NOERROR
+        if not self._subscriptions:
+            self._narrow_filter = False
+        return self._apply_filter()
+
+    def dispatch(self, frames: Iterable[Message]) -> int:
+        """
+        수신 묶음을 ID별 핸들러에 전달
+
+        메시지별 핸들러는 수신 순서대로 호출하고, 묶음 핸들러는 모든 메시지를
+        ID별로 모은 뒤 ID마다 한 번 호출합니다. 구독하지 않은 ID는 무시합니다.
+
+        Args:
+            frames: 수신한 Message 목록 (receive_many, read_capture 결과 등)
+
+        Returns:
+            핸들러에 전달된 메시지 수
+        """
+        subscriptions = self._subscriptions
+        groups = {}  # type: Dict[int, List[Message]]
+        delivered = 0
+
+        for msg in frames:
+            key = msg.id | 0x80000000 if msg.flags.xtd else msg.id
+            entry = subscriptions.get(key)
+            if entry is None:
+                continue
+            delivered += 1
+
+            for handler in entry[0]:
+                handler(msg)
+            if entry[1]:
+                group = groups.get(key)
+                if group is None:
+                    groups[key] = [msg]
+                else:
+                    group.append(msg)
+
+        for key, group in groups.items():
+            for handler in subscriptions[key][1]:
+                handler(group)
+
+        return delivered
+
+    def _apply_filter(self) -> int:
+        """사용자 필터와 구독 ID로 실제 수신 필터를 정해 적용"""
+        rx_filter = self._user_filter
+        if self._narrow_filter and self._subscriptions:
+            ids = [(key & 0x1FFFFFFF, bool(key & 0x80000000)) for key in self._subscriptions]
+            if rx_filter is not None:
+                ids = [(can_id, extended) for can_id, extended in ids
+                       if rx_filter.accepts(can_id, extended)]
+            rx_filter = AcceptanceFilter(ids=ids)
+
+        self.rx_filter = rx_filter
+        self._accept = None if rx_filter is None else rx_filter.accepts_message
+        if not self.is_initialized:
+            return CANERR_NOERROR
+        if rx_filter is not None:
+            return self._program_filter()
+
+        api_filter = getattr(self.api, 'set_filter', None)
+        if api_filter is None:
+            return CANERR_NOERROR
+        return api_filter(None)
+
+    def _program_filter(self) -> int:
+        """rx_filter를 백엔드 수신 필터로 설정 (지원하지 않으면 소프트웨어 필터만 사용)"""
+        api_filter = getattr(self.api, 'set_filter', None)
+        if api_filter is None:
+            return CANERR_NOERROR
+
+        filters, exact = self.rx_filter.hardware_filters()
+        result = api_filter(filters)
+
+        # 하드웨어 필터가 조건과 정확히 같으면 소프트웨어 확인 생략
+        self._accept = None if result == CANERR_NOERROR and exact else self.rx_filter.accepts_message
+        return result
+
+    def enable_instrumentation(self, enabled: bool = True, reset: bool = False):
+        """
+        송수신 계측 켜기/끄기
+
+        켜면 send/send_many/receive/receive_many, CANAPI read/write, monitor() 콜백과
+        dispatch() 실행 시간을 로그 버킷 히스토그램에, 반환 결과 코드를 횟수로 기록합니다.
+        끄면 감싼 메서드를 지워 원래 경로로 돌아가므로 추가 비용이 없습니다.
+        (capture 스레드처럼 이미 실행 중인 루프에는 다음 시작부터 적용)
+
+        Args:
+            enabled: True이면 켜기, False이면 끄기
+            reset: True이면 이전 계측 결과를 지우고 새로 시작
+        """
+        from can_instrument import Instrumentation, InstrumentedAPI, unwrap_api
+
+        if enabled and (reset or self.instrumentation is None):
+            self.instrumentation = Instrumentation()
+        elif reset:
+            self.instrumentation = None
+
+        # 이미 감싼 메서드/API는 먼저 되돌리기
+        for name in INSTRUMENTED_METHODS + ('dispatch',):
+            self.__dict__.pop(name, None)
+        self.api = unwrap_api(self.api)
+        self._instrumented = False
+
+        if not enabled:
+            return
+
+        instrumentation = self.instrumentation
+        for name in INSTRUMENTED_METHODS:
+            setattr(self, name, instrumentation.wrap(name, getattr(self, name)))
+        self.dispatch = instrumentation.wrap('callback', self.dispatch, results=False)
+        self.api = InstrumentedAPI(self.api, instrumentation)
+        self._instrumented = True
+
+    def stats(self) -> Dict[str, object]:
+        """
+        송수신 계측 결과
+
+        Returns:
+            {'enabled': 계측 여부, 'elapsed': 계측 시간(초), 구간 이름: 통계} 딕셔너리.
+            구간 통계는 'count', 'total', 'mean', 'min', 'max', 'p50', 'p90', 'p99', 'p999'(초)와
+            'results' {결과 코드: 횟수}. 계측을 켠 적이 없으면 {'enabled': False}
+        """
+        if self.instrumentation is None:
+            return {'enabled': False}
+        result = {'enabled': self._instrumented}  # type: Dict[str, object]
+        result.update(self.instrumentation.snapshot())
+        return result
+
     def send(self, msg_id: int, data: Union[bytes, List[int]], extended_id: bool = False,
              remote_frame: bool = False, timeout: int = 0) -> int:
         """
@@ -186,7 +543,7 @@ class KvaserCAN:
             return -95  # CANERR_NOTINIT
 
         # 메시지 생성
-        msg = Message()
+        msg = self._message_type()
         msg.id = msg_id
 
         # 데이터가 bytes 타입이 아니면 변환
@@ -199,9 +556,8 @@ class KvaserCAN:
             data_len = 8
             data = data[:8]
 
-        # 메시지에 데이터 설정
-        for i in range(data_len):
-            msg.data[i] = data[i]
+        # 메시지에 데이터 설정 (한 번에 복사)
+        ctypes.memmove(msg.data, data, data_len)
 
         msg.dlc = data_len
 
@@ -213,7 +569,68 @@ class KvaserCAN:
         msg.flags.esi = 0  # 에러 상태 인디케이터
 
         # 메시지 송신
-        return self.api.write(message=msg, timeout=timeout)
+        result = self.api.write(message=msg, timeout=timeout)
+        if result == CANERR_NOERROR:
+            self.tx_frames += 1
+        return result
+
+    def send_many(self, frames: Iterable, timeout: int = 0) -> Tuple[int, int]:
+        """
+        CAN 메시지 일괄 송신
+
+        메시지마다 새 구조체를 만들지 않고 미리 할당한 구조체 하나에
+        데이터를 memmove로 복사해 송신합니다. 드라이버가 오류(예: 송신 큐가
+        가득 참, CANERR_TX_BUSY)를 돌려주면 그 자리에서 멈춥니다.
+
+        Args:
+            frames: (ID, 데이터[, 플래그]) 튜플 목록 또는 can_frames 프레임 배열
+                    플래그는 can_frames.FLAG_XTD / FLAG_RTR 비트 조합
+            timeout: 메시지별 송신 타임아웃 (밀리초)
+
+        Returns:
+            (결과, 드라이버가 받아들인 메시지 수) 튜플
+        """
+        if not self.is_started:
+            return -95, 0  # CANERR_NOTINIT
+
+        # 프레임 배열이면 열 단위로 꺼내서 튜플로 변환
+        if getattr(getattr(frames, 'dtype', None), 'names', None):
+            frames = _iter_frame_array(frames)
+
+        msg = self._tx_message
+        flags = msg.flags
+        data_addr = ctypes.addressof(msg.data)
+        memmove = ctypes.memmove
+        write = self.api.write
+        sent = 0
+
+        for frame in frames:
+            if len(frame) > 2:
+                msg_id, data, frame_flags = frame[0], frame[1], frame[2]
+            else:
+                msg_id, data = frame
+                frame_flags = 0
+
+            if not isinstance(data, bytes):
+                data = bytes(data)
+            data_len = len(data)
+            if data_len > 8:  # CAN 2.0은 최대 8바이트
+                data_len = 8
+
+            msg.id = msg_id
+            memmove(data_addr, data, data_len)
+            msg.dlc = data_len
+            flags.xtd = 1 if frame_flags & FLAG_XTD else 0
+            flags.rtr = 1 if frame_flags & FLAG_RTR else 0
+
+            result = write(message=msg, timeout=timeout)
+            if result != CANERR_NOERROR:
+                self.tx_frames += sent
+                return result, sent
+            sent += 1
+
+        self.tx_frames += sent
+        return CANERR_NOERROR, sent
 
     def receive(self, timeout: int = 1000) -> Tuple[int, Optional[Message]]:
         """
@@ -228,8 +645,179 @@ class KvaserCAN:
         if not self.is_started:
             return -95, None  # CANERR_NOTINIT
 
-        # 메시지 수신
-        return self.api.read(timeout=timeout)
+        accept = self._accept
+        if accept is None:
+            # 메시지 수신
+            return self.api.read(timeout=timeout)
+
+        # 필터에 맞는 메시지가 올 때까지 남은 타임아웃 안에서 계속 읽기
+        read = self.api.read
+        deadline = time.monotonic() + timeout / 1000.0
+        wait = timeout
+        while True:
+            result, msg = read(timeout=wait)
+            if result != CANERR_NOERROR or accept(msg):
+                return result, msg
+            if timeout != CANREAD_INFINITE:
+                wait = max(0, int((deadline - time.monotonic()) * 1000))
+
+    def receive_many(self, max_frames: int = 256, timeout: int = 1000) -> Tuple[int, List[Message]]:
+        """
+        CAN 메시지 일괄 수신
+
+        첫 번째 메시지만 타임아웃만큼 기다리고, 이후에는 드라이버 수신 큐가
+        비거나(CANERR_RX_EMPTY) max_frames에 도달할 때까지 대기 없이 읽습니다.
+
+        Args:
+            max_frames: 한 번에 수신할 최대 메시지 수
+            timeout: 첫 메시지 수신 타임아웃 (밀리초)
+
+        Returns:
+            (결과, 메시지 리스트) 튜플. 메시지를 하나 이상 받았으면 결과는 0
+        """
+        if not self.is_started:
+            return -95, []  # CANERR_NOTINIT
+
+        frames = []
+        if max_frames <= 0:
+            return CANERR_NOERROR, frames
+
+        # 첫 메시지는 타임아웃만큼 대기
+        read = self.api.read
+        result, msg = self.receive(timeout=timeout)
+        if result != CANERR_NOERROR:
+            return result, frames
+        frames.append(msg)
+
+        # 큐에 남은 메시지는 대기 없이 소진
+        append = frames.append
+        accept = self._accept
+        while len(frames) < max_frames:
+            result, msg = read(timeout=0)
+            if result != CANERR_NOERROR:
+                break
+            if accept is None or accept(msg):
+                append(msg)
+
+        return CANERR_NOERROR, frames
+
+    def receive_array(self, capture: 'FrameArrayCapture', max_frames: int = None,
+                      timeout: int = 1000):
+        """
+        CAN 메시지를 NumPy 프레임 배열로 일괄 수신
+
+        receive_many()와 같은 방식으로 드라이버 큐를 비우되, 메시지를 리스트로
+        돌려주지 않고 capture의 미리 할당된 배열에 바로 복사합니다.
+
+        Args:
+            capture: 프레임을 저장할 FrameArrayCapture
+            max_frames: 수신할 최대 메시지 수 (None이면 남은 공간만큼)
+            timeout: 첫 메시지 수신 타임아웃 (밀리초)
+
+        Returns:
+            (결과, 이번에 수신한 프레임 배열 뷰) 튜플
+        """
+        start = capture.count
+        if not self.is_started:
+            return -95, capture.frames[start:start]  # CANERR_NOTINIT
+
+        limit = capture.free() if max_frames is None else min(max_frames, capture.free())
+        result, frames = self.receive_many(max_frames=limit, timeout=timeout)
+        if frames:
+            capture.extend(frames)
+
+        return result, capture.frames[start:capture.count]
+
+    def start_capture(self, buffer_size: int = 4096, batch_size: int = 256) -> int:
+        """
+        백그라운드 수신 시작
+
+        전용 수신 스레드가 드라이버 큐를 일괄로 읽어 링 버퍼(capture_buffer)에
+        넣습니다. 소비자는 read_capture()로 자신의 속도에 맞춰 꺼내 갑니다.
+
+        Args:
+            buffer_size: 링 버퍼 슬롯 수
+            batch_size: 수신 스레드가 한 번에 읽는 최대 메시지 수
+
+        Returns:
+            0 성공, 음수 오류 코드
+        """
+        if not self.is_started:
+            return -95  # CANERR_NOTINIT
+
+        if self._capture_thread is not None:
+            return CANERR_NOERROR
+
+        from can_ringbuffer import FrameRingBuffer
+
+        self.capture_buffer = FrameRingBuffer(buffer_size)
+        self.capture_result = CANERR_NOERROR
+        self._capture_stop.clear()
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop,
+            args=(self.capture_buffer, batch_size),
+            name=f'KvaserCAN-capture-{self.channel}',
+            daemon=True
+        )
+        self._capture_thread.start()
+
+        return CANERR_NOERROR
+
+    def stop_capture(self) -> int:
+        """
+        백그라운드 수신 중지
+
+        링 버퍼(capture_buffer)는 남은 메시지와 통계를 확인할 수 있도록 유지됩니다.
+
+        Returns:
+            수신 스레드의 마지막 결과 코드
+        """
+        thread = getattr(self, '_capture_thread', None)
+        if thread is None:
+            return CANERR_NOERROR
+
+        self._capture_stop.set()
+        thread.join()
+        self._capture_thread = None
+
+        return self.capture_result
+
+    def is_capturing(self) -> bool:
+        """백그라운드 수신 스레드 동작 여부"""
+        return self._capture_thread is not None and self._capture_thread.is_alive()
+
+    def read_capture(self, max_frames: int = 256, timeout: int = 1000) -> List[Message]:
+        """
+        백그라운드 수신 버퍼에서 메시지 꺼내기
+
+        Args:
+            max_frames: 꺼낼 최대 메시지 수
+            timeout: 버퍼가 비어 있을 때 대기할 시간 (밀리초)
+
+        Returns:
+            메시지 리스트 (수신 중이 아니거나 타임아웃이면 빈 리스트)
+        """
+        if self.capture_buffer is None:
+            return []
+
+        return self.capture_buffer.pop_many(max_items=max_frames, timeout=timeout / 1000.0)
+
+    def _capture_loop(self, buffer: 'FrameRingBuffer', batch_size: int):
+        """수신 스레드 본체: 드라이버 큐를 일괄로 읽어 링 버퍼에 저장"""
+        try:
+            while not self._capture_stop.is_set():
+                # 중지 요청을 확인할 수 있도록 타임아웃 100ms
+                result, frames = self.receive_many(max_frames=batch_size, timeout=100)
+
+                if result == CANERR_NOERROR:
+                    buffer.push_many(frames)
+                elif result != CANERR_RX_EMPTY:
+                    # 타임아웃(-30)이 아닌 다른 오류면 중단
+                    self.capture_result = result
+                    break
+        finally:
+            # 대기 중인 소비자 깨우기
+            buffer.wakeup()
 
     def get_status(self) -> Tuple[int, Optional[Status]]:
         """
@@ -267,31 +855,27 @@ class KvaserCAN:
 
         return self.api.bitrate()
 
-    def scan_channels(self, max_channels: int = 8) -> List[int]:
+    def scan_channels(self, max_channels: int = 8, refresh: bool = False) -> List[int]:
         """
         사용 가능한 CAN 채널 검색
 
+        채널을 동시에 검색하고 결과는 프로세스 공유 캐시(can_discovery)에 TTL 동안
+        보관하므로, 이후 호출은 다시 검색하지 않고 바로 돌아옵니다.
+        (watch() 중이면 캐시가 계속 최신으로 유지됨)
+
         Args:
             max_channels: 검색할 최대 채널 수
+            refresh: True이면 캐시와 관계없이 다시 검색
 
         Returns:
             사용 가능한 채널 번호 목록
         """
-        available_channels = []
-
-        for channel in range(max_channels):
-            op_mode = OpMode()
-            op_mode.byte = CANMODE_DEFAULT
+        from can_discovery import get_discovery
 
-            # 채널 테스트
-            result, state = self.api.test(channel=channel, mode=op_mode)
+        return get_discovery(self.backend, self.lib_name, max_channels).channels(refresh=refresh)
 
-            if state == 0:  # 채널이 존재하고 사용 가능
-                available_channels.append(channel)
-
-        return available_channels
-
-    def monitor(self, duration: int = 30, callback=None) -> int:
+    def monitor(self, duration: int = 30, callback=None, background: bool = False,
+                buffer_size: int = 4096) -> int:
         """
         CAN 버스 모니터링
 
@@ -300,6 +884,10 @@ class KvaserCAN:
             callback: 메시지 수신 시 호출할 콜백 함수
                       함수 시그니처: callback(msg: Message) -> bool
                       반환값이 False이면 모니터링 중단
+                      None이고 subscribe()한 핸들러가 있으면 수신 묶음마다 dispatch()
+            background: True이면 수신은 백그라운드 스레드가 담당하고
+                        이 스레드는 링 버퍼에서 꺼내 콜백만 호출
+            buffer_size: 백그라운드 수신 링 버퍼 슬롯 수
 
         Returns:
             수신한 메시지 개수
@@ -307,13 +895,22 @@ class KvaserCAN:
         if not self.is_started:
             return -95  # CANERR_NOTINIT
 
+        if callback is None and self._subscriptions:
+            return self._monitor_dispatch(duration, background, buffer_size)
+
+        if callback is not None and self._instrumented:
+            callback = self.instrumentation.wrap('callback', callback, results=False)
+
+        if background:
+            return self._monitor_background(duration, callback, buffer_size)
+
         msg_count = 0
         start_time = time.time()
 
         try:
             while (time.time() - start_time) < duration:
-                # 비차단 읽기 (타임아웃 100ms)
-                result, msg = self.api.read(timeout=100)
+                # 비차단 읽기 (타임아웃 100ms, 수신 필터 적용)
+                result, msg = self.receive(timeout=100)
 
                 if result == CANERR_NOERROR:
                     msg_count += 1
@@ -331,3 +928,91 @@ class KvaserCAN:
             pass
 
         return msg_count
+
+    def _monitor_background(self, duration: int, callback, buffer_size: int) -> int:
+        """백그라운드 수신 버퍼를 소비하며 콜백 호출"""
+        # 이미 수신 중이면 기존 버퍼를 그대로 사용
+        owns_capture = self._capture_thread is None
+        if owns_capture:
+            result = self.start_capture(buffer_size=buffer_size)
+            if result != CANERR_NOERROR:
+                return result
+
+        buffer = self.capture_buffer
+        msg_count = 0
+        start_time = time.time()
+
+        try:
+            while (time.time() - start_time) < duration:
+                frames = buffer.pop_many(max_items=256, timeout=0.1)
+
+                if not frames:
+                    # 수신 스레드가 오류로 종료되었으면 중단
+                    if not self.is_capturing() and len(buffer) == 0:
+                        break
+                    continue
+
+                msg_count += len(frames)
+                if callback is not None:
+                    stopped = False
+                    for index, msg in enumerate(frames):
+                        # 콜백이 False를 반환하면 중단
+                        if not callback(msg):
+                            msg_count -= len(frames) - index - 1
+                            stopped = True
+                            break
+                    if stopped:
+                        break
+
+        except KeyboardInterrupt:
+            pass
+
+        finally:
+            if owns_capture:
+                self.stop_capture()
+
+        return msg_count
+
+    def _monitor_dispatch(self, duration: int, background: bool, buffer_size: int) -> int:
+        """수신 묶음을 구독 핸들러에 전달하며 모니터링"""
+        owns_capture = background and self._capture_thread is None
+        if owns_capture:
+            result = self.start_capture(buffer_size=buffer_size)
+            if result != CANERR_NOERROR:
+                return result
+
+        msg_count = 0
+        start_time = time.time()
+
+        try:
+            while (time.time() - start_time) < duration:
+                if background:
+                    frames = self.capture_buffer.pop_many(max_items=256, timeout=0.1)
+                    if not frames and not self.is_capturing() and len(self.capture_buffer) == 0:
+                        break
+                else:
+                    result, frames = self.receive_many(max_frames=256, timeout=100)
+                    if result != CANERR_NOERROR and result != CANERR_RX_EMPTY:
+                        break
+
+                if frames:
+                    msg_count += self.dispatch(frames)
+
+        except KeyboardInterrupt:
+            pass
+
+        finally:
+            if owns_capture:
+                self.stop_capture()
+
+        return msg_count
+
+
+def _iter_frame_array(frames):
+    """can_frames 프레임 배열을 (ID, 데이터, 플래그) 튜플로 순회"""
+    data = frames['data']
+    width = data.shape[1]
+    for index, (msg_id, flags, dlc) in enumerate(zip(frames['id'].tolist(),
+                                                     frames['flags'].tolist(),
+                                                     frames['dlc'].tolist())):
+        yield msg_id, data[index, :min(dlc, width, 8)].tobytes(), flags
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+KvaserCAN asyncio 인터페이스
+
+채널마다 수신 스레드 1개가 드라이버 큐를 일괄로 읽어 이벤트 루프로
+묶음 단위로 넘겨주므로, 메시지마다 스레드 전환을 하지 않습니다.
+
+사용 예:
+    bus = AsyncKvaserCAN()
+    await bus.open(channel=0)
+    await bus.start(bitrate_index=-2)
+    await bus.send(0x100, [0x11, 0x22])
+    async for msg in bus:
+        print(hex(msg.id))
+"""
+import asyncio
+import collections
+import threading
+from typing import List, Optional, Union
+
+from kvaser_can import KvaserCAN, Message, CANERR_NOERROR, CANERR_RX_EMPTY
+from can_virtual import CANERR_TX_BUSY
+
+
+class AsyncKvaserCAN:
+    """
+    KvaserCAN asyncio 래퍼 클래스
+    """
+
+    def __init__(self, can: KvaserCAN = None, lib_name: str = None,
+                 batch_size: int = 256, queue_size: int = 1024, backend: str = 'kvaser'):
+        """
+        asyncio 래퍼 초기화
+
+        Args:
+            can: 감쌀 KvaserCAN 인스턴스 (None이면 새로 생성)
+            lib_name: 드라이버 라이브러리 파일명 (can이 None일 때만 사용)
+            batch_size: 수신 스레드가 한 번에 읽는 최대 메시지 수
+            queue_size: 이벤트 루프 쪽 큐에 쌓을 수 있는 최대 묶음 수
+            backend: 'kvaser', 'virtual' 또는 'socketcan' (can이 None일 때만 사용)
+        """
+        self.can = can if can is not None else KvaserCAN(lib_name, backend=backend)
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+
+        # 큐가 가득 차 버려진 메시지 수
+        self.dropped = 0
+        # 수신 스레드의 마지막 결과 코드
+        self.read_result = CANERR_NOERROR
+
+        self._loop = None
+        self._queue = None
+        self._pending = collections.deque()
+        self._thread = None
+        self._stop = threading.Event()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Message:
+        msg = await self.recv()
+        if msg is None:
+            raise StopAsyncIteration
+        return msg
+
+    async def open(self, channel: int = 0, monitor_mode: bool = False) -> int:
+        """
+        CAN 채널 열기
+
+        Args:
+            channel: CAN 채널 번호
+            monitor_mode: 모니터 모드 활성화 여부
+
+        Returns:
+            0 성공, 음수 오류 코드
+        """
+        return self.can.open(channel=channel, monitor_mode=monitor_mode)
+
+    async def start(self, bitrate_index: int = -3) -> int:
+        """
+        CAN 컨트롤러와 수신 스레드 시작
+
+        Args:
+            bitrate_index: 비트레이트 인덱스 (-3=250kbps, 0=1Mbps 등)
+
+        Returns:
+            0 성공, 음수 오류 코드 (이미 수신 중이면 아무것도 하지 않고 0)
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return CANERR_NOERROR
+
+        result = self.can.start(bitrate_index=bitrate_index)
+        if result != CANERR_NOERROR:
+            return result
+
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._pending.clear()
+        self._stop.clear()
+        self.read_result = CANERR_NOERROR
+
+        self._thread = threading.Thread(
+            target=self._reader_loop,
+            name=f'AsyncKvaserCAN-reader-{self.can.channel}',
+            daemon=True
+        )
+        self._thread.start()
+
+        return CANERR_NOERROR
+
+    async def close(self) -> int:
+        """
+        수신 스레드 중지 후 CAN 채널 닫기
+
+        Returns:
+            0 성공, 음수 오류 코드
+        """
+        self._stop.set()
+
+        if self._thread is not None:
+            # 수신 스레드는 최대 100ms 뒤에 종료되므로 루프를 막지 않고 대기
+            await self._loop.run_in_executor(None, self._thread.join)
+            self._thread = None
+
+        return self.can.close()
+
+    async def recv(self, timeout: Optional[float] = None) -> Optional[Message]:
+        """
+        CAN 메시지 1개 수신
+
+        Args:
+            timeout: 대기 시간 (초, None이면 무한 대기)
+
+        Returns:
+            메시지. 타임아웃이거나 채널이 닫혔으면 None
+        """
+        if not self._pending and not await self._fill(timeout):
+            return None
+
+        return self._pending.popleft()
+
+    async def recv_many(self, max_frames: int = 256, timeout: Optional[float] = None) -> List[Message]:
+        """
+        CAN 메시지 일괄 수신
+
+        이미 도착한 메시지를 최대 max_frames개까지 한 번에 돌려주며,
+        하나도 없을 때만 timeout만큼 기다립니다.
+
+        Args:
+            max_frames: 수신할 최대 메시지 수
+            timeout: 대기 시간 (초, None이면 무한 대기)
+
+        Returns:
+            메시지 리스트 (타임아웃이거나 채널이 닫혔으면 빈 리스트)
+        """
+        if not self._pending and not await self._fill(timeout):
+            return []
+
+        # 큐에 이미 들어온 묶음도 대기 없이 합치기
+        queue = self._queue
+        while len(self._pending) < max_frames and not queue.empty():
+            batch = queue.get_nowait()
+            if batch is None:
+                queue.put_nowait(None)
+                break
+            self._pending.extend(batch)
+
+        pending = self._pending
+        count = min(len(pending), max_frames)
+        return [pending.popleft() for _ in range(count)]
+
+    async def send(self, msg_id: int, data: Union[bytes, List[int]], extended_id: bool = False,
+                   remote_frame: bool = False, timeout: int = 0) -> int:
+        """
+        CAN 메시지 송신
+
+        송신 큐가 가득 찬 경우(CANERR_TX_BUSY) 이벤트 루프를 막지 않고
+        timeout 동안 1ms 간격으로 재시도합니다.
+
+        Args:
+            msg_id: CAN 메시지 ID
+            data: 송신할 데이터 (bytes 또는 정수 리스트)
+            extended_id: 확장 ID 사용 여부 (29비트)
+            remote_frame: 원격 프레임 여부
+            timeout: 송신 타임아웃 (밀리초)
+
+        Returns:
+            0 성공, 음수 오류 코드
+        """
+        retries = max(timeout, 0)
+        while True:
+            result = self.can.send(msg_id, data, extended_id=extended_id,
+                                   remote_frame=remote_frame, timeout=0)
+            if result != CANERR_TX_BUSY or retries <= 0:
+                return result
+            retries -= 1
+            await asyncio.sleep(0.001)
+
+    async def _fill(self, timeout: Optional[float]) -> bool:
+        """큐에서 묶음 하나를 꺼내 대기 목록에 추가"""
+        if self._queue is None:
+            return False
+
+        try:
+            if timeout is None:
+                batch = await self._queue.get()
+            else:
+                batch = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        if batch is None:
+            # 종료 표시는 다른 대기자를 위해 다시 넣어 둠
+            self._queue.put_nowait(None)
+            return False
+
+        self._pending.extend(batch)
+        return True
+
+    def _deliver(self, batch):
+        """이벤트 루프 스레드에서 실행: 묶음을 큐에 넣기"""
+        try:
+            self._queue.put_nowait(batch)
+        except asyncio.QueueFull:
+            if batch is None:
+                # 종료 표시는 반드시 전달 (밀려난 묶음은 버려진 메시지로 집계)
+                evicted = self._queue.get_nowait()
+                if evicted is not None:
+                    self.dropped += len(evicted)
+                self._queue.put_nowait(None)
+            else:
+                self.dropped += len(batch)
+
+    def _reader_loop(self):
+        """수신 스레드 본체: 드라이버 큐를 일괄로 읽어 이벤트 루프로 전달"""
+        loop = self._loop
+        try:
+            while not self._stop.is_set():
+                # 중지 요청을 확인할 수 있도록 타임아웃 100ms
+                result, frames = self.can.receive_many(max_frames=self.batch_size, timeout=100)
+
+                if result == CANERR_NOERROR:
+                    loop.call_soon_threadsafe(self._deliver, frames)
+                elif result != CANERR_RX_EMPTY:
+                    # 타임아웃(-30)이 아닌 다른 오류면 중단
+                    self.read_result = result
+                    break
+        finally:
+            # 대기 중인 recv()에 종료 알림
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._deliver, None)
@@ -0,0 +1,127 @@
+import os
+
+import pytest
+
+import can_dbc
+from can_dbc import load_dbc, loads_dbc, parse_dbc, generate_code
+
+DBC = '''VERSION ""
+
+BU_: EPS ECU
+
+BO_ 688 SAS1: 8 EPS
+ SG_ SAS_Angle : 0|16@1- (0.1,0) [-3276.8|3276.7] "deg" ECU
+ SG_ SAS_Speed : 16|8@1+ (4,0) [0|1016] "deg/s" ECU
+ SG_ MsgCount : 32|4@1+ (1,0) [0|15] "" ECU
+
+BO_ 1280 MOTOROLA: 4 ECU
+ SG_ Speed : 7|16@0+ (0.01,0) [0|655.35] "km/h" EPS
+ SG_ Temp : 23|8@0- (1,-40) [-168|87] "degC" EPS
+
+BO_ 2566848513 EXTENDED: 2 ECU
+ SG_ Value : 0|16@1+ (1,0) [0|0] "" EPS
+
+BO_ 1536 MUXED: 8 ECU
+ SG_ Mux M : 0|8@1+ (1,0) [0|255] "" EPS
+ SG_ A m0 : 8|16@1+ (1,0) [0|65535] "" EPS
+ SG_ B m1 : 8|8@1+ (0.5,0) [0|127.5] "" EPS
+
+VAL_ 688 MsgCount 0 "zero" 15 "max" ;
+'''
+
+
+@pytest.fixture
+def database():
+    return loads_dbc(DBC)
+
+
+def test_parse_messages_and_signals():
+    messages = parse_dbc(DBC)
+    assert [(m.frame_id, m.name, m.length, m.extended_id) for m in messages] == [
+        (0x2B0, 'SAS1', 8, False), (0x500, 'MOTOROLA', 4, False),
+        (0x18FF0001, 'EXTENDED', 2, True), (0x600, 'MUXED', 8, False)]
+
+    angle = messages[0].get_signal('SAS_Angle')
+    assert (angle.start, angle.length, angle.byte_order, angle.signed) == (0, 16, 'little', True)
+    assert (angle.scale, angle.minimum, angle.unit, angle.receivers) == (0.1, -3276.8, 'deg', ('ECU',))
+    assert messages[0].get_signal('MsgCount').choices == {0: 'zero', 15: 'max'}
+    # 정수로 쓴 스케일/오프셋은 int
+    assert isinstance(messages[1].get_signal('Temp').offset, int)
+    assert messages[3].get_signal('Mux').is_multiplexer
+    assert messages[3].get_signal('B').multiplexer_id == 1
+
+
+def test_intel_decode_and_encode(database):
+    sas = database.get_message_by_name('SAS1')
+    data = sas.encode({'SAS_Angle': -45.0, 'SAS_Speed': 100, 'MsgCount': 3})
+    assert data == bytes([0x3E, 0xFE, 25, 0, 3, 0, 0, 0])
+    values = database.decode(0x2B0, data)
+    assert values['SAS_Angle'] == pytest.approx(-45.0)
+    assert (values['SAS_Speed'], values['MsgCount']) == (100, 3)
+
+    # 범위 밖 값은 제한, 짧은 데이터는 0으로 채움
+    assert sas.decode(sas.encode({'SAS_Speed': 5000}))['SAS_Speed'] == 1016
+    assert sas.decode(b'\x0A')['SAS_Angle'] == pytest.approx(1.0)
+
+
+def test_motorola_signals(database):
+    message = database.get_message(0x500)
+    data = bytes([0x12, 0x34, 0xF6, 0x00])
+    values = message.decode(data)
+    assert values['Speed'] == pytest.approx(0x1234 * 0.01)
+    assert values['Temp'] == -10 - 40
+    assert message.encode(values) == data
+
+
+def test_extended_and_multiplexed(database):
+    assert database.get_message(0x18FF0001, extended_id=True).name == 'EXTENDED'
+    assert database.get_message(0x18FF0001, extended_id=False) is None
+    assert database.decode(0x123, b'') is None
+    with pytest.raises(KeyError):
+        database.encode('UNKNOWN', {})
+
+    muxed = database.get_message_by_name('MUXED')
+    assert muxed.decode(bytes([0, 0x34, 0x12])) == {'Mux': 0, 'A': 0x1234}
+    assert muxed.decode(bytes([1, 10])) == {'Mux': 1, 'B': 5.0}
+    # multiplexer 값과 맞지 않는 시그널은 인코딩하지 않음
+    assert muxed.encode({'Mux': 1, 'A': 0xFFFF, 'B': 5.0}) == bytes([1, 10, 0, 0, 0, 0, 0, 0])
+
+
+def test_generated_code_has_function_per_message():
+    source = generate_code(parse_dbc(DBC))
+    for index in range(4):
+        assert f'def _decode_{index}(data):' in source
+        assert f'def _encode_{index}(values):' in source
+    compile(source, '<dbc>', 'exec')
+
+
+def test_load_dbc_uses_marshal_cache(tmp_path, monkeypatch):
+    path = tmp_path / 'test.dbc'
+    path.write_text(DBC, encoding='cp1252')
+    cache_path = str(path) + '.cache'
+
+    database = load_dbc(str(path))
+    assert os.path.exists(cache_path)
+    expected = database.get_message(0x2B0).encode({'SAS_Angle': 12.3})
+
+    # 캐시가 유효하면 파싱하지 않음
+    def fail(text):
+        raise AssertionError('parse_dbc called')
+
+    monkeypatch.setattr(can_dbc, 'parse_dbc', fail)
+    cached = load_dbc(str(path))
+    assert cached.get_message(0x2B0).encode({'SAS_Angle': 12.3}) == expected
+    assert cached.get_message_by_name('SAS1').get_signal('MsgCount').choices == {0: 'zero', 15: 'max'}
+    monkeypatch.undo()
+
+    # DBC 파일이 바뀌면 다시 파싱
+    path.write_text(DBC.replace('SAS_Speed', 'SAS_Rate'), encoding='cp1252')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert load_dbc(str(path)).get_message(0x2B0).get_signal('SAS_Rate') is not None
+
+    # 손상된 캐시는 무시
+    with open(cache_path, 'wb') as stream:
+        stream.write(b'not marshal data')
+    assert len(load_dbc(str(path))) == 4
+    assert len(load_dbc(str(path), cache=False)) == 4
@@ -0,0 +1,122 @@
+import queue
+import time
+
+import pytest
+
+import can_discovery
+from can_discovery import ChannelDiscovery, ChannelInfo, MODE_CAPABILITIES, get_discovery
+from can_virtual import CANBRD_NOT_PRESENT, CANBRD_PRESENT
+from kvaser_can import KvaserCAN, CANERR_NOERROR
+
+
+@pytest.fixture
+def test_calls(monkeypatch):
+    """create_api()가 만든 API의 test() 호출 채널 기록"""
+    calls = []
+    create_api = can_discovery.create_api
+
+    def counting_create_api(backend, lib_name):
+        api, types = create_api(backend, lib_name)
+        test = api.test
+
+        def counting_test(channel, mode=None, param=None):
+            calls.append(channel)
+            return test(channel=channel, mode=mode)
+
+        api.test = counting_test
+        return api, types
+
+    monkeypatch.setattr(can_discovery, 'create_api', counting_create_api)
+    return calls
+
+
+def _fake_probe(present, failing=()):
+    """present에 있는 채널만 사용 가능하다고 보고하는 검색 함수"""
+    def probe(channel):
+        if channel in failing:
+            raise OSError(f'channel {channel} probe failed')
+        state = CANBRD_PRESENT if channel in present else CANBRD_NOT_PRESENT
+        return ChannelInfo(channel, CANERR_NOERROR, state)
+    return probe
+
+
+def test_channels_without_details_use_one_test_call(test_calls):
+    discovery = ChannelDiscovery('virtual', max_channels=4)
+    assert discovery.channels() == [0, 1, 2, 3]
+    assert sorted(test_calls) == [0, 1, 2, 3]
+    assert discovery.info(0).capabilities == {}
+    assert discovery.info(0).serial is None
+
+
+def test_details_on_virtual_backend(test_calls):
+    discovery = ChannelDiscovery('virtual', max_channels=2, details=True)
+    info = discovery.info(1)
+    assert info.available
+    # 가상 백엔드의 test()는 작동 모드를 확인하지 않으므로 지원 여부는 알 수 없음
+    assert info.capabilities == dict.fromkeys(MODE_CAPABILITIES)
+    assert sorted(test_calls) == [0, 1]
+    assert info.hardware == 'Virtual CAN'
+    assert info.serial == 'VCAN-0001'
+
+
+def test_cache_and_ttl_expiry(test_calls):
+    discovery = ChannelDiscovery('virtual', max_channels=2, ttl=0.05)
+    discovery.channels()
+    discovery.channels()
+    assert len(test_calls) == 2
+
+    time.sleep(0.06)
+    discovery.channels()
+    assert len(test_calls) == 4
+
+    discovery.channels(refresh=True)
+    assert len(test_calls) == 6
+    discovery.invalidate()
+    discovery.channels()
+    assert len(test_calls) == 8
+
+
+def test_probe_exception_marks_channel_absent():
+    discovery = ChannelDiscovery('virtual', max_channels=3)
+    discovery._probe_channel = _fake_probe({0, 1, 2}, failing={1})
+    inventory = discovery.refresh()
+
+    assert discovery.channels() == [0, 2]
+    assert not inventory[1].present
+    assert inventory[1].error == 'OSError: channel 1 probe failed'
+    assert inventory[0].error is None
+
+
+def test_watch_reports_added_and_removed_channels():
+    present = {0, 1}
+    discovery = ChannelDiscovery('virtual', max_channels=4)
+    discovery._probe_channel = lambda channel: _fake_probe(present)(channel)
+    events = queue.Queue()
+
+    assert discovery.watch(interval=0.01, callback=lambda added, removed: events.put((added, removed)))
+    try:
+        assert not discovery.watch(interval=0.01)
+        # 첫 검색은 기준값이므로 알림 없음
+        deadline = time.monotonic() + 2.0
+        while discovery._refreshed is None and time.monotonic() < deadline:
+            time.sleep(0.005)
+        present.add(3)
+        assert events.get(timeout=2.0) == ([3], [])
+        present.discard(0)
+        assert events.get(timeout=2.0) == ([], [0])
+        assert discovery.channels() == [1, 3]
+    finally:
+        discovery.stop_watch()
+    assert not discovery.is_watching
+
+
+def test_scan_channels_uses_shared_cache():
+    can = KvaserCAN(backend='virtual')
+    assert can.scan_channels(max_channels=8) == list(range(8))
+    service = get_discovery('virtual', None, 8)
+    refreshed = service._refreshed
+
+    assert can.scan_channels(max_channels=8) == list(range(8))
+    assert service._refreshed == refreshed
+    can.scan_channels(max_channels=8, refresh=True)
+    assert service._refreshed != refreshed
@@ -0,0 +1,92 @@
+import re
+import urllib.error
+import urllib.request
+
+import pytest
+
+from can_exporter import MetricsExporter
+from kvaser_can import KvaserCAN, CANERR_NOERROR
+
+SAMPLE = re.compile(r'^([a-z_]+)(\{[^}]*\})? (\S+)$')
+
+
+@pytest.fixture
+def bus():
+    tx = KvaserCAN(backend='virtual')
+    rx = KvaserCAN(backend='virtual')
+    for can in (tx, rx):
+        assert can.open(channel=0) == 0
+        assert can.start(bitrate_index=0) == 0
+    yield tx, rx
+    for can in (tx, rx):
+        can.close()
+
+
+def _scrape(exporter, path='/metrics'):
+    with urllib.request.urlopen(f'http://127.0.0.1:{exporter.port}{path}', timeout=5) as response:
+        assert response.headers['Content-Type'].startswith('text/plain')
+        return response.read().decode('utf-8')
+
+
+def _parse(text):
+    """Prometheus 텍스트를 {(이름, 라벨): 값}과 {이름: 형식}으로 변환"""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            types[name] = kind
+        elif line and not line.startswith('#'):
+            match = SAMPLE.match(line)
+            assert match, line
+            samples[(match.group(1), match.group(2) or '')] = float(match.group(3))
+    return samples, types
+
+
+def _value(samples, name, **labels):
+    for (sample_name, sample_labels), value in samples.items():
+        if sample_name == name and all(f'{key}="{val}"' in sample_labels for key, val in labels.items()):
+            return value
+    raise KeyError(name)
+
+
+def test_scrape_counts_rx_and_tx_without_instrumentation(bus):
+    tx, rx = bus
+    with MetricsExporter(tx, port=0, interval=0.01) as exporter:
+        assert exporter.port != 0
+        assert tx.send(0x100, [0x01]) == CANERR_NOERROR
+        assert tx.send_many([(0x100, b'\x02'), (0x18FF0001, b'\x03', 0x01)]) == (CANERR_NOERROR, 2)
+        result, frames = rx.receive_many(max_frames=16, timeout=100)
+        assert exporter.update_many(frames) == 3
+
+        samples, types = _parse(_scrape(exporter))
+
+    assert types['can_tx_frames_total'] == 'counter'
+    assert _value(samples, 'can_tx_frames_total', channel=0, backend='virtual') == 3
+    assert _value(samples, 'can_rx_frames_total') == 3
+    assert _value(samples, 'can_rx_id_frames_total', id='0x100') == 2
+    assert _value(samples, 'can_rx_id_frames_total', id='0x18FF0001') == 1
+    assert _value(samples, 'can_status', flag='bus_off') == 0
+    # 계측을 켜지 않았으면 드라이버 지표는 없음
+    assert 'can_call_duration_seconds' not in types
+
+
+def test_scrape_with_instrumentation(bus):
+    tx, _ = bus
+    with MetricsExporter(tx, port=0, instrument=True) as exporter:
+        assert tx.stats()['enabled']
+        tx.send(0x100, [0x01])
+        samples, types = _parse(_scrape(exporter, '/'))
+    assert not tx.stats()['enabled']
+
+    assert _value(samples, 'can_tx_frames_total') == 1
+    assert types['can_call_duration_seconds'] == 'summary'
+    assert _value(samples, 'can_driver_results_total', call='send', result=0) == 1
+    assert _value(samples, 'can_call_duration_seconds_count', call='send') == 1
+
+
+def test_unknown_path_returns_404(bus):
+    tx, _ = bus
+    with MetricsExporter(tx, port=0) as exporter:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            _scrape(exporter, '/other')
+    assert error.value.code == 404
@@ -0,0 +1,113 @@
+import random
+
+from can_filter import AcceptanceFilter, EXPAND_LIMIT, _range_blocks
+from can_virtual import Message
+
+
+def _covered(blocks):
+    ids = []
+    for start, size in blocks:
+        assert start % size == 0
+        ids.extend(range(start, start + size))
+    return ids
+
+
+def _matches_pattern(filters, can_id, extended):
+    return any(e == extended and can_id & mask == code for code, mask, e in filters)
+
+
+def test_ids():
+    rx_filter = AcceptanceFilter(ids=[0x100, 0x18FF0001, (0x200, True)])
+    assert rx_filter.accepts(0x100)
+    assert not rx_filter.accepts(0x101)
+    assert not rx_filter.accepts(0x100, extended=True)
+    assert rx_filter.accepts(0x18FF0001, extended=True)
+    # 확장 여부를 명시하면 0x7FF 이하 ID도 확장 ID
+    assert rx_filter.accepts(0x200, extended=True)
+    assert not rx_filter.accepts(0x200)
+
+
+def test_ranges():
+    rx_filter = AcceptanceFilter(ranges=[(0x20F, 0x200), (0x18FF0000, 0x18FF00FF),
+                                         (0x10000000, 0x10FFFFFF)])
+    assert [can_id for can_id in range(0x1F0, 0x220) if rx_filter.accepts(can_id)] == list(range(0x200, 0x210))
+    assert rx_filter.accepts(0x18FF0080, extended=True)
+    assert not rx_filter.accepts(0x18FF0100, extended=True)
+    # 큰 확장 범위는 펼치지 않고 비교 목록으로 유지
+    assert rx_filter.ext_ranges == [(0x10000000, 0x10FFFFFF)]
+    assert rx_filter.accepts(0x10ABCDEF, extended=True)
+    assert not rx_filter.accepts(0x11000000, extended=True)
+
+
+def test_range_crossing_standard_limit_is_split():
+    rx_filter = AcceptanceFilter(ranges=[(0x700, 0x900)])
+    assert rx_filter.accepts(0x700)
+    assert rx_filter.accepts(0x7FF)
+    assert not rx_filter.accepts(0x6FF)
+    assert rx_filter.accepts(0x800, extended=True)
+    assert rx_filter.accepts(0x900, extended=True)
+    assert not rx_filter.accepts(0x700, extended=True)
+    assert not rx_filter.accepts(0x901, extended=True)
+
+    filters, exact = rx_filter.hardware_filters()
+    assert exact
+    assert all(_matches_pattern(filters, can_id, False) for can_id in range(0x700, 0x800))
+    assert all(_matches_pattern(filters, can_id, True) for can_id in range(0x800, 0x901))
+    assert not _matches_pattern(filters, 0x700, True)
+
+    # 확장 여부를 명시하면 나누지 않음
+    assert not AcceptanceFilter(ranges=[(0x700, 0x900, True)]).accepts(0x700)
+
+
+def test_masks():
+    rx_filter = AcceptanceFilter(masks=[(0x120, 0x7F0), (0x18DA00F1, 0x1FFF00FF, True),
+                                        (0x0CF00000, 0x1FF00000, True)])
+    assert [can_id for can_id in range(0x800) if rx_filter.accepts(can_id)] == list(range(0x120, 0x130))
+    assert rx_filter.accepts(0x18DA12F1, extended=True)
+    assert not rx_filter.accepts(0x18DA12F2, extended=True)
+    assert len(rx_filter.ext_masks) == 1  # 2^20개는 펼치지 않음
+    assert rx_filter.accepts(0x0CF12345, extended=True)
+    assert rx_filter.accepts(0x0CF12345, extended=True)  # 캐시된 결과
+
+
+def test_accepts_message():
+    rx_filter = AcceptanceFilter(ids=[0x100, 0x18FF0001])
+    msg = Message()
+    msg.id = 0x100
+    assert rx_filter.accepts_message(msg)
+    msg.flags.xtd = 1
+    assert not rx_filter.accepts_message(msg)
+    msg.id = 0x18FF0001
+    assert rx_filter.accepts_message(msg)
+
+
+def test_range_blocks_cover_range_exactly():
+    rng = random.Random(14)
+    for _ in range(200):
+        first = rng.randrange(0, 0x800)
+        last = rng.randrange(first, 0x800)
+        assert _covered(_range_blocks(first, last)) == list(range(first, last + 1))
+    assert _range_blocks(0, 0x7FF) == [(0, 0x800)]
+
+
+def test_hardware_filters_exact():
+    rx_filter = AcceptanceFilter(ids=[0x100], ranges=[(0x200, 0x20F)], masks=[(0x18DA0000, 0x1FFF0000, True)])
+    filters, exact = rx_filter.hardware_filters()
+    assert exact
+    assert filters == [(0x100, 0x7FF, False), (0x200, 0x7F0, False), (0x18DA0000, 0x1FFF0000, True)]
+
+
+def test_hardware_filters_merge_is_superset():
+    ids = [0x100 + 3 * index for index in range(20)] + [0x18FF0000 + index * 5 for index in range(10)]
+    rx_filter = AcceptanceFilter(ids=ids)
+    filters, exact = rx_filter.hardware_filters(max_filters=4)
+    assert not exact
+    assert len(filters) == 2
+    for can_id in ids:
+        assert _matches_pattern(filters, can_id, can_id > 0x7FF)
+
+
+def test_expand_limit_boundary():
+    rx_filter = AcceptanceFilter(ranges=[(0x10000000, 0x10000000 + EXPAND_LIMIT - 1)])
+    assert not rx_filter.ext_ranges
+    assert len(rx_filter.ext_ids) == EXPAND_LIMIT
@@ -0,0 +1,178 @@
+import ctypes
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from can_dbc import loads_dbc
+from can_frames import (FrameArrayCapture, FLAG_BRS, FLAG_FDF, FLAG_XTD, decode_signals, message_dtype,
+                        messages_to_array, new_frame_array, payload_bytes, select_id)
+from can_virtual import Message, len_to_dlc
+from kvaser_can import KvaserCAN, CANERR_NOERROR
+
+
+def _message(can_id, data, xtd=False, fdf=False, brs=False, stamp=1700000000.5):
+    msg = Message()
+    msg.id = can_id
+    msg.flags.xtd = int(xtd)
+    msg.flags.fdf = int(fdf)
+    msg.flags.brs = int(brs)
+    msg.dlc = len_to_dlc(len(data)) if fdf else len(data)
+    msg.data[:len(data)] = data
+    msg.timestamp.sec = int(stamp)
+    msg.timestamp.nsec = int(round((stamp - int(stamp)) * 1e9))
+    return msg
+
+
+def test_message_dtype_matches_ctypes_layout():
+    dtype = message_dtype(Message)
+    assert dtype.itemsize == ctypes.sizeof(Message)
+    assert dtype.fields['id'][1] == Message.id.offset
+    assert dtype.fields['data'][1] == Message.data.offset
+    assert message_dtype(Message) is dtype  # 캐시
+
+
+def test_extend_copies_fields():
+    capture = FrameArrayCapture(capacity=8)
+    messages = [_message(0x100, b'\x01\x02'), _message(0x18FF0001, bytes(range(8)), xtd=True, stamp=12.25)]
+    assert capture.extend(messages) == 2
+
+    frames = capture.view()
+    assert frames['id'].tolist() == [0x100, 0x18FF0001]
+    assert frames['flags'].tolist() == [0, FLAG_XTD]
+    assert frames['dlc'].tolist() == [2, 8]
+    assert frames['timestamp'].tolist() == pytest.approx([1700000000.5, 12.25])
+    assert payload_bytes(frames, 0) == b'\x01\x02'
+    assert payload_bytes(frames, 1) == bytes(range(8))
+
+
+def test_extend_across_staging_batches_and_capacity():
+    capture = FrameArrayCapture(capacity=10, staging=4)
+    assert capture.extend(_message(0x100 + index, bytes([index])) for index in range(7)) == 7
+    assert capture.extend(_message(0x200 + index, bytes([index])) for index in range(5)) == 3
+    assert (len(capture), capture.free(), capture.dropped) == (10, 0, 2)
+    assert capture.view()['id'].tolist() == [0x100 + i for i in range(7)] + [0x200, 0x201, 0x202]
+
+    capture.clear()
+    assert (len(capture), capture.dropped) == (0, 0)
+
+
+def test_fd_width():
+    payload = bytes(range(20))
+    fd = messages_to_array([_message(0x100, payload, fdf=True, brs=True)], fd=True)
+    assert fd['flags'][0] == FLAG_FDF | FLAG_BRS
+    assert payload_bytes(fd, 0) == payload
+
+    # 8바이트 배열에는 앞 8바이트만 저장
+    classic = messages_to_array([_message(0x100, payload, fdf=True)])
+    assert classic['data'][0].tobytes() == payload[:8]
+
+
+def test_select_id():
+    frames = messages_to_array([_message(0x100, b'\x01'), _message(0x100, b'\x02', xtd=True),
+                                _message(0x200, b'\x03')])
+    assert len(select_id(frames, 0x100)) == 2
+    assert select_id(frames, 0x100, extended_id=True)['data'][:, 0].tolist() == [2]
+    assert select_id(frames, 0x100, extended_id=False)['data'][:, 0].tolist() == [1]
+
+
+def test_receive_array():
+    tx = KvaserCAN(backend='virtual')
+    rx = KvaserCAN(backend='virtual')
+    for can in (tx, rx):
+        assert can.open(channel=1) == 0
+        assert can.start(bitrate_index=0) == 0
+    try:
+        capture = FrameArrayCapture(capacity=5)
+        for index in range(8):
+            tx.send(0x300 + index, [index])
+
+        result, batch = rx.receive_array(capture, max_frames=3, timeout=100)
+        assert (result, batch['id'].tolist()) == (CANERR_NOERROR, [0x300, 0x301, 0x302])
+        result, batch = rx.receive_array(capture, timeout=100)
+        assert batch['id'].tolist() == [0x303, 0x304]
+        assert capture.free() == 0
+        assert capture.view()['data'][:, 0].tolist() == [0, 1, 2, 3, 4]
+    finally:
+        for can in (tx, rx):
+            can.close()
+
+
+DBC = '''
+BO_ 688 SAS1: 8 EPS
+ SG_ SAS_Angle : 0|16@1- (0.1,0) [-3276.8|3276.7] "deg" ECU
+ SG_ SAS_Speed : 16|8@1+ (4,0) [0|1016] "deg/s" ECU
+ SG_ Wide : 20|40@1+ (1,0) [0|0] "" ECU
+
+BO_ 1280 MOTOROLA: 5 ECU
+ SG_ Speed : 7|16@0+ (0.01,0) [0|655.35] "km/h" EPS
+ SG_ Temp : 23|8@0- (1,-40) [-168|87] "degC" EPS
+ SG_ Odd : 29|11@0+ (1,0) [0|0] "" EPS
+
+BO_ 1536 MUXED: 8 ECU
+ SG_ Mux M : 0|8@1+ (1,0) [0|255] "" EPS
+ SG_ A m0 : 8|16@1+ (1,0) [0|65535] "" EPS
+ SG_ B m1 : 8|8@1+ (0.5,0) [0|127.5] "" EPS
+'''
+
+
+def _random_frames(can_id, count, seed=1):
+    frames = new_frame_array(count)
+    rng = np.random.default_rng(seed)
+    frames['id'] = can_id
+    frames['dlc'] = 8
+    frames['timestamp'] = np.arange(count) * 0.01
+    frames['data'] = rng.integers(0, 256, size=(count, 8), dtype=np.uint8)
+    return frames
+
+
+@pytest.mark.parametrize('name', ['SAS1', 'MOTOROLA'])
+def test_decode_signals_matches_scalar_decoder(name):
+    message = loads_dbc(DBC).get_message_by_name(name)
+    frames = _random_frames(message.frame_id, 200)
+    columns = decode_signals(frames, message)
+
+    assert columns['timestamp'].tolist() == pytest.approx(frames['timestamp'].tolist())
+    for index in range(len(frames)):
+        expected = message.decode(frames['data'][index].tobytes())
+        for signal, value in expected.items():
+            assert columns[signal][index] == pytest.approx(value), (signal, index)
+
+
+def test_decode_signals_selects_and_keeps_integer_columns():
+    message = loads_dbc(DBC).get_message_by_name('SAS1')
+    frames = np.concatenate([_random_frames(0x2B0, 5), _random_frames(0x2B1, 5)])
+    frames['flags'][2] = FLAG_XTD  # 같은 ID의 확장 프레임은 제외
+
+    columns = decode_signals(frames, message)
+    assert len(columns['SAS_Speed']) == 4
+    assert columns['SAS_Speed'].dtype == np.int64
+    assert columns['SAS_Angle'].dtype == np.float64
+    assert len(decode_signals(frames, message, select=False)['SAS_Angle']) == 10
+
+
+def test_decode_signals_multiplexed():
+    message = loads_dbc(DBC).get_message_by_name('MUXED')
+    frames = new_frame_array(3)
+    frames['id'] = 0x600
+    frames['data'][:, :3] = [[0, 0x34, 0x12], [1, 10, 0], [2, 0, 0]]
+
+    columns = decode_signals(frames, message)
+    assert columns['Mux'].tolist() == [0, 1, 2]
+    assert columns['A'][0] == 0x1234 and np.isnan(columns['A'][1:]).all()
+    assert columns['B'][1] == 5.0 and np.isnan(columns['B'][[0, 2]]).all()
+
+
+def test_write_parquet(tmp_path):
+    pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+
+    from can_frames import write_parquet
+
+    message = loads_dbc(DBC).get_message_by_name('SAS1')
+    columns = decode_signals(_random_frames(0x2B0, 10), message)
+    path = str(tmp_path / 'sas.parquet')
+    write_parquet(columns, path)
+    table = pyarrow.parquet.read_table(path)
+    assert table.column_names == list(columns)
+    assert table.column('SAS_Speed').to_pylist() == columns['SAS_Speed'].tolist()
@@ -0,0 +1,129 @@
+import time
+
+import pytest
+
+from can_gateway import CANGateway, RewriteRule, _Route
+from can_virtual import Message, CANERR_OFFLINE, CANERR_TX_BUSY
+from kvaser_can import KvaserCAN, CANERR_NOERROR
+
+
+class _FakeTarget:
+    """accept개 프레임을 받은 뒤 result를 failures번(None이면 계속) 돌려주는 송신 채널"""
+
+    def __init__(self, accept, result=CANERR_TX_BUSY, failures=None):
+        self.accept = accept
+        self.result = result
+        self.failures = failures
+        self.sent = []
+
+    def send_many(self, frames):
+        count = len(frames)
+        if self.failures != 0:
+            count = min(self.accept, count)
+            self.accept -= count
+        self.sent.extend(frames[:count])
+        if count == len(frames):
+            return CANERR_NOERROR, count
+        if self.failures:
+            self.failures -= 1
+        return self.result, count
+
+
+@pytest.fixture
+def channels():
+    """게이트웨이 채널 A/B와 각 버스의 상대 노드"""
+    nodes = []
+    for channel in (2, 2, 3, 3):
+        can = KvaserCAN(backend='virtual')
+        assert can.open(channel=channel) == 0
+        assert can.start(bitrate_index=0) == 0
+        nodes.append(can)
+    yield nodes
+    for can in nodes:
+        can.close()
+
+
+def _frames(count):
+    return [(0x100 + index, bytes([index]), 0) for index in range(count)]
+
+
+def _send(gateway, target, frames):
+    route = _Route(None, target, None)
+    gateway._send(route, frames, [0.0] * len(frames), time.perf_counter())
+    return route.stats
+
+
+def test_busy_timeout_drops_rest_of_batch():
+    gateway = CANGateway(None, None, busy_timeout=0.05)
+    start = time.perf_counter()
+    stats = _send(gateway, _FakeTarget(accept=0), _frames(10))
+    elapsed = time.perf_counter() - start
+
+    assert (stats.forwarded, stats.dropped) == (0, 10)
+    assert stats.last_result == CANERR_TX_BUSY
+    # 프레임마다 busy_timeout을 다시 기다리지 않음
+    assert elapsed < 0.05 * 5
+
+
+def test_busy_timeout_after_partial_send():
+    gateway = CANGateway(None, None, busy_timeout=0.01)
+    target = _FakeTarget(accept=3)
+    stats = _send(gateway, target, _frames(8))
+    assert (stats.forwarded, stats.dropped) == (3, 5)
+    assert [frame[0] for frame in target.sent] == [0x100, 0x101, 0x102]
+
+
+def test_other_error_drops_single_frame():
+    gateway = CANGateway(None, None)
+    target = _FakeTarget(accept=2, result=CANERR_OFFLINE, failures=1)
+    stats = _send(gateway, target, _frames(4))
+    # 3번째 프레임만 버리고 나머지는 다시 송신
+    assert (stats.forwarded, stats.dropped, stats.busy_retries) == (3, 1, 0)
+    assert [frame[0] for frame in target.sent] == [0x100, 0x101, 0x103]
+
+
+def test_route_returns_replaced_filter(channels):
+    can_a, _, can_b, _ = channels
+    can_a.set_filter(ids=[0x7FF])
+    previous = can_a.user_filter
+    gateway = CANGateway(can_a, can_b)
+
+    assert gateway.route('a_to_b', ids=[0x100]) == (CANERR_NOERROR, previous)
+    result, replaced = gateway.route('b_to_a')
+    assert (result, replaced) == (CANERR_NOERROR, None)
+    with pytest.raises(ValueError):
+        gateway.route('a_to_c')
+
+
+def test_forward_with_rewrite_and_fd_frames(channels):
+    can_a, peer_a, can_b, peer_b = channels
+    gateway = CANGateway(can_a, can_b)
+    gateway.route('a_to_b', ids=[0x100, 0x200, 0x201],
+                  rewrites={0x200: RewriteRule(new_id=0x300, set_bytes={1: 0xFF}),
+                            0x201: RewriteRule(transform=lambda data: None)})
+
+    for can_id in (0x100, 0x150, 0x200, 0x201):
+        assert peer_a.send(can_id, [0x01]) == CANERR_NOERROR
+    fd = Message()
+    fd.id = 0x100
+    fd.flags.fdf = 1
+    fd.dlc = 9
+    assert peer_a.api.write(message=fd, timeout=0) == CANERR_NOERROR
+
+    assert gateway.start() == CANERR_NOERROR
+    try:
+        frames = []
+        deadline = time.monotonic() + 2.0
+        while len(frames) < 2 and time.monotonic() < deadline:
+            result, batch = peer_b.receive_many(max_frames=16, timeout=100)
+            frames.extend(batch)
+        while gateway.stats()['a_to_b']['received'] < 4 and time.monotonic() < deadline:
+            time.sleep(0.005)
+    finally:
+        gateway.stop()
+
+    assert [(msg.id, bytes(msg.data[:msg.dlc])) for msg in frames] == [(0x100, b'\x01'), (0x300, b'\x01\xff')]
+    stats = gateway.stats()['a_to_b']
+    assert (stats['received'], stats['forwarded'], stats['filtered'], stats['fd_rejected']) == (4, 2, 1, 1)
+    assert stats['dropped'] == 0
+    assert stats['latency']['count'] == 2
@@ -0,0 +1,145 @@
+import pytest
+
+from can_ids import IDSBaseline, IntrusionDetector, _priority, learn_baseline
+from can_virtual import Message
+
+
+def _clean_frames(duration=1.0):
+    """0x100 10ms 주기, 0x2B0 20ms 주기, 확장 ID 0x18FF50E5 100ms 주기"""
+    frames = []
+    for index in range(int(duration / 0.01)):
+        timestamp = index * 0.01
+        frames.append((timestamp, 0x100, 0, 8, bytes(8)))
+        if index % 2 == 0:
+            frames.append((timestamp + 0.001, 0x2B0, 0, 8, bytes(8)))
+        if index % 10 == 0:
+            frames.append((timestamp + 0.002, 0x18FF50E5, 0x01, 8, bytes(8)))
+    return frames
+
+
+@pytest.fixture
+def baseline():
+    return learn_baseline(_clean_frames())
+
+
+def test_learn_baseline_periods(baseline):
+    assert set(baseline.periods) == {0x100, 0x2B0, 0x18FF50E5 | 0x80000000}
+    period = baseline.periods[0x2B0]
+    assert period['count'] == 49
+    assert period['mean'] == pytest.approx(0.020)
+    assert period['stddev'] == pytest.approx(0.0, abs=1e-9)
+    assert period['min'] == pytest.approx(0.020)
+    assert 0x18FF50E5 | 0x80000000 in baseline
+
+
+def test_learn_baseline_from_messages():
+    messages = []
+    for index in range(5):
+        msg = Message()
+        msg.id = 0x300
+        msg.timestamp.sec = index
+        messages.append(msg)
+    assert learn_baseline(messages).periods[0x300]['mean'] == pytest.approx(1.0)
+
+
+def test_baseline_save_and_load(baseline, tmp_path):
+    path = str(tmp_path / 'baseline.json')
+    baseline.save(path)
+    assert IDSBaseline.load(path).periods == baseline.periods
+
+
+def test_clean_traffic_raises_no_alerts(baseline):
+    detector = IntrusionDetector(baseline)
+    for timestamp, can_id, flags, _, _ in _clean_frames():
+        detector.update_frame(timestamp + 1.0, can_id, flags)
+    assert list(detector.alerts) == []
+    assert detector.stats()['frames'] == len(_clean_frames())
+
+
+def test_injection_raises_rate_alert_within_milliseconds(baseline):
+    alerts = []
+    detector = IntrusionDetector(baseline, on_alert=alerts.append)
+    detector.update_frame(0.0, 0x2B0)
+    # 20ms 주기 ID에 1ms 간격으로 주입: short_count(3)번째 짧은 간격에서 경보
+    for index in range(1, 10):
+        detector.update_frame(0.020 + index * 0.001, 0x2B0)
+
+    assert [alert.kind for alert in alerts] == ['rate']
+    assert alerts[0].can_id == 0x2B0
+    assert alerts[0].timestamp == pytest.approx(0.024)
+
+
+def test_occasional_short_gap_decays(baseline):
+    detector = IntrusionDetector(baseline)
+    timestamp = 0.0
+    for _ in range(10):
+        # 짧은 간격 하나 다음 정상 간격 하나
+        timestamp += 0.002
+        detector.update_frame(timestamp, 0x100)
+        timestamp += 0.010
+        detector.update_frame(timestamp, 0x100)
+    assert detector.alert_counts['rate'] == 0
+
+
+def test_unknown_id_and_alert_interval(baseline):
+    detector = IntrusionDetector(baseline, alert_interval=1.0)
+    detector.update_frame(0.0, 0x555)
+    detector.update_frame(0.5, 0x555)
+    detector.update_frame(1.5, 0x555)
+    detector.update_frame(0.6, 0x555, flags=0x01)
+
+    kinds = [(alert.kind, alert.can_id, alert.extended) for alert in detector.alerts]
+    assert kinds == [('unknown_id', 0x555, False), ('unknown_id', 0x555, False),
+                     ('unknown_id', 0x555, True)]
+
+
+def test_high_priority_flood(baseline):
+    detector = IntrusionDetector(baseline, flood_window=0.01, flood_frames=10)
+    for index in range(10):
+        detector.update_frame(index * 0.0005, 0x000)
+    assert detector.alert_counts['flood'] == 1
+    assert detector.alert_counts['unknown_id'] == 1
+
+    # 알려진 ID보다 낮은 우선순위의 미등록 ID는 flood로 세지 않음
+    other = IntrusionDetector(baseline, flood_window=0.01, flood_frames=10)
+    for index in range(10):
+        other.update_frame(index * 0.0005, 0x700)
+    assert other.alert_counts['flood'] == 0
+
+
+def test_missing_after_silence(baseline):
+    detector = IntrusionDetector(baseline, missing_ratio=5.0)
+    detector.update_frame(0.0, 0x100)
+    detector.update_frame(0.0, 0x2B0)
+    assert detector.check_missing(0.04) == []
+
+    alerts = detector.check_missing(0.06)
+    assert [(alert.kind, alert.can_id) for alert in alerts] == [('missing', 0x100)]
+    # 같은 ID는 alert_interval 안에 다시 경보하지 않음
+    assert [alert.can_id for alert in detector.check_missing(0.2)] == [0x2B0]
+
+
+def test_priority_order():
+    # 같은 상위 11비트면 표준 ID가 확장 ID보다 우선
+    assert _priority(0x123) < _priority((0x123 << 18) | 0x80000000)
+    assert _priority((0x122 << 18) | 0x3FFFF | 0x80000000) < _priority(0x123)
+    assert _priority(0x000) < _priority(0x001)
+
+
+def test_missing_reports_ids_never_seen(baseline):
+    detector = IntrusionDetector(baseline, missing_ratio=5.0)
+    # 0x2B0과 확장 ID는 한 번도 들어오지 않음: 첫 프레임 시각부터 잼
+    for index in range(20):
+        detector.update_frame(10.0 + index * 0.01, 0x100)
+
+    alerts = detector.check_missing(10.19)
+    assert [alert.can_id for alert in alerts] == [0x2B0]
+    # 0x2B0은 alert_interval 안이라 다시 경보하지 않음
+    alerts = detector.check_missing(10.6)
+    assert [(alert.can_id, alert.extended) for alert in alerts] == [(0x100, False), (0x18FF50E5, True)]
+
+
+def test_missing_on_silent_bus_counts_from_first_check(baseline):
+    detector = IntrusionDetector(baseline, missing_ratio=5.0)
+    assert detector.check_missing(100.0) == []
+    assert {alert.can_id for alert in detector.check_missing(100.6)} == {0x100, 0x2B0, 0x18FF50E5}
@@ -0,0 +1,152 @@
+import random
+
+import pytest
+
+from can_instrument import (BUCKET_COUNT, HALF_COUNT, SUB_BITS, Instrumentation, InstrumentedAPI,
+                            LogHistogram, unwrap_api)
+from kvaser_can import KvaserCAN, CANERR_NOERROR, CANERR_RX_EMPTY
+
+
+def _index(value):
+    histogram = LogHistogram()
+    histogram.record(value)
+    return histogram.counts.index(1)
+
+
+def test_small_values_use_exact_buckets():
+    for value in range(1 << SUB_BITS):
+        assert _index(value) == value
+        assert LogHistogram.bucket_value(value) == value
+
+
+def test_bucket_upper_bound_and_relative_error():
+    rng = random.Random(1)
+    values = [rng.randrange(1 << bits) for bits in range(1, 40) for _ in range(20)]
+    values += [(1 << bits) + offset for bits in range(SUB_BITS, 40) for offset in (-1, 0, 1)]
+    for value in values:
+        upper = LogHistogram.bucket_value(_index(value))
+        assert value <= upper
+        assert upper - value <= value / HALF_COUNT
+
+
+def test_bucket_index_is_monotonic():
+    indexes = [_index(value) for value in range(0, 1 << 14)]
+    assert indexes == sorted(indexes)
+    # 옥타브마다 HALF_COUNT개 버킷
+    assert _index((1 << 14) - 1) - _index(1 << 13) == HALF_COUNT - 1
+
+
+def test_out_of_range_values_are_clamped():
+    histogram = LogHistogram()
+    histogram.record(-5)
+    histogram.record(1 << 50)
+    assert histogram.counts[0] == 1
+    assert histogram.counts[BUCKET_COUNT - 1] == 1
+    assert histogram.min == 0
+    assert histogram.max == 1 << 50
+
+
+def test_percentile_and_snapshot():
+    histogram = LogHistogram()
+    assert histogram.percentile(0.5) == 0
+    for value in range(1, 1001):
+        histogram.record(value * 1000)
+
+    p50 = histogram.percentile(0.50)
+    assert 500000 <= p50 <= 500000 * (1 + 1 / HALF_COUNT)
+    assert histogram.percentile(1.0) == 1000000
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 1000
+    assert snapshot['mean'] == pytest.approx(500.5e-6)
+    assert snapshot['min'] == pytest.approx(1e-6)
+    assert snapshot['p50'] == pytest.approx(p50 * 1e-9)
+
+
+def test_wrap_records_result_codes():
+    instrumentation = Instrumentation()
+    codes = iter([0, -20, (0, 3), (-30, [])])
+    wrapped = instrumentation.wrap('call', lambda: next(codes))
+    for _ in range(4):
+        wrapped()
+
+    entry = instrumentation.snapshot()['call']
+    assert entry['count'] == 4
+    assert entry['results'] == {0: 2, -20: 1, -30: 1}
+
+
+def test_wrap_without_results_records_exceptions():
+    instrumentation = Instrumentation()
+
+    def failing():
+        raise RuntimeError('handler failed')
+
+    wrapped = instrumentation.wrap('callback', failing, results=False)
+    with pytest.raises(RuntimeError):
+        wrapped()
+    entry = instrumentation.snapshot()['callback']
+    assert entry['count'] == 1
+    assert entry['results'] == {}
+
+
+def test_instrumented_api_passthrough():
+    class _API:
+        channel = 3
+
+        def read(self, timeout):
+            return CANERR_RX_EMPTY, None
+
+        def write(self, msg, timeout):
+            return CANERR_NOERROR
+
+    api = _API()
+    instrumentation = Instrumentation()
+    wrapped = InstrumentedAPI(api, instrumentation)
+    assert wrapped.channel == 3
+    assert wrapped.read(0) == (CANERR_RX_EMPTY, None)
+    assert unwrap_api(wrapped) is api
+    assert unwrap_api(api) is api
+    assert instrumentation.snapshot()['driver_read']['results'] == {CANERR_RX_EMPTY: 1}
+
+
+@pytest.fixture
+def pair():
+    nodes = []
+    for _ in range(2):
+        can = KvaserCAN(backend='virtual')
+        assert can.open(channel=1) == 0
+        assert can.start(bitrate_index=0) == 0
+        nodes.append(can)
+    yield nodes
+    for can in nodes:
+        can.close()
+
+
+def test_kvaser_can_instrumentation(pair):
+    tx, rx = pair
+    assert tx.stats() == {'enabled': False}
+    tx.enable_instrumentation()
+    rx.enable_instrumentation()
+
+    assert tx.send(0x100, b'\x01') == CANERR_NOERROR
+    assert tx.send_many([(0x101, b'\x02', 0), (0x102, b'\x03', 0)]) == (CANERR_NOERROR, 2)
+    result, messages = rx.receive_many(max_frames=8, timeout=100)
+    assert result == CANERR_NOERROR and len(messages) == 3
+
+    stats = tx.stats()
+    assert stats['enabled']
+    assert stats['send']['count'] == 1
+    assert stats['send_many']['results'] == {CANERR_NOERROR: 1}
+    assert stats['driver_write']['count'] >= 3
+    assert rx.stats()['receive_many']['results'] == {CANERR_NOERROR: 1}
+
+    # 끄면 감싼 메서드와 API를 지우고 결과는 유지
+    tx.enable_instrumentation(False)
+    assert 'send' not in tx.__dict__
+    assert not isinstance(tx.api, InstrumentedAPI)
+    assert tx.send(0x103, b'') == CANERR_NOERROR
+    stats = tx.stats()
+    assert not stats['enabled']
+    assert stats['send']['count'] == 1
+
+    tx.enable_instrumentation(reset=True)
+    assert tx.stats()['send']['count'] == 0
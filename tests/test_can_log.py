@@ -0,0 +1,152 @@
+import threading
+
+import pytest
+
+from can_log import CaptureRecorder, LogReader, available_codecs, np
+from kvaser_can import KvaserCAN
+
+
+@pytest.fixture
+def bus():
+    tx = KvaserCAN(backend='virtual')
+    rx = KvaserCAN(backend='virtual')
+    for can in (tx, rx):
+        assert can.open(channel=4) == 0
+        assert can.start(bitrate_index=0) == 0
+    yield tx, rx
+    for can in (tx, rx):
+        can.close()
+
+
+def _receive_frames(tx, rx, count):
+    """가상 버스로 표준/확장 ID 프레임을 번갈아 보내고 모두 수신"""
+    for index in range(count):
+        assert tx.send(0x123, [index & 0xFF] * 8, extended_id=bool(index % 2)) == 0
+    frames = []
+    while len(frames) < count:
+        result, batch = rx.receive_many(max_frames=256, timeout=100)
+        assert result == 0
+        frames.extend(batch)
+    return frames
+
+
+@pytest.mark.parametrize('compression', available_codecs())
+def test_round_trip(tmp_path, bus, compression):
+    tx, rx = bus
+    frames = _receive_frames(tx, rx, 100)
+    path = str(tmp_path / 'capture.kvlog')
+
+    with CaptureRecorder(path, chunk_frames=16, compression=compression) as recorder:
+        assert recorder.write_many(frames) == 100
+
+    with LogReader(path) as log:
+        records = list(log.read())
+        assert len(log) == len(records) == 100
+        for record, msg in zip(records, frames):
+            assert record[1] == msg.id
+            assert bool(record[2] & 0x01) == bool(msg.flags.xtd)
+            assert type(record[4]) is bytes
+            assert record[4] == bytes(msg.data[:msg.dlc])
+
+
+@pytest.mark.parametrize('compression', ['none', 'zlib'])
+def test_close_with_live_records(tmp_path, compression):
+    path = str(tmp_path / 'capture.kvlog')
+    with CaptureRecorder(path, chunk_frames=8, compression=compression) as recorder:
+        for index in range(20):
+            recorder.write_frame(index * 0.001, 0x2B0, bytes([index] * 8))
+
+    log = LogReader(path)
+    records = list(log.read())
+    chunk = log.chunk_data(0)
+    log.close()
+
+    assert type(chunk) is bytes
+    assert records[-1][4] == bytes([19] * 8)
+
+
+def test_index_separates_standard_and_extended(tmp_path):
+    path = str(tmp_path / 'capture.kvlog')
+    with CaptureRecorder(path, chunk_frames=4, compression='none') as recorder:
+        for index in range(8):
+            recorder.write_frame(index * 0.001, 0x123, bytes(8))
+        for index in range(8, 12):
+            recorder.write_frame(index * 0.001, 0x123, bytes(8), flags=0x01)
+
+    for _ in range(2):  # 새로 만든 인덱스, 저장된 인덱스
+        with LogReader(path) as log:
+            assert log.ids() == [(0x123, False), (0x123, True)]
+            assert log.select_chunks(ids=[(0x123, True)]) == [2]
+            assert len(list(log.read(ids=[0x123]))) == 8
+            assert len(list(log.read(ids=[(0x123, True)]))) == 4
+            if np is not None:
+                assert len(log.read_array(ids=[(0x123, True)])) == 4
+
+
+def test_slow_writer_does_not_block_recording(tmp_path):
+    path = str(tmp_path / 'capture.kvlog')
+    recorder = CaptureRecorder(path, chunk_frames=4, compression='none', max_pending_chunks=2)
+
+    # 디스크가 멈춘 상황: 쓰기 스레드가 첫 청크에서 대기
+    release = threading.Event()
+    file_write = recorder._file.write
+
+    def slow_write(data):
+        release.wait(5.0)
+        return file_write(data)
+
+    recorder._file.write = slow_write
+    for index in range(40):
+        recorder.write_frame(index * 0.001, 0x100, bytes([index] * 8))
+
+    stats = recorder.stats()
+    assert stats['frames'] == 40
+    assert stats['pending_chunks'] <= 2
+    assert stats['dropped_chunks'] > 0
+    assert not release.is_set()
+
+    release.set()
+    recorder.close()
+    with LogReader(path) as log:
+        written = [record[4][0] for record in log.read()]
+    # 대기열이 가득 찬 동안의 청크만 빠지고 나머지는 순서대로 기록됨
+    assert len(written) + recorder.stats()['dropped_frames'] == 40
+    assert written == sorted(written)
+    assert written[:4] == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize('compression', ['none', 'zlib'])
+def test_out_of_order_writes_keep_time_window(tmp_path, compression):
+    path = str(tmp_path / 'capture.kvlog')
+    # 두 채널이 한 기록기에 쓰는 상황: 청크 안에서 시각이 앞뒤로 섞임
+    stamps = [1.0, 5.0, 2.0, 3.0, 9.0, 4.0, 8.0, 6.0, 7.0]
+    with CaptureRecorder(path, chunk_frames=3, compression=compression) as recorder:
+        for index, stamp in enumerate(stamps):
+            recorder.write_frame(stamp, 0x100 + index, bytes([index]))
+
+    for _ in range(2):  # 새로 만든 인덱스, 저장된 인덱스
+        with LogReader(path) as log:
+            assert [(chunk.t_first, chunk.t_last) for chunk in log.chunks] == \
+                [(1000000000, 5000000000), (3000000000, 9000000000), (6000000000, 8000000000)]
+            assert log.time_range() == (1.0, 9.0)
+            window = sorted(record[0] for record in log.read(t0=4.5, t1=6.5))
+            assert window == [5.0, 6.0]
+            assert sorted(record[0] for record in log.read(t0=1.5, t1=2.5)) == [2.0]
+
+
+def test_invalid_header_closes_file(tmp_path, monkeypatch):
+    import can_log
+
+    path = tmp_path / 'broken.kvlog'
+    path.write_bytes(b'NOTALOG!' + bytes(8))
+    opened = []
+
+    def tracking_open(*args, **kwargs):
+        stream = open(*args, **kwargs)
+        opened.append(stream)
+        return stream
+
+    monkeypatch.setattr(can_log, 'open', tracking_open, raising=False)
+    with pytest.raises(ValueError):
+        LogReader(str(path))
+    assert opened and all(stream.closed for stream in opened)
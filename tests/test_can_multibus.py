@@ -0,0 +1,130 @@
+import collections
+import time
+
+import pytest
+
+from can_multibus import MultiChannelBus, _message_time, _to_message
+from kvaser_can import KvaserCAN, Message, CANERR_NOERROR
+
+
+def _message(timestamp, msg_id):
+    return _to_message((timestamp, msg_id, 0, 1, bytes([msg_id & 0xFF])))
+
+
+class _FakeSource:
+    """미리 정해 둔 메시지를 pull()마다 한 묶음씩 돌려주는 채널 수신기"""
+
+    def __init__(self, channel, batches, finish=True):
+        self.channel = channel
+        self.batches = list(batches)
+        self.finish = finish
+        self.finished = False
+
+    def pull(self, max_items):
+        if self.batches:
+            return self.batches.pop(0)
+        if self.finish:
+            self.finished = True
+        return []
+
+    def dropped(self):
+        return 0
+
+    def stop(self):
+        pass
+
+
+def _bus(sources, max_delay=0.05):
+    bus = MultiChannelBus([source.channel for source in sources], backend='virtual',
+                          max_delay=max_delay)
+    bus.sources = list(sources)
+    bus._pending = [collections.deque() for _ in sources]
+    bus._in_heap = [False] * len(sources)
+    return bus
+
+
+def test_to_message_round_trip():
+    msg = _to_message((12.25, 0x18FF50E5, 0x01 | 0x04 | 0x08, 12, bytes(range(24))))
+    assert msg.id == 0x18FF50E5
+    assert (msg.flags.xtd, msg.flags.rtr, msg.flags.fdf, msg.flags.brs, msg.flags.esi) == (1, 0, 1, 1, 0)
+    assert msg.dlc == 12
+    assert bytes(msg.data[:24]) == bytes(range(24))
+    assert msg.timestamp.sec == 12
+    assert _message_time(msg) == pytest.approx(12.25)
+
+
+def test_merge_orders_by_timestamp():
+    a = _FakeSource(0, [[_message(1.0, 0x100), _message(3.0, 0x101)], [_message(5.0, 0x102)]])
+    b = _FakeSource(1, [[_message(2.0, 0x200), _message(4.0, 0x201), _message(6.0, 0x202)]])
+    bus = _bus([a, b])
+
+    merged = list(bus)
+    assert [(channel, msg.id) for channel, msg in merged] == [
+        (0, 0x100), (1, 0x200), (0, 0x101), (1, 0x201), (0, 0x102), (1, 0x202)]
+    assert bus.merged == 6
+    assert all(entry['finished'] for entry in bus.stats()['channels'].values())
+
+
+def test_quiet_channel_waits_at_most_max_delay():
+    a = _FakeSource(0, [[_message(1.0, 0x100), _message(2.0, 0x101)]])
+    quiet = _FakeSource(1, [], finish=False)
+    bus = _bus([a, quiet], max_delay=0.02)
+
+    # 조용한 채널의 선두 프레임을 기다리는 동안에는 내보내지 않음
+    start = time.perf_counter()
+    frames = bus.read(max_frames=2, timeout=500)
+    elapsed = time.perf_counter() - start
+    assert [msg.id for _, msg in frames] == [0x100, 0x101]
+    assert 0.02 <= elapsed < 0.4
+    assert bus.stats()['channels'][0]['pending'] == 0
+
+
+def test_late_frame_from_other_channel_is_merged_first():
+    a = _FakeSource(0, [[_message(2.0, 0x100)]], finish=False)
+    b = _FakeSource(1, [[], [_message(1.0, 0x200)]], finish=False)
+    bus = _bus([a, b], max_delay=1.0)
+
+    # 채널 1의 프레임이 늦게 도착해도 더 이른 타임스탬프이므로 먼저 나감
+    frames = bus.read(max_frames=2, timeout=200)
+    assert [(channel, msg.id) for channel, msg in frames] == [(1, 0x200)]
+    assert bus.stats()['channels'][0]['pending'] == 1
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        MultiChannelBus([0], mode='fork')
+
+
+@pytest.fixture
+def senders():
+    nodes = []
+    for channel in (2, 3):
+        can = KvaserCAN(backend='virtual')
+        assert can.open(channel=channel) == 0
+        assert can.start(bitrate_index=0) == 0
+        nodes.append(can)
+    yield nodes
+    for can in nodes:
+        can.close()
+
+
+def test_thread_mode_merges_virtual_channels(senders):
+    bus = MultiChannelBus([2, 3], backend='virtual', bitrate_index=0, max_delay=0.01)
+    assert bus.open() == CANERR_NOERROR
+    try:
+        for index in range(20):
+            senders[index % 2].send(0x100 + index, bytes([index]))
+            time.sleep(0.001)
+
+        frames = []
+        deadline = time.monotonic() + 2.0
+        while len(frames) < 20 and time.monotonic() < deadline:
+            frames.extend(bus.read(max_frames=64, timeout=50))
+    finally:
+        bus.close()
+
+    assert [msg.id for _, msg in frames] == [0x100 + index for index in range(20)]
+    assert [channel for channel, _ in frames] == [2 + index % 2 for index in range(20)]
+    stamps = [_message_time(msg) for _, msg in frames]
+    assert stamps == sorted(stamps)
+    assert isinstance(frames[0][1], Message)
@@ -0,0 +1,111 @@
+import time
+
+import pytest
+
+from can_log import CaptureRecorder
+from can_replay import ReplayEngine, ReplayReport, load_frames
+from can_virtual import CANERR_TX_BUSY
+from kvaser_can import KvaserCAN, CANERR_NOERROR
+
+
+@pytest.fixture
+def bus():
+    tx = KvaserCAN(backend='virtual')
+    rx = KvaserCAN(backend='virtual')
+    for can in (tx, rx):
+        assert can.open(channel=6) == 0
+        assert can.start(bitrate_index=0) == 0
+    yield tx, rx
+    for can in (tx, rx):
+        can.close()
+
+
+class _BusyCAN:
+    """accept개 프레임을 받은 뒤 송신 큐가 계속 가득 찬 채널"""
+    is_started = True
+
+    def __init__(self, accept):
+        self.accept = accept
+
+    def send_many(self, frames):
+        count = min(self.accept, len(frames))
+        self.accept -= count
+        return (CANERR_NOERROR if count == len(frames) else CANERR_TX_BUSY), count
+
+
+def _frames(count, interval):
+    return [(100.0 + index * interval, 0x100 + index, 0, 1, bytes([index])) for index in range(count)]
+
+
+def _drain(rx):
+    frames = []
+    while True:
+        result, batch = rx.receive_many(max_frames=256, timeout=20)
+        if result != CANERR_NOERROR:
+            return frames
+        frames.extend(batch)
+
+
+def test_report_percentiles():
+    report = ReplayReport()
+    for error in [0.0001] * 90 + [0.002] * 9 + [0.05]:
+        report.add_error(error)
+    report.add_error(-0.0001)  # 앞선 송신은 0으로 집계
+
+    timing = report.summary()['timing_error']
+    assert timing['count'] == 101
+    assert timing['p50'] == pytest.approx(0.0001, rel=0.02)
+    assert timing['p99'] == pytest.approx(0.002, rel=0.02)
+    assert timing['p999'] == pytest.approx(0.05, rel=0.02)
+    assert timing['min'] == pytest.approx(-0.0001)
+    assert ReplayReport().percentile(0.99) == 0.0
+
+
+def test_replay_realtime_report(bus):
+    tx, rx = bus
+    report = ReplayEngine(tx, speed=1.0).run(_frames(20, 0.005))
+
+    assert (report.frames, report.sent, report.failed) == (20, 20, 0)
+    assert report.duration >= 0.095
+    timing = report.summary()['timing_error']
+    assert timing['count'] == 20
+    assert 0.0 <= timing['p50'] <= timing['p99']
+    assert timing['p50'] < 0.005
+
+    assert [msg.id for msg in _drain(rx)] == [0x100 + index for index in range(20)]
+
+
+def test_replay_speed(bus):
+    tx, rx = bus
+    fast = ReplayEngine(tx, speed=4.0).run(_frames(11, 0.01))
+    assert fast.sent == 11
+    assert 0.025 <= fast.duration < 0.1
+
+    unpaced = ReplayEngine(tx, speed=0).run(_frames(11, 0.01))
+    assert unpaced.sent == 11
+    assert unpaced.summary()['timing_error']['count'] == 0
+    assert len(_drain(rx)) == 22
+
+
+def test_replay_capture_log(tmp_path, bus):
+    tx, rx = bus
+    path = str(tmp_path / 'capture.kvlog')
+    with CaptureRecorder(path, chunk_frames=4) as recorder:
+        for timestamp, msg_id, flags, dlc, data in _frames(10, 0.002):
+            recorder.write_frame(timestamp, msg_id, data, flags=flags, dlc=dlc)
+
+    report = ReplayEngine(tx, speed=1.0).run(load_frames(path))
+    assert (report.sent, report.failed) == (10, 0)
+    assert [bytes(msg.data[:msg.dlc]) for msg in _drain(rx)] == [bytes([index]) for index in range(10)]
+
+
+def test_busy_timeout_skips_rest_of_batch():
+    engine = ReplayEngine(_BusyCAN(accept=3), speed=0, busy_timeout=0.05)
+    start = time.perf_counter()
+    report = engine.run(_frames(20, 0.001))
+    elapsed = time.perf_counter() - start
+
+    assert (report.frames, report.sent, report.failed) == (20, 3, 17)
+    assert report.busy_retries > 0
+    # 프레임마다 busy_timeout을 다시 기다리지 않음
+    assert elapsed < 0.05 * 5
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from can_ringbuffer import FrameRingBuffer
+
+
+def test_capacity_rounds_up_to_power_of_two():
+    assert FrameRingBuffer(5).capacity == 8
+    assert FrameRingBuffer(8).capacity == 8
+
+
+def test_push_pop_and_wraparound():
+    buffer = FrameRingBuffer(4)
+    for start in range(0, 12, 3):
+        assert buffer.push_many(range(start, start + 3)) == 3
+        assert buffer.pop_many(max_items=2) == [start, start + 1]
+        assert buffer.pop() == start + 2
+    assert buffer.pop() is None
+    assert buffer.stats()['pushed'] == buffer.stats()['popped'] == 12
+
+
+def test_overflow_drops_new_frames():
+    buffer = FrameRingBuffer(4)
+    assert buffer.push_many(range(6)) == 4
+    assert not buffer.push(6)
+    buffer.pop_many(max_items=2)
+    assert buffer.push_many([7]) == 1
+    # 공간이 생긴 뒤 다시 가득 차면 overflows 증가
+    assert buffer.push_many([8, 9]) == 1
+
+    stats = buffer.stats()
+    assert (stats['dropped'], stats['overflows'], stats['high_watermark'], stats['fill']) == (4, 2, 4, 4)
+    assert buffer.pop_many() == [2, 3, 7, 8]
+
+
+def test_pop_many_waits_for_producer():
+    buffer = FrameRingBuffer(16)
+    timer = threading.Timer(0.02, buffer.push_many, args=([1, 2],))
+    timer.start()
+    assert buffer.pop_many(timeout=5.0) == [1, 2]
+    timer.join()
+
+    # 빈 버퍼에서 timeout이 지나면 빈 리스트, wakeup()은 대기를 바로 끝냄
+    assert buffer.pop_many(timeout=0.01) == []
+    threading.Timer(0.02, buffer.wakeup).start()
+    assert buffer.pop_many(timeout=5.0) == []
+
+
+def test_single_producer_single_consumer_keeps_order():
+    buffer = FrameRingBuffer(64)
+    total = 5000
+    received = []
+
+    def produce():
+        item = 0
+        while item < total:
+            pushed = buffer.push_many(range(item, min(item + 50, total)))
+            if not pushed:
+                time.sleep(0.0001)
+            item += pushed
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    while len(received) < total:
+        received.extend(buffer.pop_many(max_items=100, timeout=1.0))
+    producer.join()
+
+    assert received == list(range(total))
+    assert buffer.stats()['popped'] == total
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+from can_scheduler import CyclicScheduler, TimingStats
+from kvaser_can import KvaserCAN, CANERR_NOERROR
+
+
+@pytest.fixture
+def bus():
+    tx = KvaserCAN(backend='virtual')
+    rx = KvaserCAN(backend='virtual')
+    for can in (tx, rx):
+        assert can.open(channel=7) == 0
+        assert can.start(bitrate_index=0) == 0
+    yield tx, rx
+    for can in (tx, rx):
+        can.close()
+
+
+def _drain(rx):
+    frames = []
+    while True:
+        result, batch = rx.receive_many(max_frames=256, timeout=20)
+        if result != CANERR_NOERROR:
+            return frames
+        frames.extend(batch)
+
+
+def test_timing_stats():
+    stats = TimingStats()
+    for error in (0.001, 0.002, 0.003):
+        stats.add(error)
+    snapshot = stats.snapshot()
+    assert snapshot['count'] == 3
+    assert snapshot['mean'] == pytest.approx(0.002)
+    assert snapshot['stddev'] == pytest.approx(0.001)
+    assert (snapshot['min'], snapshot['max']) == (0.001, 0.003)
+    assert TimingStats().snapshot()['min'] == 0.0
+
+
+def test_cyclic_jobs_report(bus):
+    tx, rx = bus
+    scheduler = CyclicScheduler(tx)
+    started = time.perf_counter()
+    fast = scheduler.add(0x100, 0.005, [0x11, 0x22])
+    slow = scheduler.add(0x200, 0.020, lambda: b'\x33')
+    assert scheduler.start() == CANERR_NOERROR
+    # 벽시계 시간이 아니라 송신 횟수로 종료 (느린 환경에서도 같은 조건)
+    deadline = time.monotonic() + 10.0
+    while scheduler.stats()[slow]['sent'] < 3 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    scheduler.stop()
+    elapsed = time.perf_counter() - started
+
+    stats = scheduler.stats()
+    assert stats[slow]['sent'] >= 3
+    for job_id, period in ((fast, 0.005), (slow, 0.020)):
+        job = stats[job_id]
+        assert job['errors'] == 0
+        # 절대 마감 시각 기준이므로 경과 시간보다 많은 주기를 처리할 수 없음
+        assert job['sent'] + job['missed'] <= elapsed / period + 1
+        assert job['jitter']['count'] == job['sent'] + job['errors']
+        # 마감 시각 전에는 송신하지 않음
+        assert job['jitter']['min'] >= 0.0
+    assert stats[fast]['sent'] + stats[fast]['missed'] >= stats[slow]['sent'] + stats[slow]['missed']
+
+    frames = _drain(rx)
+    assert sum(msg.id == 0x100 for msg in frames) == stats[fast]['sent']
+    assert sum(msg.id == 0x200 for msg in frames) == stats[slow]['sent']
+
+
+def test_iterator_payload_and_remove(bus):
+    tx, rx = bus
+    scheduler = CyclicScheduler(tx)
+    finite = scheduler.add(0x300, 0.002, iter([b'\x01', b'\x02', b'\x03']))
+    removed = scheduler.add(0x400, 0.002, [0x44], start_delay=0.05)
+    assert scheduler.remove(removed)
+    assert not scheduler.remove(removed)
+
+    scheduler.start()
+    deadline = time.monotonic() + 10.0
+    while scheduler.jobs[finite].active and time.monotonic() < deadline:
+        time.sleep(0.005)
+    scheduler.stop()
+
+    frames = _drain(rx)
+    assert [bytes(msg.data[:msg.dlc]) for msg in frames if msg.id == 0x300] == [b'\x01', b'\x02', b'\x03']
+    assert not any(msg.id == 0x400 for msg in frames)
+    assert scheduler.stats()[finite]['sent'] == 3
+
+
+def test_invalid_usage():
+    can = KvaserCAN(backend='virtual')
+    scheduler = CyclicScheduler(can)
+    with pytest.raises(ValueError):
+        scheduler.add(0x100, 0, [0x00])
+    assert scheduler.start() == -95  # CANERR_NOTINIT
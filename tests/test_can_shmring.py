@@ -0,0 +1,175 @@
+import multiprocessing
+import queue
+import threading
+import time
+
+import pytest
+
+from can_shmring import SharedFrameRing, capture_to_ring
+from kvaser_can import KvaserCAN
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create(capacity=8)
+    yield ring
+    ring.close()
+
+
+def _write(ring, count, start=0):
+    for index in range(start, start + count):
+        ring.write_frame(1.0 + index * 0.001, 0x100 + index, bytes([index & 0xFF]) * 2)
+
+
+def _ids(records):
+    return [msg_id for _, msg_id, _, _, _ in records]
+
+
+def _attach_and_write(name, count):
+    ring = SharedFrameRing.attach(name)
+    try:
+        ring.write_records([(index, 0x300 + index, 0, 1, bytes([index])) for index in range(count)])
+        ring.mark_closed()
+    finally:
+        ring.close()
+
+
+def test_capacity_rounds_up_to_power_of_two():
+    with SharedFrameRing.create(capacity=5) as ring:
+        assert ring.capacity == 8
+        assert not ring.fd
+
+
+def test_write_and_read(ring):
+    reader = ring.reader()
+    _write(ring, 3)
+    assert len(reader) == 3
+
+    records = list(reader.read())
+    assert _ids(records) == [0x100, 0x101, 0x102]
+    timestamp, _, flags, dlc, data = records[1]
+    assert timestamp == pytest.approx(1.001)
+    assert (flags, dlc, data) == (0, 2, b'\x01\x01')
+    assert list(reader.read()) == []
+    assert reader.read_count == 3
+
+
+def test_new_reader_starts_at_head_unless_from_oldest(ring):
+    _write(ring, 3)
+    assert list(ring.reader().read()) == []
+    assert _ids(ring.reader(from_oldest=True).read()) == [0x100, 0x101, 0x102]
+
+
+def test_slow_reader_counts_lost_records(ring):
+    reader = ring.reader()
+    _write(ring, 13)
+    # 용량 8을 넘은 5개는 덮어써져 lost로 집계
+    assert len(reader) == 8
+    records = list(reader.read())
+    assert _ids(records) == [0x100 + index for index in range(5, 13)]
+    assert reader.lost == 5
+
+
+def test_read_wraps_around_ring_end(ring):
+    reader = ring.reader()
+    _write(ring, 6)
+    assert len(list(reader.read(max_frames=6))) == 6
+    _write(ring, 5, start=6)
+    assert _ids(reader.read()) == [0x100 + index for index in range(6, 11)]
+    assert reader.lost == 0
+
+
+def test_readers_have_independent_cursors(ring):
+    first = ring.reader()
+    second = ring.reader()
+    _write(ring, 4)
+    assert len(list(first.read(max_frames=3))) == 3
+    assert len(list(second.read())) == 4
+    assert _ids(first.read()) == [0x103]
+
+
+def test_fd_records_keep_64_bytes():
+    with SharedFrameRing.create(capacity=4, fd=True) as ring:
+        reader = ring.reader()
+        ring.write_frame(0.5, 0x18DAF110, bytes(range(64)), flags=0x01 | 0x04, dlc=15)
+        _, msg_id, flags, dlc, data = next(reader.read())
+        assert (msg_id, flags, dlc) == (0x18DAF110, 0x05, 15)
+        assert data == bytes(range(64))
+
+
+def test_read_array(ring):
+    numpy = pytest.importorskip('numpy')
+    reader = ring.reader()
+    _write(ring, 3)
+    array = reader.read_array()
+    assert isinstance(array, numpy.ndarray)
+    assert array['id'].tolist() == [0x100, 0x101, 0x102]
+    assert array['timestamp'][0] == 1000000000
+    assert array['data'][2][:2].tolist() == [2, 2]
+
+
+def test_finished_after_writer_closes(ring):
+    reader = ring.reader()
+    _write(ring, 1)
+    ring.mark_closed()
+    assert not reader.finished()
+    list(reader.read())
+    assert reader.finished()
+
+
+def test_attach_from_other_process(ring):
+    reader = ring.reader()
+    process = multiprocessing.get_context().Process(target=_attach_and_write, args=(ring.name, 5))
+    process.start()
+    process.join(timeout=10.0)
+    assert process.exitcode == 0
+
+    assert _ids(reader.read(timeout=100)) == [0x300 + index for index in range(5)]
+    assert reader.finished()
+    # 연결한 프로세스가 끝나도 공유 메모리는 남아 있어야 함
+    with SharedFrameRing.attach(ring.name) as attached:
+        assert attached.capacity == 8
+
+
+def test_attach_rejects_foreign_memory():
+    shared_memory = pytest.importorskip('multiprocessing.shared_memory')
+    shm = shared_memory.SharedMemory(create=True, size=512)
+    try:
+        with pytest.raises(ValueError):
+            SharedFrameRing.attach(shm.name)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_capture_to_ring_from_virtual_channel():
+    with SharedFrameRing.create(capacity=64) as ring:
+        reader = ring.reader()
+        stop = threading.Event()
+        status = queue.Queue()
+        results = []
+        thread = threading.Thread(target=lambda: results.append(
+            capture_to_ring(6, ring.name, backend='virtual', bitrate_index=0, stop=stop,
+                            status=status)))
+        thread.start()
+        assert status.get(timeout=2.0) == 0
+
+        sender = KvaserCAN(backend='virtual')
+        try:
+            assert sender.open(channel=6) == 0
+            assert sender.start(bitrate_index=0) == 0
+            for index in range(5):
+                assert sender.send(0x200 + index, bytes([index])) == 0
+
+            records = []
+            deadline = time.monotonic() + 2.0
+            while len(records) < 5 and time.monotonic() < deadline:
+                records.extend(reader.read(timeout=50))
+        finally:
+            stop.set()
+            thread.join()
+            sender.close()
+
+        assert _ids(records) == [0x200 + index for index in range(5)]
+        assert results == [0]
+        assert ring.closed
@@ -0,0 +1,223 @@
+import os
+import socket
+import struct
+import time
+
+import pytest
+
+import can_socketcan
+from can_socketcan import SocketCANAPI, CAN_EFF_FLAG, CAN_RTR_FLAG, CAN_MTU, CANFD_MTU, CANFD_BRS
+from can_virtual import Bitrate, Message, CANERR_NOERROR, CANERR_RX_EMPTY
+from kvaser_can import KvaserCAN
+
+CAN_FRAME = struct.Struct('=IB3x8s')
+CANFD_FRAME = struct.Struct('=IBB2x64s')
+
+
+class _RecordingSocket:
+    """setsockopt() 호출을 기록하는 소켓 (AF_CAN 없이 CAN_RAW_FILTER 확인용)"""
+
+    def __init__(self):
+        self.options = []
+
+    def setblocking(self, flag):
+        pass
+
+    def setsockopt(self, level, option, value):
+        self.options.append((level, option, value))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pair():
+    """SocketCANAPI에 붙인 소켓과 상대편 소켓"""
+    local, peer = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    local.setsockopt(socket.SOL_SOCKET, can_socketcan.SO_TIMESTAMP, 1)
+    api = SocketCANAPI()
+    assert api.attach_socket(local, 'pair') == CANERR_NOERROR
+    assert api.start(Bitrate()) == CANERR_NOERROR
+    yield api, peer
+    api.exit()
+    peer.close()
+
+
+def _message(can_id, data, xtd=False, rtr=False, fdf=False, brs=False, dlc=None):
+    msg = Message()
+    msg.id = can_id
+    msg.flags.xtd = int(xtd)
+    msg.flags.rtr = int(rtr)
+    msg.flags.fdf = int(fdf)
+    msg.flags.brs = int(brs)
+    msg.dlc = len(data) if dlc is None else dlc
+    msg.data[:len(data)] = data
+    return msg
+
+
+def _send_frames(peer, ids):
+    for can_id in ids:
+        peer.send(CAN_FRAME.pack(can_id, 1, bytes([can_id & 0xFF])))
+
+
+def test_write_classic_frames(pair):
+    api, peer = pair
+    assert api.write(_message(0x123, b'\x01\x02')) == CANERR_NOERROR
+    assert api.write(_message(0x18FF0001, b'\x03', xtd=True)) == CANERR_NOERROR
+    assert api.write(_message(0x100, b'', rtr=True)) == CANERR_NOERROR
+
+    frames = [peer.recv(CANFD_MTU) for _ in range(3)]
+    assert all(len(frame) == CAN_MTU for frame in frames)
+    assert CAN_FRAME.unpack(frames[0])[:2] == (0x123, 2)
+    assert CAN_FRAME.unpack(frames[0])[2][:2] == b'\x01\x02'
+    assert CAN_FRAME.unpack(frames[1])[0] == 0x18FF0001 | CAN_EFF_FLAG
+    assert CAN_FRAME.unpack(frames[2])[0] == 0x100 | CAN_RTR_FLAG
+
+
+def test_write_masks_standard_id(pair):
+    api, peer = pair
+    assert api.write(_message(0x9AB, b'\x01')) == CANERR_NOERROR
+    can_id = CAN_FRAME.unpack(peer.recv(CANFD_MTU))[0]
+    assert can_id == 0x1AB
+    assert not can_id & CAN_EFF_FLAG
+
+
+def test_write_fd_frame(pair):
+    api, peer = pair
+    payload = bytes(range(12))
+    assert api.write(_message(0x200, payload, fdf=True, brs=True, dlc=9)) == CANERR_NOERROR
+    frame = peer.recv(CANFD_MTU)
+    assert len(frame) == CANFD_MTU
+    can_id, length, flags, data = CANFD_FRAME.unpack(frame)
+    assert (can_id, length, flags, data[:length]) == (0x200, 12, CANFD_BRS, payload)
+
+
+def test_read_decodes_fd_frame(pair):
+    api, peer = pair
+    peer.send(CANFD_FRAME.pack(0x300 | CAN_EFF_FLAG, 20, CANFD_BRS, bytes(range(20))))
+    result, msg = api.read(timeout=100)
+    assert result == CANERR_NOERROR
+    assert (msg.id, msg.flags.xtd, msg.flags.fdf, msg.flags.brs, msg.dlc) == (0x300, 1, 1, 1, 11)
+    assert bytes(msg.data[:20]) == bytes(range(20))
+
+
+@pytest.mark.parametrize('use_recvmmsg', [True, False])
+def test_read_batches_pending_frames(pair, use_recvmmsg):
+    api, peer = pair
+    if use_recvmmsg and api._batch is None:
+        pytest.skip('recvmmsg() not available')
+    if not use_recvmmsg:
+        api._batch = None
+
+    _send_frames(peer, range(0x100, 0x10A))
+    result, msg = api.read(timeout=100)
+    assert (result, msg.id) == (CANERR_NOERROR, 0x100)
+    # 나머지 프레임은 같은 시스템 호출로 읽어 내부 큐에 보관
+    assert [queued.id for queued in api._rx] == list(range(0x101, 0x10A))
+
+    peer.close()
+    ids = [api.read(timeout=0)[1].id for _ in range(9)]
+    assert ids == list(range(0x101, 0x10A))
+    assert api.read(timeout=0) == (CANERR_RX_EMPTY, None)
+
+
+def test_recvmmsg_batch_size():
+    local, peer = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    api = SocketCANAPI(batch=4)
+    if api._batch is None:
+        pytest.skip('recvmmsg() not available')
+    api.attach_socket(local)
+    api.start(Bitrate())
+    try:
+        _send_frames(peer, range(0x100, 0x10A))
+        assert api._receive_batch() == 4
+        assert api._receive_batch() == 4
+        assert api._receive_batch() == 2
+        assert api._receive_batch() == 0
+    finally:
+        api.exit()
+        peer.close()
+
+
+@pytest.mark.parametrize('use_recvmmsg', [True, False])
+def test_so_timestamp_decoding(pair, monkeypatch, use_recvmmsg):
+    api, peer = pair
+    if use_recvmmsg and api._batch is None:
+        pytest.skip('recvmmsg() not available')
+    if not use_recvmmsg:
+        api._batch = None
+
+    before = time.time()
+    _send_frames(peer, [0x100])
+    # 수신 시각을 제어 메시지에서 읽지 못하면 time.time() 값(0)이 들어감
+    monkeypatch.setattr(can_socketcan.time, 'time', lambda: 0.0)
+    assert api._receive_batch() == 1
+    monkeypatch.undo()
+
+    msg = api._rx.popleft()
+    stamp = msg.timestamp.sec + msg.timestamp.nsec / 1e9
+    assert before - 1.0 <= stamp <= time.time() + 1.0
+
+
+def test_parse_timestamp_control_message():
+    header = can_socketcan._CMSG_HDR
+    data = can_socketcan._TIMEVAL.pack(1700000000, 250000)
+    length = can_socketcan._CMSG_DATA_OFFSET + len(data)
+    padding = bytes(can_socketcan._CMSG_DATA_OFFSET - header.size)
+
+    control = header.pack(length, socket.SOL_SOCKET, can_socketcan.SO_TIMESTAMP) + padding + data
+    assert can_socketcan._parse_timestamp(control) == pytest.approx(1700000000.25)
+
+    # 다른 제어 메시지 뒤에 있는 타임스탬프도 찾음
+    other = header.pack(length, socket.SOL_SOCKET, 1) + padding + bytes(len(data))
+    assert can_socketcan._parse_timestamp(other + control) == pytest.approx(1700000000.25)
+    assert can_socketcan._parse_timestamp(other) is None
+    assert can_socketcan._parse_timestamp(b'') is None
+
+
+def test_set_filter_packs_can_raw_filter():
+    sock = _RecordingSocket()
+    api = SocketCANAPI()
+    api.attach_socket(sock)
+
+    assert api.set_filter([(0x923, 0x7FF, False), (0x18FF0000, 0x1FFF0000, True)]) == CANERR_NOERROR
+    level, option, packed = sock.options[-1]
+    assert (level, option) == (can_socketcan.SOL_CAN_RAW, can_socketcan.CAN_RAW_FILTER)
+    assert list(struct.iter_unpack('=II', packed)) == [
+        (0x123, 0x7FF | CAN_EFF_FLAG),
+        (0x18FF0000 | CAN_EFF_FLAG, 0x1FFF0000 | CAN_EFF_FLAG),
+    ]
+
+    # None이면 모든 프레임 수신
+    assert api.set_filter(None) == CANERR_NOERROR
+    assert sock.options[-1][2] == struct.pack('=II', 0, 0)
+
+
+def _vcan_available():
+    if not hasattr(socket, 'AF_CAN') or not os.path.exists('/sys/class/net/vcan0'):
+        return False
+    try:
+        socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW).close()
+    except OSError:
+        return False
+    return True
+
+
+@pytest.mark.skipif(not _vcan_available(), reason='vcan0 not available')
+def test_vcan_send_receive_with_kernel_filter():
+    tx = KvaserCAN(lib_name='vcan', backend='socketcan')
+    rx = KvaserCAN(lib_name='vcan', backend='socketcan')
+    for can in (tx, rx):
+        assert can.open(channel=0) == CANERR_NOERROR
+        assert can.start() == CANERR_NOERROR
+    try:
+        rx.set_filter(ids=[0x100, 0x18FF0001])
+        for can_id, extended in ((0x100, False), (0x101, False), (0x18FF0001, True)):
+            assert tx.send(can_id, [0x01], extended_id=extended) == CANERR_NOERROR
+        result, frames = rx.receive_many(max_frames=16, timeout=200)
+        assert result == CANERR_NOERROR
+        assert [(msg.id, msg.flags.xtd) for msg in frames] == [(0x100, 0), (0x18FF0001, 1)]
+        assert all(msg.timestamp.sec > 0 for msg in frames)
+    finally:
+        for can in (tx, rx):
+            can.close()
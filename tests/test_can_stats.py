@@ -0,0 +1,150 @@
+import random
+
+import pytest
+
+from can_stats import BusStatistics, JITTER_BUCKETS, can_frame_bits, crc15, stuff_bit_count
+from can_virtual import Message, frame_bits
+
+
+def _bits(value, nbits):
+    return [(value >> shift) & 1 for shift in range(nbits - 1, -1, -1)]
+
+
+def _crc15_bitwise(value, nbits):
+    """ISO 11898-1 CRC-15 비트 단위 정의"""
+    crc = 0
+    for bit in _bits(value, nbits):
+        crc_next = bit ^ (crc >> 14)
+        crc = (crc << 1) & 0x7FFF
+        if crc_next:
+            crc ^= 0x4599
+    return crc
+
+
+def _stuff_bitwise(value, nbits):
+    """같은 비트 5개마다 반대 비트를 실제로 삽입하며 센 스터프 비트 수"""
+    stuffed = 0
+    last, run = None, 0
+    for bit in _bits(value, nbits):
+        if run == 5:
+            last, run = 1 - last, 1
+            stuffed += 1
+        if bit == last:
+            run += 1
+        else:
+            last, run = bit, 1
+    return stuffed + (1 if run == 5 else 0)
+
+
+@pytest.mark.parametrize('nbits', [1, 7, 8, 19, 34, 39, 83, 103])
+def test_crc15_matches_bitwise_definition(nbits):
+    rng = random.Random(nbits)
+    for _ in range(50):
+        value = rng.getrandbits(nbits)
+        assert crc15(value, nbits) == _crc15_bitwise(value, nbits)
+
+
+@pytest.mark.parametrize('nbits', [5, 6, 12, 34, 49, 118, 126])
+def test_stuff_bit_count_matches_bitwise_insertion(nbits):
+    rng = random.Random(nbits)
+    # 긴 연속 비트가 자주 나오도록 편향된 값도 함께 확인
+    values = [0, (1 << nbits) - 1] + [rng.getrandbits(nbits) for _ in range(50)]
+    values += [rng.getrandbits(nbits) & rng.getrandbits(nbits) & rng.getrandbits(nbits) for _ in range(50)]
+    for value in values:
+        assert stuff_bit_count(value, nbits) == _stuff_bitwise(value, nbits)
+
+
+def test_stuffing_counts_inserted_bit_in_next_run():
+    # 00000 (1) 0000 → 스터프 비트 뒤 다시 0이 5개여야 삽입
+    assert stuff_bit_count(0, 9) == 1
+    assert stuff_bit_count(0, 10) == 2
+    assert stuff_bit_count(0b11111000001, 11) == 2
+
+
+def test_can_frame_bits_all_dominant_frame():
+    # ID 0, DLC 0: SOF부터 CRC까지 0 34개 → 스터프 비트 6개
+    assert can_frame_bits(0, False, False, 0, b'') == 47 + 6
+
+
+def test_can_frame_bits_bounds():
+    rng = random.Random(7)
+    for _ in range(200):
+        extended = rng.random() < 0.5
+        can_id = rng.getrandbits(29 if extended else 11)
+        dlc = rng.randint(0, 8)
+        bits = can_frame_bits(can_id, extended, False, dlc, bytes(rng.getrandbits(8) for _ in range(dlc)))
+        unstuffed = frame_bits(dlc, extended)
+        stuffable = unstuffed - 13
+        assert unstuffed <= bits <= unstuffed + (stuffable - 1) // 4
+
+
+def test_remote_frame_ignores_data():
+    assert can_frame_bits(0x123, False, True, 8, bytes(8)) == can_frame_bits(0x123, False, True, 8, b'')
+
+
+def test_period_mean_stddev_and_jitter():
+    stats = BusStatistics(bitrate=500000)
+    for timestamp in (0.0, 0.010, 0.020, 0.0305, 0.040):
+        stats.update_frame(timestamp, 0x100, 0, 1, b'\x00')
+
+    entry = stats.id_stats(0x100)
+    assert entry['count'] == 5
+    assert entry['period_mean'] == pytest.approx(0.010)
+    assert entry['period_min'] == pytest.approx(0.0095)
+    assert entry['period_max'] == pytest.approx(0.0105)
+    assert entry['period_stddev'] == pytest.approx(0.000408, abs=1e-6)
+    assert entry['rate'] == pytest.approx(125.0)
+    histogram = entry['jitter_histogram']
+    assert len(histogram) == JITTER_BUCKETS
+    assert sum(histogram) == 3
+    assert stats.id_stats(0x101) is None
+
+
+def test_utilisation_and_window_reset():
+    stats = BusStatistics(bitrate=1000, exact_stuffing=False)
+    stats.update_frame(0.0, 0x100, 0, 8, bytes(8))
+    stats.update_frame(1.0, 0x100, 0, 8, bytes(8))
+
+    snapshot = stats.snapshot()
+    assert snapshot['bits'] == 2 * frame_bits(8)
+    assert snapshot['utilisation'] == pytest.approx(2 * frame_bits(8) / 10.0)
+    assert snapshot['window_utilisation'] == snapshot['utilisation']
+
+    stats.update_frame(3.0, 0x100, 0, 0, b'')
+    snapshot = stats.snapshot()
+    assert snapshot['window_utilisation'] == pytest.approx(frame_bits(0) / 20.0)
+
+
+def test_extended_ids_overflow_into_other():
+    stats = BusStatistics(max_extended_ids=2)
+    for can_id in (0x18FF0001, 0x18FF0002, 0x18FF0003, 0x18FF0004):
+        stats.update_frame(0.0, can_id, 0x01, 0, b'')
+    stats.update_frame(0.0, 0x7FF, 0, 0, b'')
+
+    ids = stats.snapshot()['ids']
+    assert set(ids) == {0x7FF, 0x18FF0001 | 0x80000000, 0x18FF0002 | 0x80000000, 'other'}
+    assert ids['other']['count'] == 2
+    assert stats.id_stats(0x18FF0001)['count'] == 1
+    assert stats.id_stats(0x001, extended=True) is None
+
+
+def test_fd_frame_bits_use_data_length():
+    stats = BusStatistics()
+    stats.update_frame(0.0, 0x100, 0x04, 15, bytes(64))
+    assert stats.total_bits == frame_bits(0) + 8 * 64
+
+
+def test_update_many_with_messages():
+    messages = []
+    for index in range(3):
+        msg = Message()
+        msg.id = 0x200
+        msg.dlc = 2
+        msg.timestamp.sec = index
+        messages.append(msg)
+
+    stats = BusStatistics()
+    assert stats.update_many(messages) == 3
+    assert stats.on_message(messages[0])
+    assert stats.id_stats(0x200)['count'] == 4
+    assert stats.bits[0x200] == 4 * can_frame_bits(0x200, False, False, 2, bytes(2))
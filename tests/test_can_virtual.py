@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+
+from can_virtual import (VirtualCANAPI, Bitrate, Message, frame_bits, len_to_dlc,
+                         CANBRD_PRESENT, CANBRD_NOT_PRESENT, CANBTR_INDEX_1M, CANREAD_INFINITE,
+                         CANERR_NOERROR, CANERR_OFFLINE, CANERR_RX_EMPTY, CANERR_NOTINIT,
+                         VIRTUAL_CHANNELS)
+
+CHANNEL = 2
+
+
+def _node(queue_size=65536, start=True):
+    node = VirtualCANAPI(queue_size=queue_size)
+    assert node.init(CHANNEL) == CANERR_NOERROR
+    if start:
+        bitrate = Bitrate()
+        bitrate.index = CANBTR_INDEX_1M
+        assert node.start(bitrate) == CANERR_NOERROR
+    return node
+
+
+@pytest.fixture
+def nodes():
+    created = []
+
+    def make(**kwargs):
+        created.append(_node(**kwargs))
+        return created[-1]
+
+    yield make
+    for node in created:
+        node.exit()
+
+
+def _message(can_id, data=b'\x01', fdf=False):
+    msg = Message()
+    msg.id = can_id
+    msg.flags.fdf = int(fdf)
+    msg.dlc = len_to_dlc(len(data)) if fdf else len(data)
+    msg.data[:len(data)] = data
+    return msg
+
+
+def test_helpers():
+    assert [len_to_dlc(length) for length in (0, 8, 9, 12, 13, 64)] == [0, 8, 9, 9, 10, 15]
+    assert frame_bits(8) == 47 + 64
+    assert frame_bits(8, extended_id=True) == 67 + 64
+    assert frame_bits(64) == frame_bits(8)
+
+
+def test_channel_range():
+    node = VirtualCANAPI()
+    assert node.test(0) == (CANERR_NOERROR, CANBRD_PRESENT)
+    assert node.test(VIRTUAL_CHANNELS) == (CANERR_NOERROR, CANBRD_NOT_PRESENT)
+    assert node.init(VIRTUAL_CHANNELS) == CANERR_NOTINIT
+    assert node.read(timeout=0) == (CANERR_NOTINIT, None)
+    assert node.exit() == CANERR_NOTINIT
+
+
+def test_delivers_to_other_started_nodes(nodes):
+    sender, first, second = nodes(), nodes(), nodes()
+    stopped = nodes(start=False)
+    payload = bytes(range(20))
+
+    before = time.time()
+    assert sender.write(_message(0x123, payload, fdf=True)) == CANERR_NOERROR
+    for node in (first, second):
+        result, msg = node.read(timeout=0)
+        assert result == CANERR_NOERROR
+        assert (msg.id, msg.flags.fdf, msg.dlc) == (0x123, 1, len_to_dlc(20))
+        assert bytes(msg.data[:20]) == payload
+        assert msg.timestamp.sec >= int(before)
+
+    assert sender.read(timeout=0) == (CANERR_RX_EMPTY, None)
+    assert stopped.read(timeout=0) == (CANERR_OFFLINE, None)
+    assert stopped.write(_message(0x100)) == CANERR_OFFLINE
+
+
+def test_queue_overflow_sets_message_lost(nodes):
+    sender, receiver = nodes(), nodes(queue_size=2)
+    for can_id in (0x100, 0x101, 0x102):
+        sender.write(_message(can_id))
+
+    result, status = receiver.status()
+    assert status.bits.message_lost == 1
+    assert receiver.status()[1].bits.message_lost == 0  # 읽으면 초기화
+    assert [receiver.read(timeout=0)[1].id for _ in range(2)] == [0x100, 0x101]
+    assert receiver.read(timeout=0)[0] == CANERR_RX_EMPTY
+
+
+def test_receive_filter(nodes):
+    sender, receiver = nodes(), nodes()
+    assert receiver.set_filter([(0x100, 0x7F0, False)]) == CANERR_NOERROR
+    for can_id in (0x100, 0x10F, 0x110):
+        sender.write(_message(can_id))
+    ids = []
+    while True:
+        result, msg = receiver.read(timeout=0)
+        if result != CANERR_NOERROR:
+            break
+        ids.append(msg.id)
+    assert ids == [0x100, 0x10F]
+
+
+def test_blocking_read_wakes_on_write_and_reset(nodes):
+    sender, receiver = nodes(), nodes()
+    threading.Timer(0.02, sender.write, args=(_message(0x100),)).start()
+    result, msg = receiver.read(timeout=CANREAD_INFINITE)
+    assert (result, msg.id) == (CANERR_NOERROR, 0x100)
+
+    # reset()은 무한 대기 중인 read()를 깨움
+    threading.Timer(0.02, receiver.reset).start()
+    assert receiver.read(timeout=CANREAD_INFINITE) == (CANERR_RX_EMPTY, None)
+    assert receiver.read(timeout=0) == (CANERR_OFFLINE, None)
+
+
+def test_busload_and_bitrate(nodes):
+    sender, receiver = nodes(), nodes()
+    receiver.busload()
+    for _ in range(100):
+        sender.write(_message(0x100, bytes(8)))
+    result, load, status = receiver.busload()
+    assert result == CANERR_NOERROR
+    assert load > 0.0
+    assert status.bits.can_stopped == 0
+
+    result, bitrate, speed = receiver.bitrate()
+    assert (bitrate.index, speed.nominal.speed) == (CANBTR_INDEX_1M, 1000000.0)
@@ -0,0 +1,166 @@
+import pytest
+
+from can_virtual import CANERR_TX_BUSY, FLAG_RTR, FLAG_XTD
+from kvaser_can import KvaserCAN, CANERR_NOERROR, CANERR_RX_EMPTY
+
+
+@pytest.fixture
+def bus():
+    tx = KvaserCAN(backend='virtual')
+    rx = KvaserCAN(backend='virtual')
+    for can in (tx, rx):
+        assert can.open(channel=1) == 0
+        assert can.start(bitrate_index=0) == 0
+    yield tx, rx
+    for can in (tx, rx):
+        can.close()
+
+
+class _BusyAfter:
+    """limit개를 받은 뒤 송신 큐가 가득 찬 API"""
+
+    def __init__(self, api, limit):
+        self.api = api
+        self.limit = limit
+        self.messages = []
+
+    def __getattr__(self, name):
+        return getattr(self.api, name)
+
+    def write(self, message, timeout=0):
+        if len(self.messages) >= self.limit:
+            return CANERR_TX_BUSY
+        self.messages.append(message)
+        return self.api.write(message=message, timeout=timeout)
+
+
+def _drain(rx):
+    frames = []
+    while True:
+        result, batch = rx.receive_many(max_frames=256, timeout=20)
+        if result != CANERR_NOERROR:
+            return frames
+        frames.extend(batch)
+
+
+def test_receive_many_drains_queue_in_order(bus):
+    tx, rx = bus
+    for index in range(10):
+        assert tx.send(0x100 + index, [index, 0xAA]) == CANERR_NOERROR
+
+    result, frames = rx.receive_many(max_frames=4, timeout=100)
+    assert result == CANERR_NOERROR
+    assert [msg.id for msg in frames] == [0x100, 0x101, 0x102, 0x103]
+    assert bytes(frames[1].data[:frames[1].dlc]) == b'\x01\xaa'
+
+    # 나머지는 다음 호출에서 대기 없이
+    result, frames = rx.receive_many(max_frames=256, timeout=100)
+    assert result == CANERR_NOERROR
+    assert [msg.id for msg in frames] == list(range(0x104, 0x10A))
+    assert rx.receive_many(timeout=10) == (CANERR_RX_EMPTY, [])
+
+
+def test_receive_many_applies_filter_while_draining(bus):
+    tx, rx = bus
+    rx.set_filter(ids=[0x101, 0x103])
+    for can_id in (0x100, 0x101, 0x102, 0x103, 0x104):
+        tx.send(can_id, [0x00])
+    result, frames = rx.receive_many(max_frames=16, timeout=100)
+    assert (result, [msg.id for msg in frames]) == (CANERR_NOERROR, [0x101, 0x103])
+
+
+def test_receive_many_edge_cases(bus):
+    tx, rx = bus
+    tx.send(0x100, [0x00])
+    assert rx.receive_many(max_frames=0) == (CANERR_NOERROR, [])
+    # max_frames=0이면 큐를 건드리지 않음
+    result, frames = rx.receive_many(max_frames=1, timeout=100)
+    assert [msg.id for msg in frames] == [0x100]
+
+    assert KvaserCAN(backend='virtual').receive_many() == (-95, [])  # CANERR_NOTINIT
+
+
+def test_background_capture(bus):
+    tx, rx = bus
+    assert rx.start_capture(buffer_size=64, batch_size=16) == CANERR_NOERROR
+    assert rx.start_capture() == CANERR_NOERROR  # 이미 수신 중
+    assert rx.is_capturing()
+
+    for index in range(40):
+        tx.send(0x200 + index, [index])
+    frames = []
+    while len(frames) < 40:
+        batch = rx.read_capture(max_frames=32, timeout=1000)
+        assert batch
+        frames.extend(batch)
+
+    assert rx.stop_capture() == CANERR_NOERROR
+    assert not rx.is_capturing()
+    assert [msg.id for msg in frames] == [0x200 + index for index in range(40)]
+    assert rx.capture_buffer.stats()['dropped'] == 0
+    assert rx.read_capture(timeout=0) == []
+
+
+def test_monitor_background_calls_callback(bus):
+    tx, rx = bus
+    for index in range(5):
+        tx.send(0x300 + index, [index])
+    seen = []
+
+    def callback(msg):
+        seen.append(msg.id)
+        return len(seen) < 3
+
+    assert rx.monitor(duration=5, callback=callback, background=True) == 3
+    assert seen == [0x300, 0x301, 0x302]
+    assert not rx.is_capturing()
+
+
+def test_send_many_frames_and_flags(bus):
+    tx, rx = bus
+    frames = [
+        (0x100, b'\x01\x02'),
+        (0x101, [0x03]),
+        (0x18FF0001, b'\x04', FLAG_XTD),
+        (0x102, b'', FLAG_RTR),
+        (0x103, bytes(range(12))),  # CAN 2.0은 8바이트까지
+    ]
+    assert tx.send_many(frames) == (CANERR_NOERROR, 5)
+    assert tx.tx_frames == 5
+
+    received = [(msg.id, msg.flags.xtd, msg.flags.rtr, bytes(msg.data[:msg.dlc])) for msg in _drain(rx)]
+    assert received == [
+        (0x100, 0, 0, b'\x01\x02'),
+        (0x101, 0, 0, b'\x03'),
+        (0x18FF0001, 1, 0, b'\x04'),
+        (0x102, 0, 1, b''),
+        (0x103, 0, 0, bytes(range(8))),
+    ]
+
+
+def test_send_many_stops_at_error(bus):
+    tx, rx = bus
+    tx.api = _BusyAfter(tx.api, limit=2)
+    assert tx.send_many([(0x100 + index, b'\x00') for index in range(5)]) == (CANERR_TX_BUSY, 2)
+    assert tx.tx_frames == 2
+    # 미리 할당한 구조체 하나를 재사용
+    assert tx.api.messages[0] is tx.api.messages[1]
+    assert [msg.id for msg in _drain(rx)] == [0x100, 0x101]
+
+    assert KvaserCAN(backend='virtual').send_many([(0x100, b'')]) == (-95, 0)  # CANERR_NOTINIT
+
+
+def test_send_many_frame_array(bus):
+    np = pytest.importorskip('numpy')
+    from can_frames import new_frame_array
+
+    tx, rx = bus
+    frames = new_frame_array(3)
+    frames['id'] = [0x200, 0x201, 0x1ABCDE]
+    frames['flags'] = [0, 0, FLAG_XTD]
+    frames['dlc'] = [1, 2, 3]
+    frames['data'][:, :3] = np.arange(9, dtype=np.uint8).reshape(3, 3)
+
+    assert tx.send_many(frames) == (CANERR_NOERROR, 3)
+    received = [(msg.id, msg.flags.xtd, bytes(msg.data[:msg.dlc])) for msg in _drain(rx)]
+    assert received == [(0x200, 0, b'\x00'), (0x201, 0, b'\x03\x04'), (0x1ABCDE, 1, b'\x06\x07\x08')]
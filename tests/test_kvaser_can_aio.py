@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+import pytest
+
+from kvaser_can import KvaserCAN, CANERR_NOERROR
+from kvaser_can_aio import AsyncKvaserCAN
+
+
+@pytest.fixture
+def peer():
+    can = KvaserCAN(backend='virtual')
+    assert can.open(channel=1) == 0
+    assert can.start(bitrate_index=0) == 0
+    yield can
+    can.close()
+
+
+def _reader_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith('AsyncKvaserCAN-reader')]
+
+
+def test_send_and_receive(peer):
+    async def scenario():
+        async with AsyncKvaserCAN(backend='virtual') as bus:
+            assert await bus.open(channel=1) == CANERR_NOERROR
+            assert await bus.start(bitrate_index=0) == CANERR_NOERROR
+            for can_id in (0x100, 0x101, 0x102):
+                assert peer.send(can_id, [0x01]) == CANERR_NOERROR
+            first = await bus.recv(timeout=1.0)
+            rest = []
+            while len(rest) < 2:
+                rest.extend(await bus.recv_many(timeout=1.0))
+
+            assert await bus.send(0x200, [0x02]) == CANERR_NOERROR
+            return [first.id] + [msg.id for msg in rest]
+
+    assert asyncio.run(scenario()) == [0x100, 0x101, 0x102]
+    result, msg = peer.receive(timeout=100)
+    assert (result, msg.id) == (CANERR_NOERROR, 0x200)
+
+
+def test_start_twice_keeps_single_reader(peer):
+    async def scenario():
+        bus = AsyncKvaserCAN(backend='virtual')
+        await bus.open(channel=1)
+        assert await bus.start(bitrate_index=0) == CANERR_NOERROR
+        thread = bus._thread
+        assert await bus.start(bitrate_index=0) == CANERR_NOERROR
+        assert bus._thread is thread
+        assert len(_reader_threads()) == 1
+        await bus.close()
+        assert await bus.recv(timeout=1.0) is None
+
+    asyncio.run(scenario())
+    assert _reader_threads() == []
+
+
+def test_close_sentinel_counts_evicted_batch():
+    async def scenario():
+        bus = AsyncKvaserCAN(backend='virtual', queue_size=2)
+        bus._queue = asyncio.Queue(maxsize=2)
+        bus._deliver(['a', 'b'])
+        bus._deliver(['c'])
+        bus._deliver(['d'])
+        assert bus.dropped == 1
+
+        # 종료 표시가 가장 오래된 묶음을 밀어내면 그 메시지도 버려진 것으로 집계
+        bus._deliver(None)
+        assert bus.dropped == 3
+        assert await bus.recv_many(timeout=0.1) == ['c']
+        assert await bus.recv(timeout=0.1) is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,110 @@
+import pytest
+
+from kvaser_can import KvaserCAN, CANERR_NOERROR, CANERR_RX_EMPTY
+
+
+@pytest.fixture
+def bus():
+    tx = KvaserCAN(backend='virtual')
+    rx = KvaserCAN(backend='virtual')
+    for can in (tx, rx):
+        assert can.open(channel=5) == 0
+        assert can.start(bitrate_index=0) == 0
+    yield tx, rx
+    for can in (tx, rx):
+        can.close()
+
+
+def _received_ids(tx, rx, ids):
+    """ids를 차례로 보내고 receive()로 받은 ID 목록"""
+    for can_id in ids:
+        assert tx.send(can_id, [0x01]) == CANERR_NOERROR
+    received = []
+    while True:
+        result, msg = rx.receive(timeout=20)
+        if result == CANERR_RX_EMPTY:
+            return received
+        assert result == CANERR_NOERROR
+        received.append(msg.id)
+
+
+def test_set_filter(bus):
+    tx, rx = bus
+    rx.set_filter(ids=[0x100], ranges=[(0x200, 0x20F)])
+    assert _received_ids(tx, rx, [0x100, 0x101, 0x205, 0x210]) == [0x100, 0x205]
+
+    rx.clear_filter()
+    assert _received_ids(tx, rx, [0x100, 0x101]) == [0x100, 0x101]
+
+
+def test_subscribe_keeps_user_filter(bus):
+    tx, rx = bus
+    rx.set_filter(ids=[0x100, 0x200])
+    user_filter = rx.rx_filter
+
+    handled = []
+    rx.subscribe(0x100, handled.append)
+    assert rx.rx_filter is user_filter
+    # 구독하지 않은 ID도 receive()로는 계속 수신
+    assert _received_ids(tx, rx, [0x100, 0x200, 0x300]) == [0x100, 0x200]
+
+    # 마지막 구독을 해제해도 사용자 필터는 그대로
+    rx.unsubscribe(0x100)
+    assert rx.rx_filter is user_filter
+    assert _received_ids(tx, rx, [0x200, 0x300]) == [0x200]
+
+
+def test_subscribe_without_filter_receives_everything(bus):
+    tx, rx = bus
+    rx.subscribe(0x100, lambda msg: None)
+    assert rx.rx_filter is None
+    assert _received_ids(tx, rx, [0x100, 0x300]) == [0x100, 0x300]
+
+
+def test_narrow_filter_intersects_and_restores(bus):
+    tx, rx = bus
+    rx.set_filter(ids=[0x100, 0x200])
+    user_filter = rx.rx_filter
+
+    rx.subscribe(0x100, lambda msg: None, narrow_filter=True)
+    rx.subscribe(0x300, lambda msg: None)
+    # 구독 ID 중 사용자 필터를 통과하는 ID만 수신
+    assert _received_ids(tx, rx, [0x100, 0x200, 0x300]) == [0x100]
+
+    rx.unsubscribe(0x100)
+    rx.unsubscribe(0x300)
+    assert rx.rx_filter is user_filter
+    assert _received_ids(tx, rx, [0x100, 0x200, 0x300]) == [0x100, 0x200]
+
+
+def test_dispatch_delivers_by_id(bus):
+    tx, rx = bus
+    single, batched = [], []
+    rx.subscribe(0x100, single.append)
+    rx.subscribe(0x18FF0001, batched.append, batch=True)
+
+    for can_id, extended in ((0x100, False), (0x18FF0001, True), (0x18FF0001, True), (0x200, False)):
+        assert tx.send(can_id, [0x01], extended_id=extended) == CANERR_NOERROR
+    result, frames = rx.receive_many(max_frames=16, timeout=100)
+    assert result == CANERR_NOERROR
+
+    assert rx.dispatch(frames) == 3
+    assert [msg.id for msg in single] == [0x100]
+    assert [[msg.id for msg in group] for group in batched] == [[0x18FF0001, 0x18FF0001]]
+
+
+def test_exact_hardware_filter_skips_software_check(bus):
+    tx, rx = bus
+    rx.set_filter(ids=[0x100], ranges=[(0x200, 0x20F)])
+    assert rx._accept is None
+    assert rx.api._filter is not None
+    assert _received_ids(tx, rx, [0x100, 0x150, 0x20F]) == [0x100, 0x20F]
+
+
+def test_merged_hardware_filter_keeps_software_check(bus):
+    tx, rx = bus
+    # 하드웨어 필터 수를 넘으면 상위 집합 하나로 합치고 나머지는 소프트웨어에서 거름
+    ids = [0x100 + 2 * index for index in range(600)]
+    rx.set_filter(ids=ids)
+    assert rx._accept is not None
+    assert _received_ids(tx, rx, [0x100, 0x101, 0x102, 0x5AE, 0x5B0]) == [0x100, 0x102, 0x5AE]
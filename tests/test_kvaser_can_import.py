@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _loaded_after_import(statement):
+    """새 인터프리터에서 statement 실행 후 불러온 모듈 이름 집합"""
+    code = f'import sys\n{statement}\nprint(" ".join(sorted(sys.modules)))'
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return set(output.split())
+
+
+def test_import_does_not_load_optional_modules():
+    loaded = _loaded_after_import('import kvaser_can')
+    for name in ('numpy', 'can_frames', 'can_socketcan', 'can_ringbuffer', 'can_instrument'):
+        assert name not in loaded
+
+
+def test_modules_load_on_first_use():
+    loaded = _loaded_after_import(
+        'from kvaser_can import KvaserCAN\n'
+        'can = KvaserCAN(backend="virtual")\n'
+        'can.enable_instrumentation()\n'
+        'can.open(channel=3); can.start(bitrate_index=0)\n'
+        'can.start_capture(); can.stop_capture(); can.close()')
+    assert {'can_instrument', 'can_ringbuffer'} <= loaded
+    assert 'can_socketcan' not in loaded